@@ -0,0 +1,2 @@
+# Synthetic trial balances and the scaling benchmark for the taallc transformations.
+# See benchmarks/run.py.
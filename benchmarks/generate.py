@@ -0,0 +1,96 @@
+import random
+from openpyxl import Workbook
+
+# Synthetic trial balances in the layout the wizard expects: four preamble rows, then one
+# line per account with "Account Name (focus/ssoi)" (P&L) or "Account Name (code)"
+# (Balance) in column A and the amount in column B. A few "Total (...)" lines are mixed in
+# for the flag/clean steps, and the "spread" layout puts the names over several columns
+# with column A empty, which is what collapse_sheet is for.
+
+pnl_accounts = [
+    ("Commissions", 3010, 1), ("Underwriting Fees", 3050, 2), ("Advisory Fees", 3110, 3),
+    ("Interest Income", 3200, 4), ("Dividend Income", 3210, 5), ("Trading Gains", 3310, 6),
+    ("Fee Income", 3520, 7), ("Other Revenue", 3995, 11),
+    ("Salaries", 4110, 12), ("Employee Benefits", 4120, 13), ("Payroll Taxes", 4130, 13),
+    ("Clearing Charges", 4140, 14), ("Communications", 4150, 15), ("Occupancy", 4160, 16),
+    ("Rent", 4170, 16), ("Regulatory Fees", 4195, 17), ("Professional Fees", 4210, 18),
+    ("Insurance", 4220, 19), ("Travel", 4230, 20), ("Office Supplies", 4240, 21),
+    ("Depreciation", 4250, 22), ("Interest Expense", 4075, 23), ("Other Expenses", 4100, 25),
+]
+
+balance_accounts = [
+    ("Cash", 200), ("Cash - Segregated", 210), ("Receivable from Brokers", 300), ("Receivable from Customers", 355),
+    ("Securities Owned", 420), ("Investments", 530), ("Furniture and Equipment", 650), ("Prepaid Expenses", 740),
+    ("Other Assets", 940), ("Bank Loans", 1045), ("Payable to Brokers", 1110), ("Payable to Customers", 1205),
+    ("Accounts Payable", 1385), ("Accrued Expenses", 1405), ("Taxes Payable", 1590), ("Subordinated Loans", 1700),
+    ("Other Liabilities", 1760), ("Common Stock", 1770), ("Additional Paid-in Capital", 1780),
+    ("Retained Earnings", 1800), ("Net Income", 1810),
+]
+
+
+def trial_balance_rows(rows, kind="pnl", seed=0, total_ratio=0.01, blank_ratio=0.02):
+    # (label, amount) for every line, None for a blank spacer line
+    rnd = random.Random(seed)
+    for line in range(rows):
+        r = rnd.random()
+        if r < blank_ratio:
+            yield None
+            continue
+
+        if kind == "pnl":
+            name, focus, ssoi = rnd.choice(pnl_accounts)
+            code = f"{focus}/{ssoi:02d}"
+            amount = round(rnd.uniform(100, 250000) * (1 if focus < 4000 else -1) * rnd.choice((1, 1, 1, -1)), 2)
+        else:
+            name, focus = rnd.choice(balance_accounts)
+            code = f"{focus}"
+            amount = round(rnd.uniform(100, 500000) * (1 if focus <= 940 else -1), 2)
+
+        if r < blank_ratio + total_ratio:
+            yield (f"Total {name} ({code})", amount)
+        else:
+            yield (f"{name} {line + 1} ({code})", amount)
+
+
+def write_trial_balance(path, rows, kind="pnl", seed=0, layout="standard", total_ratio=0.01, blank_ratio=0.02):
+    # Write-only workbook, so a million lines stay within a few hundred MB
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Trial Balance")
+
+    ws.append(["Example Broker-Dealer LLC"])
+    ws.append(["Trial Balance" if kind == "pnl" else "Statement of Financial Condition"])
+    ws.append(["As of December 31"])
+    ws.append([])
+
+    for line in trial_balance_rows(rows, kind, seed, total_ratio, blank_ratio):
+        if line is None:
+            ws.append([])
+        elif layout == "spread":
+            # Column A empty, a group name in B, the account name in C and the amount in D
+            label, amount = line
+            ws.append([None, "Accounts", label, amount])
+        else:
+            ws.append(list(line))
+
+    wb.save(path)
+
+
+def write_client_data(path, clients=4, seed=0):
+    # Client data file: item codes in column A, descriptions in B, one column per client from C
+    rnd = random.Random(seed)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("Client Data")
+
+    header = ["Item", "Description"]
+    for client in range(clients):
+        header += [f"Client {client + 1}", None]
+    ws.append(header)
+
+    codes = sorted({focus for _, focus, _ in pnl_accounts} | {focus for _, focus in balance_accounts})
+    for code in codes:
+        row = [f"I{code:04d}", f"Item {code}"]
+        for _ in range(clients):
+            row += [rnd.randint(0, 100000), None]
+        ws.append(row)
+
+    wb.save(path)
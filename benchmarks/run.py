@@ -0,0 +1,208 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from io import BytesIO
+
+from benchmarks.generate import write_trial_balance, write_client_data
+
+# Scaling benchmark for the public transformations. Every measurement runs in its own
+# process, so the peak RSS is that transformation's alone, and reports wall time, peak RSS
+# and output size. Results can be saved as a JSON baseline and later runs compared to it.
+#
+#   python -m benchmarks.run --sizes 1k,10k --save-baseline
+#   python -m benchmarks.run --sizes 1k,10k            # compare against benchmarks/baseline.json
+
+default_sizes = "1k,10k,100k,1m"
+default_baseline = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+transformations = ["collapse_sheet", "highlight_and_flag_totals", "clean_flagged_totals",
+                   "run_full_pl_macro", "balance_focus_grouping", "efocus", "efocus_batch"]
+
+
+def parse_size(text):
+    text = text.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(text[-1:], 1)
+    return int(float(text.rstrip("km")) * multiplier)
+
+
+def size_label(rows):
+    if rows >= 1000000 and rows % 1000000 == 0:
+        return f"{rows // 1000000}m"
+    if rows >= 1000 and rows % 1000 == 0:
+        return f"{rows // 1000}k"
+    return str(rows)
+
+
+def input_files(data_dir, rows, seed):
+    # Generate the inputs for one size once; later runs reuse them
+    label = size_label(rows)
+    files = {
+        "pnl": os.path.join(data_dir, f"pnl_{label}_{seed}.xlsx"),
+        "balance": os.path.join(data_dir, f"balance_{label}_{seed}.xlsx"),
+        "spread": os.path.join(data_dir, f"spread_{label}_{seed}.xlsx"),
+        "client_data": os.path.join(data_dir, f"client_data_{seed}.xlsx"),
+        "focus": os.path.join(data_dir, f"focus_{label}_{seed}.xlsx"),
+    }
+    if not os.path.exists(files["pnl"]):
+        write_trial_balance(files["pnl"], rows, "pnl", seed)
+    if not os.path.exists(files["balance"]):
+        write_trial_balance(files["balance"], rows, "balance", seed)
+    if not os.path.exists(files["spread"]):
+        write_trial_balance(files["spread"], rows, "pnl", seed, layout="spread")
+    if not os.path.exists(files["client_data"]):
+        write_client_data(files["client_data"], seed=seed)
+    if not os.path.exists(files["focus"]):
+        # The eFocus step starts from a P&L output
+        from taallc import run_full_pl_macro
+        with open(files["pnl"], "rb") as f:
+            output = run_full_pl_macro(f.read())
+        with open(files["focus"], "wb") as f:
+            f.write(output.getvalue())
+    return files
+
+
+def output_size(result):
+    # Size of the file a transformation returned (BytesIO, bytes or a tuple starting with one)
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, BytesIO):
+        return len(result.getvalue())
+    if isinstance(result, (bytes, bytearray)):
+        return len(result)
+    return None
+
+
+def measure(name, files):
+    # Runs inside the child process: only the transformation itself is timed
+    import taallc
+
+    def read(key):
+        with open(files[key], "rb") as f:
+            return f.read()
+
+    if name == "collapse_sheet":
+        args, func = (read("spread"),), taallc.collapse_sheet
+    elif name == "highlight_and_flag_totals":
+        args, func = (read("pnl"),), taallc.highlight_and_flag_totals
+    elif name == "clean_flagged_totals":
+        file_bytes = read("pnl")
+        args, func = (file_bytes, taallc.scan_flagged_totals(file_bytes)), taallc.clean_flagged_totals
+    elif name == "run_full_pl_macro":
+        args, func = (read("pnl"),), taallc.run_full_pl_macro
+    elif name == "balance_focus_grouping":
+        args, func = (read("balance"),), taallc.balance_focus_grouping
+    elif name == "efocus":
+        args, func = (read("focus"), read("client_data"), "Client 1"), taallc.build_efocus_workbook
+    elif name == "efocus_batch":
+        args, func = (read("focus"), read("client_data")), taallc.build_efocus_batch
+    else:
+        raise ValueError(f"Unknown transformation: {name}")
+
+    start = time.perf_counter()
+    result = func(*args)
+    seconds = time.perf_counter() - start
+
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    return {"seconds": round(seconds, 4), "peak_rss_mb": round(peak_mb, 1), "output_bytes": output_size(result)}
+
+
+def run_child(name, files, timeout):
+    # Run one measurement in a fresh interpreter and read its JSON result
+    command = [sys.executable, "-m", "benchmarks.run", "--child", name, json.dumps(files)]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        completed = subprocess.run(command, cwd=root, capture_output=True, text=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        return {"error": f"timed out after {timeout}s"}
+    if completed.returncode != 0:
+        lines = completed.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit status {completed.returncode}"}
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def compare(results, baseline, tolerance):
+    # Wall time or peak RSS more than `tolerance` above the baseline counts as a regression
+    regressions = []
+    for key, result in results.items():
+        base = baseline.get(key)
+        if not base or "error" in result or "error" in base:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            if base[metric] and result[metric] > base[metric] * (1 + tolerance):
+                regressions.append(f"{key} {metric}: {base[metric]} -> {result[metric]}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.run",
+                                     description="Time the taallc transformations on synthetic trial balances.")
+    parser.add_argument("--sizes", default=default_sizes, help=f"Comma separated row counts (default: {default_sizes})")
+    parser.add_argument("--only", default=",".join(transformations),
+                        help="Comma separated transformations to run (default: all)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--data-dir", default=os.path.join(tempfile.gettempdir(), "taallc_benchmarks"),
+                        help="Where the generated inputs are kept between runs")
+    parser.add_argument("--timeout", type=int, default=3600, help="Seconds allowed per measurement")
+    parser.add_argument("--output", default=None, help="Write this run's results to a JSON file")
+    parser.add_argument("--baseline", default=default_baseline, help="Baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run's results as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown before a regression (0.25 = 25%%)")
+    parser.add_argument("--child", nargs=2, metavar=("NAME", "FILES"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child[0], json.loads(args.child[1]))))
+        return 0
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    names = [name.strip() for name in args.only.split(",") if name.strip()]
+    results = {}
+
+    print(f"{'transformation':<28}{'rows':>8}{'seconds':>12}{'peak MB':>10}{'output KB':>12}")
+    for rows in [parse_size(size) for size in args.sizes.split(",")]:
+        files = input_files(args.data_dir, rows, args.seed)
+        for name in names:
+            key = f"{name}@{size_label(rows)}"
+            result = run_child(name, files, args.timeout)
+            results[key] = result
+            if "error" in result:
+                print(f"{name:<28}{size_label(rows):>8}  error: {result['error']}")
+            else:
+                output_kb = result["output_bytes"] / 1024 if result["output_bytes"] is not None else 0
+                print(f"{name:<28}{size_label(rows):>8}{result['seconds']:>12.3f}"
+                      f"{result['peak_rss_mb']:>10.1f}{output_kb:>12.1f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.save_baseline:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {args.baseline}")
+        return 0
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
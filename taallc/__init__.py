@@ -0,0 +1,16 @@
+# Core transformations behind the filing wizard. Nothing in this package imports
+# streamlit, so the engines can run in scripts and worker processes; the Streamlit
+# apps at the top of the repo are front ends over these functions.
+
+from .collapse import collapse_sheet, needs_collapse, sheet_needs_collapse
+from .flag_totals import (scan_flagged_totals, highlight_flagged_totals, highlight_and_flag_totals, clean_flagged_totals,
+                          scan_ledger_totals, clean_ledger)
+from .labels import tokenize_label, tokenize_labels, scan_labels, scan_ledger_labels, label_formats
+from .classification import code_table, classify_codes
+from .pnl_macro_translation import run_full_pl_macro
+from .balance import balance_focus_grouping
+from .efocus import build_efocus_workbook, build_efocus_batch, list_client_names, apply_client_answers
+from .reader import open_workbook, read_columns, read_sheet, sheet_names
+from .probe import probe_workbook
+from .ledger import read_ledger, ledger_sheet, spill_ledger, drop_ledger
+from .result_cache import cached_call
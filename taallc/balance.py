@@ -0,0 +1,370 @@
+from .balance_engine import run_balance_engine
+from .labels import tokenize_labels
+from .classification import code_table, classify_codes
+from .totals import category_totals, subtotal_mask, last_member_rows, amount_cents, from_cents
+from .profiling import start_profile, profile_stage, finish_profile
+from .formatting import (comma_format, black_fill, white_font, bold_font, asset_fill, liability_fill, equity_fill,
+                         check_color_mode, format_summary_header, format_body_row, add_balance_color_rules)
+from .subtotals import apply_subtotals_for_sheet
+from .collapse import collapse_into
+from .flag_totals import apply_flagged_totals
+from .reader import check_reader, open_workbook
+from .writer import check_writer, save_workbook
+from .sheet_rows import sort_rows_by_code
+def calculate_and_insert_totals(focus_ws, total_assets, total_liabilities, total_equity, start_row=8, end_row=100):
+    # The totals are in cents (see calculate_totals) and are only converted when written
+    # Step 1: Calculate the sum of liabilities and equity
+    total_liabilities_and_equity = total_liabilities + total_equity
+
+    # Step 2: Calculate the balance (Total Assets - Total Liabilities and Equity)
+    balance = total_assets - total_liabilities_and_equity
+
+    # Step 3: Find the last row with data in column E
+    last_data_row = focus_ws.max_row
+    while focus_ws.cell(row=last_data_row, column=5).value is None and last_data_row >= start_row:
+        last_data_row -= 1  # Find the last row with data in column E
+
+    # Step 4: Move 2 rows down from the last data row in column E
+    last_row = last_data_row + 2
+
+    # Step 5: Insert the text in column E (bold and in all caps)
+    focus_ws.cell(row=last_row, column=5).value = "TOTAL ASSETS"
+    focus_ws.cell(row=last_row, column=5).font = bold_font
+
+    focus_ws.cell(row=last_row + 1, column=5).value = "TOTAL LIABILITIES AND EQUITY"
+    focus_ws.cell(row=last_row + 1, column=5).font = bold_font
+
+    focus_ws.cell(row=last_row + 2, column=5).value = "BALANCE"
+    focus_ws.cell(row=last_row + 2, column=5).font = bold_font
+
+    # Step 6: Insert the corresponding values in column F (bold)
+    focus_ws.cell(row=last_row, column=6).value = from_cents(total_assets)
+    focus_ws.cell(row=last_row, column=6).font = bold_font
+
+    focus_ws.cell(row=last_row + 1, column=6).value = from_cents(total_liabilities_and_equity)
+    focus_ws.cell(row=last_row + 1, column=6).font = bold_font
+
+    focus_ws.cell(row=last_row + 2, column=6).value = from_cents(balance)
+    focus_ws.cell(row=last_row + 2, column=6).font = bold_font
+
+    # Optional: Apply comma formatting to Column F (just like before)
+    for row in range(last_row, last_row + 3):
+        focus_ws.cell(row=row, column=6).number_format = comma_format  # No decimals
+
+
+
+def calculate_totals(focus_ws, start_row=8, end_row=100):
+    # Step 1: Sum the amounts in Column D for each group from the codes in Column C, leaving
+    # the "Total" subtotal rows out so every amount counts once (see totals.py). The sums
+    # are int cents.
+    table = code_table("balance")
+    rows = range(start_row, end_row + 1)
+    codes = [focus_ws.cell(row=row, column=3).value for row in rows]
+    amounts = [focus_ws.cell(row=row, column=4).value for row in rows]
+    _, totals, _ = category_totals(table, codes, amount_cents(amounts), subtotals=subtotal_mask(codes))
+
+    # Step 2: Insert the totals in the last row of each group (in Column F). Each group is
+    # looked up on its own, so a 1020 row is the last row of both Liabilities and Equity.
+    for category, position in last_member_rows(table, codes).items():
+        if position is not None:
+            focus_ws.cell(row=rows[position], column=6).value = from_cents(totals[category])  # Insert total in Column F
+            focus_ws.cell(row=rows[position], column=6).font = bold_font  # Bold the total
+            focus_ws.cell(row=rows[position], column=6).number_format = comma_format  # Also past row 100
+
+    return totals["asset"], totals["liability"], totals["equity"]
+
+
+# Fill for each balance sheet category
+category_fills = {"asset": asset_fill, "liability": liability_fill, "equity": equity_fill}
+
+
+def apply_focus_formatting(focus_ws, max_row, start_row=8, end_row=100, color_mode="fill"):
+    # Summary headers first (this deletes column J), then one sweep over the rows for the
+    # rounding/comma formats/bold totals (rows 8..max_row), the category fills (every row
+    # with data) and the comma format on column F (rows 8..100). In "conditional" mode the
+    # category colors are conditional-formatting rules over C:F instead of per-cell fills.
+    format_summary_header(focus_ws, "Focus")
+    last_data_row = max(focus_ws.max_row, max_row)
+    fill_rows = color_mode == "fill"
+    if not fill_rows:
+        add_balance_color_rules(focus_ws, start_row, last_data_row)
+
+    # Category of every row with data, classified at once (see classification.py)
+    categories = classify_codes(code_table("balance"),
+                                [focus_ws.cell(row=row, column=3).value for row in range(start_row, last_data_row + 1)])
+
+    for row in range(start_row, max(last_data_row, end_row) + 1):
+        if row <= max_row:
+            format_body_row(focus_ws, row)
+
+        if fill_rows and row <= last_data_row:
+            fill = category_fills.get(categories[row - start_row])
+            if fill:
+                for col in range(3, 7):  # Columns C to F
+                    focus_ws.cell(row=row, column=col).fill = fill
+
+        if row <= end_row:
+            focus_ws.cell(row=row, column=6).number_format = comma_format
+
+
+def move_last_total_below_group(focus_ws, start_row=8, end_row=100):
+    # Step 1: Find the last group of rows and the corresponding "Total" row
+    current_group = None
+    last_row_in_group = None
+    total_row = None
+    last_total_row = None
+
+    # Iterate through rows to find the last group and its corresponding "Total"
+    for row in range(start_row, end_row + 1):
+        c_value = focus_ws.cell(row=row, column=3).value  # Value in Column C
+        
+        if c_value and "Total" in str(c_value):  # Found a "Total" row
+            total_row = row  # Track the "Total" row
+            last_total_row = total_row  # Keep updating to the latest "Total" row
+        elif c_value and c_value != "Total":
+            # If it's a non-"Total" row, update the group and the last row
+            current_group = c_value
+            last_row_in_group = row
+
+    # Step 2: Move the last "Total" row below its corresponding group
+    if last_total_row is not None:
+        # Move the "Total" row to right below the last non-"Total" row in the group
+        focus_ws.cell(row=last_row_in_group + 1, column=3).value = focus_ws.cell(row=last_total_row, column=3).value
+        focus_ws.cell(row=last_row_in_group + 1, column=4).value = focus_ws.cell(row=last_total_row, column=4).value
+        focus_ws.cell(row=last_row_in_group + 1, column=5).value = focus_ws.cell(row=last_total_row, column=5).value
+        
+        # Clear the current "Total" row
+        for col in range(1, focus_ws.max_column + 1):
+            focus_ws.cell(row=last_total_row, column=col).value = None
+
+        # Update the last row to reflect the moved "Total"
+        last_row_in_group += 1
+
+
+
+
+def create_summary(focus_ws, subtotals):
+    # One summary row per subtotal group, from the (code, sum) list apply_subtotals_for_sheet
+    # returns instead of a rescan of the written rows for "Total"
+    for summary_row, (code, total_sum) in enumerate(subtotals, start=8):
+        focus_ws.cell(row=summary_row, column=9).value = str(code).strip()  # Number ID in column I
+        focus_ws.cell(row=summary_row, column=10).value = "Total"  # Word "Total" in column J
+        focus_ws.cell(row=summary_row, column=11).value = from_cents(total_sum)  # Subtotal value in column K
+
+
+
+
+
+
+def sort_focus_sheet(focus_ws, max_row):
+    # Drop the rows from row 8 with an empty column C and sort the rest by column C
+    sort_rows_by_code(focus_ws, 8, max_row)
+
+def secondary_sort_focus_sheet(focus_ws, max_row):
+    # Step 1: Create a list to hold rows with their corresponding values from columns C and D
+    rows = []
+
+    # Loop through column C starting from row 8 to max_row
+    for row in range(8, max_row + 1):
+        c_value = focus_ws.cell(row=row, column=3).value  # Column C value
+        d_value = focus_ws.cell(row=row, column=4).value  # Column D value
+        
+        # Skip rows where column C is empty
+        if c_value is None or c_value == "":
+            continue
+        
+        # Convert column C values from text to numbers if possible
+        try:
+            c_value = float(c_value)
+        except ValueError:
+            c_value = float('-inf')  # If conversion fails, treat as the lowest possible value
+        
+        # Ensure column D is treated as a numeric value if possible
+        if isinstance(d_value, (int, float)):
+            d_value = float(d_value)  # Ensure the value is treated as a float
+        else:
+            d_value = float('-inf')  # Non-numeric values will be treated as the lowest possible
+        
+        # Append the entire row along with values from column C and D
+        rows.append((row, c_value, d_value, [focus_ws.cell(row=row, column=col).value for col in range(1, focus_ws.max_column + 1)]))
+
+    # Step 2: Sort rows based on column C (ascending) and column D (descending for same values in C)
+    rows.sort(key=lambda x: (x[1], -x[2]))  # Sort by Column C ascending, then by Column D descending
+
+    # Step 3: Clear the existing values in the sheet starting from row 8
+    for row in range(8, max_row + 1):
+        for col in range(1, focus_ws.max_column + 1):
+            focus_ws.cell(row=row, column=col).value = None
+
+    # Step 4: Write the sorted rows back into the sheet starting from row 8
+    new_row_idx = 8
+    for _, _, _, row_values in rows:
+        for col_idx, value in enumerate(row_values, start=1):
+            focus_ws.cell(row=new_row_idx, column=col_idx).value = value
+        new_row_idx += 1
+
+
+
+
+
+
+
+def balance_focus_grouping(file_bytes, engine="sheet", profile=None, color_mode="fill", writer="workbook",
+                           reader="openpyxl", collapse=False, flagged=None, clean=False):
+    # engine="columnar" runs the array-backed engine (see balance_engine.py), whose Focus
+    # layout differs from the macro's; pass an empty dict as profile to get a per-stage
+    # report (see profiling.py); color_mode="conditional" colors the categories with
+    # conditional formatting; writer="stream" writes the output through a write-only
+    # workbook (see writer.py) and reader="xml" (which needs it) reads the input without
+    # loading it (see reader.py); both need the columnar engine;
+    # collapse=True runs on the collapsed active sheet, as collapse_sheet would leave it;
+    # flagged (from the Total cell scan) cleans or highlights those cells first, as Step 4
+    # would leave the file
+    check_color_mode(color_mode)
+    check_writer(writer, engine)
+    check_reader(reader, engine, writer)
+    start_profile(profile, f"balance/{engine}")
+    try:
+        # Open the workbook with the chosen reader (raw bytes or BytesIO)
+        profile_stage(profile, "load workbook")
+        book = open_workbook(file_bytes, reader, data_only=flagged is not None)
+        if flagged is not None:
+            apply_flagged_totals(book, flagged, clean)
+
+        # The "sheet" engine (the default) runs the original cell-by-cell steps, which only
+        # format and move rows 8 to 100 (the totals count every row) and keep the macro's
+        # layout; the columnar engine works on every row of the sheet, with its own layout
+        if engine == "columnar":
+            wb = run_balance_engine(book, profile, color_mode, writer, collapse)
+        elif engine == "sheet":
+            wb = book["workbook"]
+            if collapse:
+                collapse_into(book, wb)
+            balance_sheet_grouping(wb, profile, color_mode)
+        else:
+            raise ValueError(f"Unknown balance engine: {engine}")
+
+        # Save the modified workbook to a BytesIO object; getvalue() hands back its bytes
+        # without another copy
+        profile_stage(profile, "save workbook")
+        return save_workbook(wb).getvalue()  # Return the transformed file as bytes
+    finally:
+        finish_profile(profile)
+
+
+def balance_sheet_grouping(wb, profile=None, color_mode="fill"):
+    ws = wb.active  # Get the active worksheet
+
+    # Create Focus worksheet
+    focus_ws = wb.create_sheet(title="Focus")
+
+    # Find the last used row and column in the original sheet
+    max_row = ws.max_row
+    max_col = ws.max_column
+
+    profile_stage(profile, "copy labels")
+    # Step 1: Copy Column A from the original sheet into Focus sheet (Column A in Focus)
+    for row in range(1, max_row + 1):
+        focus_ws.cell(row=row, column=1).value = ws.cell(row=row, column=1).value
+
+    profile_stage(profile, "split labels")
+    # Step 2: Split Column A at the opening parenthesis in one tokenizing pass: the
+    # description stays in Column A and the code, without parentheses, goes to Column B
+    tokens = tokenize_labels([focus_ws.cell(row=row, column=1).value for row in range(1, max_row + 1)],
+                             filing_type="balance")
+    for index, row in enumerate(range(1, max_row + 1)):
+        if tokens["codes"][index] is not None:
+            focus_ws.cell(row=row, column=1).value = tokens["description"][index]
+            focus_ws.cell(row=row, column=2).value = tokens["codes"][index]
+
+    profile_stage(profile, "copy amounts")
+    # Step 4: Copy Column B from the original sheet to Column D in Focus sheet (as value only)
+    for row in range(1, max_row + 1):
+        # Get the calculated value (not the formula) from Column B in the original sheet
+        original_value = ws.cell(row=row, column=2).value  # Get the value, not the formula
+        focus_ws.cell(row=row, column=4).value = original_value  # Directly paste the value into Column D
+
+    profile_stage(profile, "shift columns")
+    # Insert two columns at the beginning of the Focus sheet (Columns A and B become empty)
+    focus_ws.insert_cols(1, 2)
+    
+    # Shift data from columns starting from row 5 (move the data from columns C, D, F)
+    for row in range(5, max_row + 1):
+        # Move data in Column C to Column E
+        focus_ws.cell(row=row, column=5).value = focus_ws.cell(row=row, column=3).value
+        focus_ws.cell(row=row, column=3).value = None  # Clear original cell
+    
+        # Move data in Column D to Column C
+        focus_ws.cell(row=row, column=3).value = focus_ws.cell(row=row, column=4).value
+        focus_ws.cell(row=row, column=4).value = None  # Clear original cell
+    
+        # Move data in Column F to Column D
+        focus_ws.cell(row=row, column=4).value = focus_ws.cell(row=row, column=6).value
+        focus_ws.cell(row=row, column=6).value = None  # Clear original cell
+    
+    profile_stage(profile, "headers and insert_rows")
+    # Add column titles in row 4 (ensure this is done after the rows are shifted)
+    focus_ws["C4"] = "Focus"
+    focus_ws["D4"] = "Amount"
+    focus_ws["E4"] = "Description"
+    focus_ws["F4"] = "Totals"
+    
+    # Shift everything below row 4 down by 3 rows in Focus sheet
+    focus_ws.insert_rows(4, amount=3)  # Insert 3 rows at row 4 in focus_ws
+    
+    profile_stage(profile, "header formatting")
+    # Fill columns C to F in row 7 with black and change the text color to white in the Focus sheet
+    for col in ["C", "D", "E", "F"]:
+        focus_ws[f"{col}7"].fill = black_fill
+        focus_ws[f"{col}7"].font = white_font
+    
+    # Format column D and F in the Focus sheet to show numbers with thousand commas
+    for row in range(1, max_row + 1):
+        focus_ws.cell(row=row, column=4).number_format = comma_format  # Column D
+        focus_ws.cell(row=row, column=6).number_format = comma_format  # Column F
+    
+    # Increase the width of column E to double the default width in the Focus sheet
+    focus_ws.column_dimensions["E"].width = focus_ws.column_dimensions["E"].width * 2.5
+    
+    profile_stage(profile, "sort_focus_sheet")
+    # Call the sort_focus_sheet function after the rest of the operations in the macro
+    sort_focus_sheet(focus_ws, max_row)
+
+    profile_stage(profile, "secondary_sort_focus_sheet")
+    # After sorting by Column C (primary sort)
+    secondary_sort_focus_sheet(focus_ws, max_row=max_row)
+
+    
+
+
+
+
+    profile_stage(profile, "apply_subtotals_for_sheet")
+    #subtotals
+    subtotals = apply_subtotals_for_sheet(focus_ws, max_row)
+    
+        
+    profile_stage(profile, "move_last_total_below_group")
+    # After sorting and performing other operations, call this function to move the last "Total" row
+    move_last_total_below_group(focus_ws, start_row=8, end_row=100)
+
+    
+    profile_stage(profile, "create_summary")
+    create_summary(focus_ws, subtotals)
+
+    # Summary headers, rounding, comma formats, bold totals and category fills in one sweep
+    profile_stage(profile, "apply_focus_formatting")
+    apply_focus_formatting(focus_ws, max_row, color_mode=color_mode)
+
+    # Get the calculated totals, over every row of the sheet rather than the macro's rows
+    # 8 to 100
+    profile_stage(profile, "calculate_totals")
+    total_assets, total_liabilities, total_equity = calculate_totals(focus_ws, start_row=8, end_row=focus_ws.max_row)
+
+    profile_stage(profile, "calculate_and_insert_totals")
+    calculate_and_insert_totals(focus_ws, total_assets, total_liabilities, total_equity, start_row=8, end_row=100)
+
+    return wb
+
+
+
@@ -0,0 +1,184 @@
+import numpy as np
+from .subtotals import build_subtotals
+from .profiling import profile_stage
+from .labels import tokenize_labels
+from .classification import code_table, category_names
+from .totals import category_totals, amount_cents, from_cents
+from .pnl_engine import is_number, is_blank, sort_code_key, amount_key
+from .collapse import engine_sheet
+from .writer import check_writer, output_workbook, write_rows
+from .formatting import (black_fill, white_font, bold_font, asset_fill, liability_fill, equity_fill, comma_format,
+                         check_color_mode, add_balance_color_rules)
+
+# Array-backed balance sheet engine: the active sheet is read once into column arrays,
+# every row is sorted, subtotaled and classified in one pass over the arrays, and the
+# Focus sheet is written in a single pass. Unlike the openpyxl steps in balance.py there
+# is no fixed row window, so every row of the trial balance counts towards the totals.
+# Its Focus layout differs from the macro's, so balance_focus_grouping only uses it when
+# asked (engine="columnar"), as the stream writer and the xml reader need.
+
+category_fills = {"asset": asset_fill, "liability": liability_fill, "equity": equity_fill}
+
+
+def read_balance_columns(sheet):
+    # Parse a sheet read by reader.read_sheet into column arrays (index 0 is row 1 of the
+    # sheet). Column A holds "Description (code)"; the tokenized code part loses its
+    # parentheses. The amounts are also kept as int cents, which every sum works on.
+    rows = [tuple(values[:2]) + (None,) * (2 - len(values)) for values in sheet["rows"]]
+    tokens = tokenize_labels([values[0] for values in rows], filing_type="balance")
+    amounts = [values[1] for values in rows]
+    return {
+        "description": tokens["description"],
+        "code": tokens["codes"],
+        "amount": amounts,
+        "cents": amount_cents(amounts),
+        "max_row": sheet["max_row"],
+        "malformed": tokens["malformed"],
+    }
+
+
+def secondary_sort_key(code, amount):
+    # Codes sort as numbers, then by amount descending for the same code
+    try:
+        numeric_code = float(code)
+    except ValueError:
+        numeric_code = float('-inf')
+    return (numeric_code, -amount_key(amount))
+
+
+def build_balance_rows(columns):
+    # Rows 5 onwards are the trial balance lines; rows without a code are dropped
+    indices = [index for index in range(4, columns["max_row"]) if not is_blank(columns["code"][index])]
+    indices.sort(key=lambda index: sort_code_key(columns["code"][index]))
+    indices.sort(key=lambda index: secondary_sort_key(columns["code"][index], columns["amount"][index]))
+
+    # Add a "<code> Total" row after each group of identical codes
+    order, subtotals = build_subtotals(
+        indices,
+        lambda index: columns["code"][index],
+        lambda index: columns["cents"][index],
+        lambda code, total_sum: (f"{code} Total", total_sum),
+    )
+
+    rows = {"code": [], "amount": [], "cents": [], "description": [], "subtotal": [], "subtotals": subtotals}
+    for entry in order:
+        if isinstance(entry, tuple):
+            rows["code"].append(entry[0])
+            rows["amount"].append(from_cents(entry[1]))
+            rows["cents"].append(entry[1])
+            rows["description"].append(None)
+            rows["subtotal"].append(True)
+        else:
+            rows["code"].append(columns["code"][entry])
+            rows["amount"].append(columns["amount"][entry])
+            rows["cents"].append(columns["cents"][entry])
+            rows["description"].append(columns["description"][entry])
+            rows["subtotal"].append(False)
+
+    return rows
+
+
+def balance_totals(rows):
+    # Classify every row once, then sum each category (leaving the subtotal rows out) and
+    # find its last row, all over the column arrays (see totals.py). Totals are in cents.
+    table = code_table("balance")
+    indices, totals, last_rows = category_totals(table, rows["code"], rows["cents"],
+                                                 subtotals=np.array(rows["subtotal"], dtype=bool))
+    last_rows = {category: position for category, position in last_rows.items() if position is not None}
+    return category_names(table, indices), totals, last_rows
+
+
+def balance_sheet_rows(columns, rows, color_mode="fill"):
+    # Rows of the Focus sheet as (values, styles) for the writer (see writer.py)
+    categories, totals, last_rows = balance_totals(rows)
+    category_total_rows = {position: from_cents(totals[category]) for category, position in last_rows.items()}
+    summary = [(str(code).strip(), from_cents(cents)) for code, cents in rows["subtotals"]]
+
+    # Rows 1-3 keep the split layout (C description, D code, F amount), row 7 holds the
+    # headers
+    for row in range(1, 8):
+        if row <= min(columns["max_row"], 3):
+            index = row - 1
+            values = {3: columns["description"][index], 4: columns["code"][index], 6: columns["amount"][index]}
+        elif row == 7:
+            values = {3: "Focus", 4: "Amount", 5: "Description", 6: "Totals", 9: "Focus", 10: "Amount"}
+        else:
+            values = {}
+        styles = {col: [comma_format, None, None] for col in (4, 6)}
+        if row == 7:
+            for col in (3, 4, 5, 6, 9, 10):
+                styles.setdefault(col, [None, None, None])[1:] = [white_font, black_fill]
+        yield {col: value for col, value in values.items() if value is not None}, styles
+
+    # Grand totals two rows below the last row with a description
+    last_data_row = 7
+    for position in range(len(rows["description"]) - 1, -1, -1):
+        if rows["description"][position] is not None:
+            last_data_row = position + 8
+            break
+    total_liabilities_and_equity = totals["liability"] + totals["equity"]
+    grand_totals = [
+        ("TOTAL ASSETS", from_cents(totals["asset"])),
+        ("TOTAL LIABILITIES AND EQUITY", from_cents(total_liabilities_and_equity)),
+        ("BALANCE", from_cents(totals["asset"] - total_liabilities_and_equity)),
+    ]
+    grand_rows = {last_data_row + offset: (label, value) for offset, (label, value) in enumerate(grand_totals, start=2)}
+
+    for row in range(8, max(7 + len(rows["code"]), max(grand_rows)) + 1):
+        position = row - 8
+        values = {}
+        styles = {}
+        if position < len(rows["code"]):
+            code = rows["code"][position]
+            values = {3: code, 4: rows["amount"][position], 5: rows["description"][position],
+                      6: category_total_rows.get(position)}
+            if position < len(summary):
+                values[9], summary_amount = summary[position]
+                values[10] = round(summary_amount, 0) if is_number(summary_amount) else summary_amount
+
+            fill = category_fills.get(categories[position]) if color_mode == "fill" else None
+            styles = {col: [None, None, fill] for col in range(3, 7)}
+            styles[4][0] = comma_format
+            styles[6][0] = comma_format
+            if is_number(values.get(10)):
+                styles[10] = [comma_format, None, None]
+            if "total" in str(code).lower():
+                styles[3][1] = bold_font
+            if position in category_total_rows:
+                styles[6][1] = bold_font
+
+        if row in grand_rows:
+            values[5], values[6] = grand_rows[row]
+            for col in (5, 6):
+                styles.setdefault(col, [None, None, None])[1] = bold_font
+            styles[6][0] = comma_format
+
+        yield {col: value for col, value in values.items() if value is not None}, styles
+
+
+def write_balance_sheet(ws, columns, rows, color_mode="fill"):
+    # Increase the width of column E to double the default width (before the rows, for
+    # write-only sheets)
+    ws.column_dimensions["E"].width = ws.column_dimensions["E"].width * 2.5
+    write_rows(ws, balance_sheet_rows(columns, rows, color_mode))
+    if color_mode == "conditional":
+        add_balance_color_rules(ws, 8, 7 + len(rows["code"]))
+
+
+def run_balance_engine(book, profile=None, color_mode="fill", writer="workbook", collapse=False):
+    # Parse the active sheet of a workbook opened with reader.open_workbook once (collapsed
+    # first with collapse=True, see collapse.engine_sheet) and write the Focus sheet.
+    # Returns the output workbook, which is a new write-only one with the "stream"
+    # writer.
+    check_color_mode(color_mode)
+    check_writer(writer)
+    profile_stage(profile, "open output")
+    output = output_workbook(book, writer)
+    profile_stage(profile, "read columns")
+    columns = read_balance_columns(engine_sheet(book, output, collapse))
+    focus_ws = output.create_sheet(title="Focus")
+    profile_stage(profile, "build rows")
+    rows = build_balance_rows(columns)
+    profile_stage(profile, "write Focus")
+    write_balance_sheet(focus_ws, columns, rows, color_mode)
+    return output
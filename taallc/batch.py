@@ -0,0 +1,227 @@
+import argparse
+import collections
+import csv
+import glob
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .flag_totals import highlight_flagged_totals, clean_flagged_totals, scan_ledger_totals, clean_ledger
+from .pnl_macro_translation import run_full_pl_macro
+from .balance import balance_focus_grouping
+from .labels import scan_ledger_labels
+from .formatting import color_modes
+from .collapse import sheet_needs_collapse
+from .ledger import read_ledger, ledger_sheet
+from .efocus import unique_name
+from .reader import readers
+from .writer import writers
+
+# Batch runner for a directory of trial balances: every file goes through the same steps
+# as the wizard (flag/clean the Total cells, collapse if needed, then the P&L or Balance
+# transformation) in a process pool, and a per-file summary is written next to the outputs.
+#
+#   python -m taallc.batch trial_balances/ --manifest manifest.csv --out filings/
+#
+# The manifest is a CSV with a "file" and a "type" column; type is "pnl" or "balance". A
+# file is matched by its path as given on the command line, or by its name alone when no
+# other input has the same name.
+
+filing_types = {
+    "pnl": "pnl", "p&l": "pnl", "profit & loss": "pnl", "profit & loss (p&l)": "pnl",
+    "balance": "balance", "balance sheet": "balance", "bs": "balance",
+}
+
+summary_fields = ["file", "type", "status", "flagged", "collapsed", "malformed_labels", "seconds", "output", "error"]
+
+
+def read_manifest(path):
+    # Map each file in the manifest (a name or a path) to its filing type ("pnl" or
+    # "balance"); the same file listed twice is an error
+    manifest = {}
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        for row in csv.DictReader(f):
+            name = (row.get("file") or "").strip()
+            filing_type = filing_types.get((row.get("type") or "").strip().lower())
+            if not name:
+                continue
+            if filing_type is None:
+                raise ValueError(f"Unknown filing type for {name}: {row.get('type')!r}")
+            name = os.path.normpath(name)
+            if name in manifest:
+                raise ValueError(f"File listed twice in the manifest: {name}")
+            manifest[name] = filing_type
+    return manifest
+
+
+def manifest_type(manifest, path, names):
+    # Filing type of an input: by its path, else by its name when `names` (the count of
+    # each input file name) shows no other input with that name
+    path = os.path.normpath(path)
+    if path in manifest:
+        return manifest[path]
+    name = os.path.basename(path)
+    if names[name] == 1:
+        return manifest.get(name)
+    return None
+
+
+def find_inputs(inputs):
+    # Each input is a directory (every .xlsx inside it), a glob pattern or a single file
+    paths = []
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "*.xlsx"))
+        else:
+            matches = glob.glob(item)
+        paths.extend(path for path in sorted(matches)
+                     if path.lower().endswith(".xlsx") and not os.path.basename(path).startswith("~$"))
+    # Drop duplicates while keeping the order
+    return list(dict.fromkeys(paths))
+
+
+def process_filing(file_bytes, filing_type, clean=True, color_mode="fill", writer="workbook", reader="openpyxl"):
+    # Same steps as the wizard: Total cells (Steps 3-4), collapse (Step 5), transformation
+    # (Step 5). As in the wizard, the checks read one ledger table (see ledger.py) and the
+    # Total cell edits are applied by the transformation when it opens the file.
+    ledger = read_ledger(file_bytes)
+    flagged = scan_ledger_totals(ledger)
+    if clean and flagged:
+        ledger = clean_ledger(ledger, flagged)
+
+    # The engines collapse the sheet themselves, without a collapsed file in between
+    collapsed = sheet_needs_collapse(ledger_sheet(ledger))
+    malformed = scan_ledger_labels(ledger, collapsed, filing_type)
+
+    # The xml reader cannot edit cells, so there the flagged cells go through a saved copy
+    edits = flagged
+    if reader == "xml" and flagged:
+        file_bytes = (clean_flagged_totals if clean else highlight_flagged_totals)(file_bytes, flagged)
+        edits = []
+
+    if filing_type == "pnl":
+        output = run_full_pl_macro(file_bytes, color_mode=color_mode, writer=writer, reader=reader,
+                                   collapse=collapsed, flagged=edits, clean=clean).getvalue()
+    else:
+        # The stream writer needs the columnar engine; otherwise the balance sheet keeps the
+        # macro's layout (see balance.py)
+        engine = "columnar" if writer == "stream" else "sheet"
+        output = balance_focus_grouping(file_bytes, engine=engine, color_mode=color_mode, writer=writer,
+                                        reader=reader, collapse=collapsed, flagged=edits, clean=clean)
+
+    return output, len(flagged), collapsed, len(malformed)
+
+
+def run_one(path, filing_type, out_dir, clean, color_mode="fill", writer="workbook", reader="openpyxl",
+            output_name=None):
+    # Worker entry point: never raises, the outcome goes into the summary row. output_name
+    # (without .xlsx) defaults to the input's name with the filing type appended.
+    result = {"file": os.path.basename(path), "type": filing_type, "status": "ok",
+              "flagged": "", "collapsed": "", "malformed_labels": "", "seconds": "", "output": "", "error": ""}
+    start = time.perf_counter()
+    try:
+        with open(path, "rb") as f:
+            file_bytes = f.read()
+        output, flagged, collapsed, malformed = process_filing(file_bytes, filing_type, clean, color_mode, writer,
+                                                                   reader)
+
+        output_name = output_name or os.path.splitext(os.path.basename(path))[0] + f"_{filing_type}"
+        output_path = os.path.join(out_dir, output_name + ".xlsx")
+        with open(output_path, "wb") as f:
+            f.write(output)
+
+        result.update(flagged=flagged, collapsed=collapsed, malformed_labels=malformed, output=output_path)
+    except Exception as e:
+        result.update(status="error", error=f"{type(e).__name__}: {e}")
+        traceback.print_exc()
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def run_batch(paths, manifest, out_dir, workers=None, clean=True, color_mode="fill", writer="workbook",
+              reader="openpyxl"):
+    # Fan the files out over a process pool; the summary keeps the input order. Inputs
+    # with the same name in different directories get " (2)", " (3)", ... added to their
+    # output names, so no output overwrites another.
+    os.makedirs(out_dir, exist_ok=True)
+    names = collections.Counter(os.path.basename(path) for path in paths)
+    output_names = set()
+    results = {}
+    jobs = []
+    for path in paths:
+        filing_type = manifest_type(manifest, path, names)
+        if filing_type is None:
+            error = "Not listed in the manifest"
+            if names[os.path.basename(path)] > 1 and os.path.basename(path) in manifest:
+                error = "Several inputs have this name; list the file with its directory in the manifest"
+            results[path] = {"file": os.path.basename(path), "type": "", "status": "skipped",
+                             "flagged": "", "collapsed": "", "malformed_labels": "", "seconds": "", "output": "",
+                             "error": error}
+        else:
+            output_name = os.path.splitext(os.path.basename(path))[0] + f"_{filing_type}"
+            jobs.append((path, filing_type, unique_name(output_name, output_names)))
+
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as executor:
+            futures = {executor.submit(run_one, path, filing_type, out_dir, clean, color_mode, writer, reader,
+                                       output_name): path
+                       for path, filing_type, output_name in jobs}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                print(f"{result['status']:>7}  {result['seconds']:>8}s  {result['file']}", file=sys.stderr)
+
+    return [results[path] for path in paths]
+
+
+def write_summary(results, path):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=summary_fields)
+        writer.writeheader()
+        writer.writerows(results)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m taallc.batch",
+                                     description="Run the P&L / Balance transformations over many trial balances.")
+    parser.add_argument("inputs", nargs="+", help="Directories, glob patterns or .xlsx files")
+    parser.add_argument("--manifest", required=True, help="CSV with 'file' and 'type' (pnl or balance) columns")
+    parser.add_argument("--out", default="batch_output", help="Output directory (default: batch_output)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument("--no-clean", dest="clean", action="store_false",
+                        help="Highlight the flagged Total cells instead of cleaning them")
+    parser.add_argument("--color-mode", choices=color_modes, default="fill",
+                        help="Per-cell fills or conditional-formatting rules for the color coding (default: fill)")
+    parser.add_argument("--writer", choices=writers, default="workbook",
+                        help="Save the whole workbook, or stream the output through a write-only workbook; "
+                             "stream writes balance sheets with the columnar layout (default: workbook)")
+    parser.add_argument("--reader", choices=readers, default="openpyxl",
+                        help="Load the trial balances with openpyxl, or parse the sheet XML directly; xml "
+                             "needs --writer stream (default: openpyxl)")
+    parser.add_argument("--summary", default=None, help="Summary CSV path (default: <out>/summary.csv)")
+    args = parser.parse_args(argv)
+    if args.reader == "xml" and args.writer != "stream":
+        parser.error("--reader xml needs --writer stream")
+
+    manifest = read_manifest(args.manifest)
+    paths = find_inputs(args.inputs)
+    if not paths:
+        parser.error("No .xlsx files found")
+
+    start = time.perf_counter()
+    results = run_batch(paths, manifest, args.out, args.workers, args.clean, args.color_mode, args.writer,
+                        args.reader)
+    summary_path = args.summary or os.path.join(args.out, "summary.csv")
+    write_summary(results, summary_path)
+
+    failed = sum(1 for result in results if result["status"] != "ok")
+    print(f"{len(results) - failed}/{len(results)} files processed in {time.perf_counter() - start:.1f}s; "
+          f"summary written to {summary_path}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import numpy as np
+
+# FOCUS/SSOI code classification. The code ranges are versioned configuration: each
+# version maps a scheme to how its codes are parsed and to (category, low, high) ranges,
+# high=None meaning no upper bound. Ranges are listed in priority order, so when two
+# overlap (1020 is inside the liabilities range) the first one classifies the code; the
+# per-category masks still hold every code a range lists, for the steps that look a
+# category up on its own.
+#
+# Each (scheme, version) is built once into a dense lookup array indexed by code, and
+# classify_codes classifies a whole column of codes with one array lookup.
+
+current_version = "2024.1"
+
+code_ranges = {
+    "2024.1": {
+        # Balance sheet Focus codes; "<code> Total" subtotal rows count as their code
+        "balance": {
+            "parse": "number",
+            "ranges": [("asset", 200, 940), ("liability", 970, 1760), ("equity", 1020, 1020), ("equity", 1770, 1810)],
+        },
+        # P&L Focus codes; the code is the digits of column C
+        "pnl": {
+            "parse": "digits",
+            "ranges": [("income", 0, 3999), ("expense", 4000, None)],
+        },
+        # SSOI codes on the P&L
+        "ssoi": {
+            "parse": "digits",
+            "ranges": [("income", 0, 11), ("expense", 12, None)],
+        },
+    },
+}
+
+_tables = {}
+
+
+def number_code(value):
+    # Int code of a cell, skipping the word "Total" on subtotal rows; None when it isn't one
+    try:
+        return int(str(value).strip().replace("Total", "").strip())
+    except ValueError:
+        return None
+
+
+def digits_code(value):
+    # Int made of the digits in a cell (letters scrubbed); None when there are none
+    if value is None or value == "":
+        return None
+    digits = ''.join(filter(str.isdigit, str(value)))
+    return int(digits) if digits.isdigit() else None
+
+
+parsers = {"number": number_code, "digits": digits_code}
+max_code = np.iinfo(np.int64).max
+
+
+def code_table(scheme, version=current_version):
+    # Lookup table for one scheme, built on first use
+    key = (scheme, version)
+    if key not in _tables:
+        if version not in code_ranges:
+            raise ValueError(f"Unknown code table version: {version}")
+        if scheme not in code_ranges[version]:
+            raise ValueError(f"Unknown code scheme: {scheme}")
+        _tables[key] = build_code_table(scheme, version)
+    return _tables[key]
+
+
+def build_code_table(scheme, version):
+    config = code_ranges[version][scheme]
+    ranges = config["ranges"]
+    categories = list(dict.fromkeys(category for category, _, _ in ranges))
+
+    # Codes above the last bounded range only match the unbounded ranges
+    size = max(max(low, high if high is not None else low) for _, low, high in ranges) + 2
+    lookup = np.full(size, -1, dtype=np.int8)
+    masks = {category: np.zeros(size, dtype=bool) for category in categories}
+    overflow = -1
+
+    # Fill in reverse so the first listed range wins where two overlap
+    for category, low, high in reversed(ranges):
+        index = categories.index(category)
+        stop = size if high is None else high + 1
+        lookup[low:stop] = index
+        masks[category][low:stop] = True
+        if high is None:
+            overflow = index
+
+    return {
+        "version": version,
+        "scheme": scheme,
+        "parse": parsers[config["parse"]],
+        "ranges": ranges,
+        "categories": categories,
+        "lookup": lookup,
+        "masks": masks,
+        "overflow": overflow,
+    }
+
+
+def parse_codes(table, values):
+    # Int codes of a column of cell values, -1 where a value has no code
+    parse = table["parse"]
+    codes = [parse(value) for value in values]
+    return np.array([-1 if code is None else min(code, max_code) for code in codes], dtype=np.int64)
+
+
+def classify_indices(table, values):
+    # Category index (into table["categories"], -1 for none) of every value in a column,
+    # from one lookup over the code array
+    codes = parse_codes(table, values)
+    lookup = table["lookup"]
+    indices = np.full(len(codes), -1, dtype=np.int64)
+    inside = (codes >= 0) & (codes < len(lookup))
+    indices[inside] = lookup[codes[inside]]
+    indices[codes >= len(lookup)] = table["overflow"]
+    return indices
+
+
+def category_names(table, indices):
+    categories = table["categories"]
+    return [categories[index] if index >= 0 else None for index in indices.tolist()]
+
+
+def classify_codes(table, values):
+    # Category (or None) of every value in a column
+    return category_names(table, classify_indices(table, values))
+
+
+def classify_code(table, value):
+    return classify_codes(table, [value])[0]
+
+
+def member_mask(table, values, category):
+    # Rows whose code any range of the category lists, overlaps included
+    codes = parse_codes(table, values)
+    mask = table["masks"][category]
+    member = np.zeros(len(codes), dtype=bool)
+    inside = (codes >= 0) & (codes < len(mask))
+    member[inside] = mask[codes[inside]]
+    member[codes >= len(mask)] = any(name == category and high is None for name, _, high in table["ranges"])
+    return member
+
@@ -0,0 +1,125 @@
+import numpy as np
+from .reader import iter_sheet_rows, open_workbook, read_sheet
+from .totals import is_amount
+from .writer import output_workbook, save_workbook, write_rows
+
+# Collapses trial balances whose account names are spread over several columns (indented
+# QuickBooks-style exports) into two columns. The rows are read lazily and checked a block
+# at a time: the balance column of every row in a block comes from one pass of type checks
+# over the block's array. The engines can take the collapsed columns directly (see
+# engine_sheet), without saving and reloading a collapsed workbook.
+
+block_rows = 4096
+cleaned_header = ("Account Names", "Balance")
+
+
+def needs_collapse(ws):
+    # Rows 5 to 10 of column A all empty means the account names are spread over several columns
+    values = [row[0] for row in ws.iter_rows(min_row=5, max_row=10, min_col=1, max_col=1, values_only=True)]
+    return blank_column(values)
+
+
+def sheet_needs_collapse(sheet):
+    # Same check on a sheet dict from reader.read_sheet
+    return blank_column([row[0] if row else None for row in sheet["rows"][4:10]])
+
+
+def blank_column(values):
+    values += [None] * (6 - len(values))
+    return all(value is None or str(value).strip() == "" for value in values)
+
+
+def is_text(value):
+    return isinstance(value, str) and value.strip() != ""
+
+
+def row_blocks(rows, size=block_rows):
+    block = []
+    for values in rows:
+        block.append(values)
+        if len(block) == size:
+            yield block
+            block = []
+    if block:
+        yield block
+
+
+def collapse_columns(rows):
+    # Collapse an iterable of row tuples (read lazily, block_rows at a time) into
+    # {"names", "balance"} columns, one entry per row from row 1 up to the last row with a
+    # balance. The balance is the first number in the row and the account names are the
+    # text cells to its left, joined with spaces; rows without a number get None for
+    # both, and names is None when there is no text to the left.
+    is_number = np.frompyfunc(is_amount, 1, 1)
+    is_name = np.frompyfunc(is_text, 1, 1)
+    names = []
+    balances = []
+    for block in row_blocks(rows):
+        width = max((len(values) for values in block), default=0)
+        table = np.full((len(block), max(width, 1)), None, dtype=object)
+        for i, values in enumerate(block):
+            table[i, :len(values)] = values
+
+        # Step 1: Find the first numeric value (balance column) of every row in the block
+        numeric = is_number(table).astype(bool)
+        has_balance = numeric.any(axis=1)
+        balance_column = numeric.argmax(axis=1)
+
+        # Step 2: Collect account names from the text cells to the left of the balance column
+        left = is_name(table).astype(bool) & (np.arange(table.shape[1]) < balance_column[:, None])
+        for i in range(len(block)):
+            if has_balance[i]:
+                names.append(" ".join(table[i, left[i]]).strip() or None)
+                balances.append(table[i, balance_column[i]])
+            else:
+                names.append(None)
+                balances.append(None)
+
+    last_row = max((i for i, balance in enumerate(balances, 1) if balance is not None), default=0)
+    return {"names": names[:last_row], "balance": balances[:last_row]}
+
+
+def cleaned_sheet(collapsed):
+    # Sheet dict (see reader.read_sheet) of the CleanedSheet: the header row, then the
+    # account names in column A and the balances in column B
+    rows = [cleaned_header] + list(zip(collapsed["names"], collapsed["balance"]))
+    return {"title": "CleanedSheet", "rows": rows, "max_row": len(rows), "max_column": 2}
+
+
+def add_cleaned_sheet(output, collapsed):
+    # Write the CleanedSheet, header first, and move it to the front of the workbook
+    clean_ws = output.create_sheet("CleanedSheet")
+    write_rows(clean_ws, (({col: value for col, value in enumerate(values, 1) if value is not None}, {})
+                          for values in cleaned_sheet(collapsed)["rows"]))
+    output.move_sheet(clean_ws.title, offset=-output.sheetnames.index(clean_ws.title))
+    return clean_ws
+
+
+def collapse_into(book, output):
+    # Collapse the active sheet of a workbook opened with reader.open_workbook and write the
+    # CleanedSheet to the output workbook; returns the collapsed columns
+    collapsed = collapse_columns(iter_sheet_rows(book))
+    add_cleaned_sheet(output, collapsed)
+    return collapsed
+
+
+def engine_sheet(book, output, collapse=False):
+    # Sheet dict the engines read: the active sheet of the input or, with collapse, its
+    # collapsed rows, which also go to a CleanedSheet at the front of the output. The
+    # collapsed columns are fed straight to the engine instead of through a saved file.
+    if not collapse:
+        return read_sheet(book)
+    return cleaned_sheet(collapse_into(book, output))
+
+
+def collapse_sheet(file_bytes, reader="openpyxl"):
+    # Adds a "CleanedSheet" in front of the workbook with the account names in column A and
+    # the balances in column B under a header row. The active sheet is read with the
+    # chosen reader (see reader.py); with "xml" the workbook is never loaded and the output
+    # is written through a write-only workbook (see writer.py).
+    book = open_workbook(file_bytes, reader)
+    output = output_workbook(book, "stream" if reader == "xml" else "workbook")
+    collapse_into(book, output)
+
+    # Save the workbook and return the processed data
+    return save_workbook(output)
@@ -0,0 +1,398 @@
+import re
+import threading
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+import numpy as np
+from openpyxl import load_workbook
+from .formatting import bold_font, changed_fill
+from .reader import close_workbook, open_workbook, read_columns, read_head, sheet_names
+from .result_cache import file_digest
+from .writer import save_workbook
+
+# Client data files are read through a small cache keyed by the SHA-256 of the file. The
+# header row is read first for the client names; building the eFocus file then loads only
+# columns A and B and the chosen client's column. Columns already loaded stay in the
+# cache, so picking another client from the same file only reads that client's column.
+# The cache holds at most max_client_files files and max_client_bytes of file data (the
+# newest file is always kept); an evicted file's workbook is closed. _client_data_lock
+# guards the cache itself and each entry's lock its workbook, which is read lazily.
+
+max_client_files = 8
+max_client_bytes = 64 * 1024 * 1024
+_client_data = OrderedDict()
+_client_data_bytes = 0
+_client_data_lock = threading.Lock()
+
+batch_outputs = ("zip", "workbook")  # See build_efocus_batch
+
+def normalize_item_code(value):
+    # Strip any "I" or leading zeros from a code
+    return str(value).lstrip("I0").strip()
+
+
+def build_item_index(focus_target_ws):
+    # Map each normalized code in FocusTarget column A to the first row it appears on
+    return index_item_codes(
+        focus_target_ws.iter_rows(min_row=1, max_row=focus_target_ws.max_row, max_col=1, values_only=True))
+
+
+def index_item_codes(rows):
+    # Same map from the column A values, one 1-tuple per row from row 1
+    item_index = {}
+    for target_row, (target_value,) in enumerate(rows, start=1):
+        item_index.setdefault(normalize_item_code(target_value), target_row)
+    return item_index
+
+
+def focus_matches(focus_ws, item_index):
+    # {FocusTarget row: value} for the summary rows of the Focus sheet whose code is in the index
+    matches = {}
+
+    # Loop through every summary row in columns I and J of the Focus sheet, from row 8
+    for focus_value, focus_value_j in focus_ws.iter_rows(min_row=8, max_row=focus_ws.max_row,
+                                                         min_col=9, max_col=10, values_only=True):
+        # If the cell has a value, look up the matching row in FocusTarget column A
+        if focus_value:
+            target_row = item_index.get(normalize_item_code(focus_value))
+
+            # If a match is found, the value from column J of Focus goes in column B of FocusTarget
+            if target_row is not None:
+                matches[target_row] = focus_value_j
+    return matches
+
+
+def match_and_copy_values(focus_ws, focus_target_ws):
+    for target_row, value in focus_matches(focus_ws, build_item_index(focus_target_ws)).items():
+        focus_target_ws.cell(row=target_row, column=2, value=value)
+
+
+
+def build_efocus_workbook(file_bytes, client_data_bytes, selected_client, reader="openpyxl"):
+    # Ensure the Focus file bytes are wrapped in BytesIO if not already
+    if not isinstance(file_bytes, BytesIO):
+        file_bytes = BytesIO(file_bytes)  # Wrap Focus file as BytesIO if not already
+
+    # Reset the file stream to the start before passing to openpyxl
+    file_bytes.seek(0)
+
+    # Load the Focus sheet from the uploaded file (file_bytes)
+    wb = load_workbook(filename=file_bytes)
+    focus_ws = wb['Focus']  # Assuming the Focus sheet is already available
+
+    # Find the column of the selected client name in the client data (C is column 3)
+    client_data = client_data_entry(client_data_bytes, reader)
+    if selected_client not in client_data["client_columns"]:
+        raise ValueError(f"Unknown client: {selected_client}")
+    client_column = client_data["client_columns"][selected_client]
+
+    # Load columns A and B and the selected client's column only (without headers)
+    columns = load_client_columns(client_data, (1, 2, client_column))
+
+    # Create the "FocusTarget" sheet in the original workbook
+    focus_target_ws = wb.create_sheet(title="FocusTarget")
+
+    # Copy column A from the client data file (rows 1 to 275) into "FocusTarget"
+    client_column_a = columns[1]  # Column A (no header)
+    for i, value in enumerate(client_column_a, start=1):
+        focus_target_ws.cell(row=i, column=1, value=value)
+
+    # Copy the selected client column from the client data (rows 1 to 275) into "FocusTarget"
+    client_column_data = columns[client_column]  # Selected client column
+    for i, value in enumerate(client_column_data, start=1):
+        focus_target_ws.cell(row=i, column=2, value=value)
+
+    # Set header for the new column B
+    focus_target_ws.cell(row=1, column=2, value=selected_client)
+
+    # Paste column B from client data into "FocusTarget" column C
+    client_column_b = columns[2]  # Column B
+    for i, value in enumerate(client_column_b, start=1):
+        focus_target_ws.cell(row=i, column=3, value=value)
+
+    # Now, copy the cell from Row 1, Column B into Row 4, Column E in FocusTarget
+    client_data_b1 = focus_target_ws.cell(row=1, column=2).value  # Get the value from Row 1, Column B of FocusTarget
+    focus_target_ws.cell(row=4, column=5, value=client_data_b1)  # Paste it into Row 4, Column E of FocusTarget
+
+    # Insert "FOCUS" into row 4, column G in all caps and make it bold
+    focus_target_ws.cell(row=4, column=7, value="FOCUS")  # Insert "FOCUS" into column G
+    focus_target_ws.cell(row=4, column=5).font = bold_font  # Make cell in column E bold
+    focus_target_ws.cell(row=4, column=7).font = bold_font  # Make cell in column G bold
+
+    # Add "Item Value" in row 1, column B
+    focus_target_ws.cell(row=1, column=2, value="Item Value")
+
+    # Bold all of row 1
+    for cell in focus_target_ws[1]:
+        cell.font = bold_font
+
+    # Call the function to process Focus and FocusTarget
+    match_and_copy_values(focus_ws, focus_target_ws)
+
+    # Rename the FocusTarget sheet
+    focus_target_ws.title = "Filing Items Focus"
+
+    # Save the modified workbook to a BytesIO object
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)  # Move the cursor to the beginning of the BytesIO object
+    return output
+
+
+def build_efocus_batch(file_bytes, client_data_bytes, clients=None, output="zip", reader="openpyxl"):
+    # "Filing Items Focus" sheets for several clients of a client data file at once (every
+    # client by default). "zip" gives a zip of the per-client workbooks, each the same file
+    # build_efocus_workbook makes; "workbook" gives one workbook with a sheet per client.
+    if output not in batch_outputs:
+        raise ValueError(f"Unknown batch output: {output}")
+
+    if not isinstance(file_bytes, BytesIO):
+        file_bytes = BytesIO(file_bytes)
+    file_bytes.seek(0)
+    wb = load_workbook(filename=file_bytes)
+    focus_ws = wb['Focus']
+
+    client_data = client_data_entry(client_data_bytes, reader)
+    client_columns = client_data["client_columns"]
+    clients = list(client_columns) if clients is None else list(clients)
+    for client in clients:
+        if client not in client_columns:
+            raise ValueError(f"Unknown client: {client}")
+
+    # Columns A and B and every client column come from one read of the file
+    columns = load_client_columns(client_data, [1, 2] + [client_columns[client] for client in clients])
+
+    # Column A is the same for every client, so the Focus values are matched once
+    column_a = columns[1] + [None] * (4 - len(columns[1]))  # FocusTarget runs at least to row 4
+    matches = focus_matches(focus_ws, index_item_codes((value,) for value in column_a))
+    values = client_matrix([columns[client_columns[client]] for client in clients], len(column_a), matches)
+
+    result = BytesIO()
+    if output == "zip":
+        with zipfile.ZipFile(result, "w", zipfile.ZIP_DEFLATED) as archive:
+            names = set()
+            for index, client in enumerate(clients):
+                focus_target_ws = wb.create_sheet(title="FocusTarget")
+                write_focus_target(focus_target_ws, client, columns[1], values[:, index].tolist(), columns[2])
+                focus_target_ws.title = "Filing Items Focus"
+                archive.writestr(unique_name(f"efocus_{safe_name(client)}", names) + ".xlsx",
+                                 save_workbook(wb).getvalue())
+                wb.remove(focus_target_ws)
+    else:
+        # Sheet titles are at most 31 characters and must not clash with the workbook's
+        # own sheets or with another client cut to the same title
+        names = {title.lower() for title in wb.sheetnames}
+        for index, client in enumerate(clients):
+            focus_target_ws = wb.create_sheet(title=unique_name(safe_name(client) or "Client", names, 31))
+            write_focus_target(focus_target_ws, client, columns[1], values[:, index].tolist(), columns[2])
+        wb.save(result)
+    result.seek(0)
+    return result
+
+
+def client_matrix(client_values, rows, matches):
+    # Column B of every client's FocusTarget as one (rows, clients) object array: the
+    # client's column, "Item Value" in row 1, then the matched Focus values across all
+    # clients at once
+    values = np.full((rows, len(client_values)), None, dtype=object)
+    for index, column in enumerate(client_values):
+        values[:len(column), index] = column
+    values[0, :] = "Item Value"
+    if matches:
+        target_rows = np.fromiter(matches, dtype=np.int64, count=len(matches)) - 1
+        matched = np.empty(len(matches), dtype=object)
+        matched[:] = list(matches.values())
+        values[target_rows, :] = matched[:, None]
+    return values
+
+
+def write_focus_target(focus_target_ws, client, column_a, column_values, column_b):
+    # Fill a FocusTarget sheet the way build_efocus_workbook does, from the client's column
+    # B values with the Focus values already matched in
+    for i, value in enumerate(column_a, start=1):
+        focus_target_ws.cell(row=i, column=1, value=value)
+    for i, value in enumerate(column_values, start=1):
+        focus_target_ws.cell(row=i, column=2, value=value)
+    for i, value in enumerate(column_b, start=1):
+        focus_target_ws.cell(row=i, column=3, value=value)
+
+    # Client name in E4 and "FOCUS" in G4, both bold, and all of row 1 bold
+    focus_target_ws.cell(row=4, column=5, value=client)
+    focus_target_ws.cell(row=4, column=7, value="FOCUS")
+    focus_target_ws.cell(row=4, column=5).font = bold_font
+    focus_target_ws.cell(row=4, column=7).font = bold_font
+    for cell in focus_target_ws[1]:
+        cell.font = bold_font
+
+
+def safe_name(client):
+    # Client name usable as a sheet title or file name
+    return re.sub(r'[\\/:*?"<>|\[\]]', "_", client).strip()
+
+
+def unique_name(name, names, limit=None):
+    # Add " (2)", " (3)", ... to a name already in `names`, and record it. With a limit
+    # the name is cut first so the result stays within that many characters.
+    candidate, number = name[:limit], 1
+    while candidate.lower() in names:
+        number += 1
+        suffix = f" ({number})"
+        candidate = name[:limit - len(suffix) if limit else None] + suffix
+    names.add(candidate.lower())
+    return candidate
+
+
+def list_client_names(client_data_bytes, reader="openpyxl"):
+    # Client names in a client data file, in column order
+    return list(client_data_entry(client_data_bytes, reader)["client_columns"])
+
+
+def client_data_entry(client_data_bytes, reader="openpyxl"):
+    # Cached entry of a client data file: the file, its first sheet opened read-only, the
+    # client columns read from its header row and the columns loaded so far
+    global _client_data_bytes
+    key = (file_digest(client_data_bytes), reader)
+    with _client_data_lock:
+        if key in _client_data:
+            _client_data.move_to_end(key)
+            return _client_data[key]
+
+    data = client_data_bytes.getvalue() if isinstance(client_data_bytes, BytesIO) else bytes(client_data_bytes)
+    book = open_workbook(data, reader, data_only=True, read_only=True)
+    title = sheet_names(book)[0]
+    header_rows = read_head(book, 0, rows=1)["rows"]
+    entry = {
+        "data": data,
+        "book": book,
+        "title": title,
+        "client_columns": read_client_columns(header_rows[0] if header_rows else ()),
+        "columns": {},
+        "reader": reader,
+        "lock": threading.Lock(),
+    }
+
+    evicted = []
+    with _client_data_lock:
+        if key in _client_data:  # Opened by another thread meanwhile
+            evicted.append(entry)
+            entry = _client_data[key]
+            _client_data.move_to_end(key)
+        else:
+            _client_data[key] = entry
+            _client_data_bytes += len(data)
+            while len(_client_data) > 1 and (len(_client_data) > max_client_files
+                                             or _client_data_bytes > max_client_bytes):
+                _, old = _client_data.popitem(last=False)
+                _client_data_bytes -= len(old["data"])
+                evicted.append(old)
+    for old in evicted:
+        close_client_data(old)
+    return entry
+
+
+def close_client_data(entry):
+    # Close the workbook of an entry; a caller still holding the entry reopens it
+    with entry["lock"]:
+        if entry["book"] is not None:
+            close_workbook(entry["book"])
+            entry["book"] = None
+
+
+def clear_client_data():
+    global _client_data_bytes
+    with _client_data_lock:
+        entries = list(_client_data.values())
+        _client_data.clear()
+        _client_data_bytes = 0
+    for entry in entries:
+        close_client_data(entry)
+
+
+def load_client_columns(entry, columns):
+    # Values of the given columns from row 1, reading only the ones not loaded yet
+    with entry["lock"]:
+        missing = [col for col in columns if col not in entry["columns"]]
+        if missing:
+            book = entry["book"]
+            if book is None:  # Evicted: read from the file and close it again
+                book = open_workbook(entry["data"], entry["reader"], data_only=True, read_only=True)
+            try:
+                entry["columns"].update(read_columns(book, missing, entry["title"])["columns"])
+            finally:
+                if book is not entry["book"]:
+                    close_workbook(book)
+        return {col: entry["columns"][col] for col in columns}
+
+
+def read_client_columns(header):
+    # Client names sit in row 1, every other column from column C; maps each name to its
+    # column number (the first one if a name repeats)
+    client_columns = {}
+    for col in range(2, len(header), 2):
+        cell_value = str(header[col]).strip() if header[col] is not None else ""
+        if cell_value:
+            client_columns.setdefault(cell_value, col + 1)
+    return client_columns
+
+
+def apply_client_answers(file_bytes, filing_frequency, monthly_income, ending_equity_balance,
+                         fidelity_bond_haircut, undue_concentration_haircut, debt_securities_haircut,
+                         other_securities_haircut, exempted_securities_haircut):
+    # Write the client answers (filing frequency, income, equity and haircuts) into the Filing Items Focus sheet
+    if not isinstance(file_bytes, BytesIO):
+        file_bytes = BytesIO(file_bytes)
+    file_bytes.seek(0)
+
+    wb = load_workbook(file_bytes)
+    focus_ws = wb["Filing Items Focus"]  # Assuming the sheet is named "Filing Items Focus"
+
+    # Mapping filing_frequency: "Monthly" = 1, "Quarterly" = 3
+    filing_value = 1 if filing_frequency == "Monthly" else 3
+    
+    # Get the current value in row 165, column B (Filing Frequency)
+    current_value = focus_ws.cell(row=165, column=2).value
+
+    # Check if the value in the cell differs from the user's input
+    if current_value != filing_value:
+        focus_ws.cell(row=165, column=2, value=filing_value)
+        
+        # Apply red highlight (only if the value differs)
+        focus_ws.cell(row=165, column=2).fill = changed_fill  # Highlight in red if different
+
+    # Apply monthly income to row 191, column B (only if the value exists)
+    if monthly_income is not None:
+        focus_ws.cell(row=191, column=2, value=monthly_income)
+
+    # Apply ending equity balance to row 199, column B (only if the value exists)
+    if ending_equity_balance is not None:
+        focus_ws.cell(row=199, column=2, value=ending_equity_balance)
+
+    # Apply fidelity bond haircut to row 138, column B (only if the value exists)
+    if fidelity_bond_haircut is not None:
+        focus_ws.cell(row=138, column=2, value=fidelity_bond_haircut)
+
+
+    # Apply undue concentration haircut to row 142, column B (only if the value exists)
+    if undue_concentration_haircut is not None:
+        focus_ws.cell(row=142, column=2, value=undue_concentration_haircut)
+
+
+    # Apply debt securities haircut to row 146, column B (only if the value exists)
+    if debt_securities_haircut is not None:
+        focus_ws.cell(row=146, column=2, value=debt_securities_haircut)
+
+
+    # Apply other securities haircut to row 147, column B (only if the value exists)
+    if other_securities_haircut is not None:
+        focus_ws.cell(row=147, column=2, value=other_securities_haircut)
+
+
+    # Apply exempted securities haircut to row 148, column B (only if the value exists)
+    if exempted_securities_haircut is not None:
+        focus_ws.cell(row=148, column=2, value=exempted_securities_haircut)
+
+    # Save the updated workbook
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)  # Reset the cursor position to the beginning
+    return output
@@ -0,0 +1,149 @@
+import re
+import numpy as np
+from io import BytesIO
+from openpyxl import load_workbook
+from openpyxl.utils import get_column_letter
+from openpyxl.utils.cell import coordinate_to_tuple
+from .ledger import replace_values, sheet_values
+from .formatting import flagged_fill, no_fill
+
+# Flagging of "Total (...)" cells in columns A-H. The scan uses a read-only workbook, so
+# finding the cells does not build the full object model; the yellow fill is applied
+# later, in the pass that loads and saves the workbook anyway. Cleaning works from the
+# same flagged list, so it only touches the flagged cells. The wizard scans and cleans
+# its ledger table instead (see ledger.py) and hands the flagged list to the
+# transformation, which applies the edits to the workbook it opens for its output.
+
+parentheses_pattern = re.compile(r'\s*\([^)]*\)')
+
+
+def is_flagged_total(value):
+    # A "Total" label that still carries a code in parentheses
+    return "Total" in value and "(" in value and ")" in value
+
+
+def scan_flagged_totals(file_bytes):
+    # Collect (sheet, coordinate, value) for every flagged cell without loading the full workbook
+    if isinstance(file_bytes, BytesIO):
+        file_bytes.seek(0)
+    else:
+        file_bytes = BytesIO(file_bytes)
+
+    wb = load_workbook(filename=file_bytes, read_only=True, data_only=True)
+    flagged_cells = []
+
+    for ws in wb.worksheets:
+        for row in ws.iter_rows(min_row=1, min_col=1, max_col=8):
+            for cell in row:
+                value = str(cell.value) if cell.value else ""
+                if is_flagged_total(value):
+                    flagged_cells.append((ws.title, cell.coordinate, value))
+
+    wb.close()
+    return flagged_cells
+
+
+def highlight_flagged_totals(file_bytes, flagged_cells):
+    # Write pass: load the workbook once, fill the flagged cells yellow and save it
+    if isinstance(file_bytes, BytesIO):
+        file_bytes.seek(0)
+    else:
+        file_bytes = BytesIO(file_bytes)
+
+    wb = load_workbook(filename=file_bytes, data_only=True)
+    highlight_cells(wb, flagged_cells)
+
+    output_stream = BytesIO()
+    wb.save(output_stream)
+    output_stream.seek(0)
+    return output_stream
+
+
+def highlight_cells(wb, flagged_cells):
+    for sheet, coord, _ in flagged_cells:
+        wb[sheet][coord].fill = flagged_fill
+
+
+def highlight_and_flag_totals(file_bytes):
+    # Scan for the flagged cells, then write the highlighted copy
+    flagged_cells = scan_flagged_totals(file_bytes)
+    return highlight_flagged_totals(file_bytes, flagged_cells), flagged_cells
+
+
+def remove_parentheses_content(text):
+    return parentheses_pattern.sub('', text).strip()
+
+
+def clean_value(value):
+    # Cleaned text of a flagged cell, or None when the cell no longer holds a Total label
+    if value and "Total" in str(value):
+        return remove_parentheses_content(str(value))
+    return None
+
+
+def clean_cells(wb, flagged_cells):
+    for sheet, coord, _ in flagged_cells:
+        cell = wb[sheet][coord]
+        cleaned = clean_value(cell.value)
+        if cleaned is not None:
+            cell.value = cleaned  # Clean text
+            cell.fill = no_fill  # Reset the highlight fill
+
+
+def clean_flagged_totals(file_bytes, flagged_cells=None):
+    # Remove the parentheses from the flagged cells only and reset their highlight
+    if flagged_cells is None:
+        flagged_cells = scan_flagged_totals(file_bytes)
+
+    if isinstance(file_bytes, BytesIO):
+        file_bytes.seek(0)
+    else:
+        file_bytes = BytesIO(file_bytes)
+
+    wb = load_workbook(filename=file_bytes, data_only=True)
+    clean_cells(wb, flagged_cells)
+
+    # Save the updated file and return as BytesIO
+    output_stream = BytesIO()
+    wb.save(output_stream)
+    output_stream.seek(0)
+    return output_stream
+
+
+def apply_flagged_totals(book, flagged_cells, clean=False):
+    # Step 4 applied to a workbook opened with reader.open_workbook (data_only, as the
+    # saved step left it) instead of through a saved copy: clean or highlight the cells
+    if not flagged_cells:
+        return
+    if book["reader"] != "openpyxl":
+        raise ValueError("The Total cell edits need the openpyxl reader")
+    if clean:
+        clean_cells(book["workbook"], flagged_cells)
+    else:
+        highlight_cells(book["workbook"], flagged_cells)
+
+
+def scan_ledger_totals(ledger):
+    # Same scan over the ledger table (see ledger.py), one type check pass per sheet
+    flagged_cells = []
+    check = np.frompyfunc(lambda value: is_flagged_total(str(value) if value else ""), 1, 1)
+    for sheet in ledger["sheets"]:
+        values = sheet_values(sheet)[:, :8]
+        for row, col in zip(*np.nonzero(check(values).astype(bool))):
+            value = str(values[row, col])
+            flagged_cells.append((sheet["title"], f"{get_column_letter(col + 1)}{row + 1}", value))
+    return flagged_cells
+
+
+def clean_ledger(ledger, flagged_cells):
+    # Ledger with the flagged cells cleaned, as clean_flagged_totals leaves the file
+    for title in dict.fromkeys(sheet for sheet, _, _ in flagged_cells):
+        sheet = next(sheet for sheet in ledger["sheets"] if sheet["title"] == title)
+        values = sheet_values(sheet).copy()
+        for _, coord, _ in (cell for cell in flagged_cells if cell[0] == title):
+            row, col = coordinate_to_tuple(coord)
+            cleaned = clean_value(values[row - 1, col - 1])
+            if cleaned is not None:
+                values[row - 1, col - 1] = cleaned
+        ledger = replace_values(ledger, title, values)
+    return ledger
@@ -0,0 +1,127 @@
+from openpyxl.formatting.rule import FormulaRule
+from openpyxl.styles import PatternFill, Font
+from .classification import code_table
+from .openpyxl_compat import existing_cell
+
+# Shared style objects and the row formatting used by the openpyxl (cell-by-cell) P&L
+# and balance steps. The summary header and every per-row rule (rounding, comma formats,
+# bold totals) are applied in one sweep per sheet instead of one loop per rule.
+#
+# Every writer (sheet steps and columnar engines) takes its fills and fonts from the
+# registry below instead of building new PatternFill/Font objects on each call.
+
+comma_format = "#,##0"
+black_fill = PatternFill(start_color="000000", end_color="000000", fill_type="solid")
+white_font = Font(color="FFFFFF")
+bold_font = Font(bold=True)
+asset_fill = PatternFill(start_color="C6E0B4", end_color="C6E0B4", fill_type="solid")  # Assets (green)
+liability_fill = PatternFill(start_color="F8CBAD", end_color="F8CBAD", fill_type="solid")  # Liabilities (orange)
+equity_fill = PatternFill(start_color="BDD7EE", end_color="BDD7EE", fill_type="solid")  # Ownership Equity (blue)
+income_fill = PatternFill(start_color="D9F2D1", end_color="D9F2D1", fill_type="solid")  # Income (light green)
+expense_fill = PatternFill(start_color="F9E2D2", end_color="F9E2D2", fill_type="solid")  # Expense (light red)
+flagged_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")  # Flagged Total cells (yellow)
+no_fill = PatternFill()  # Cleared highlight
+changed_fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")  # Changed eFocus answers (red)
+
+styles = {
+    "header_fill": black_fill,
+    "header_font": white_font,
+    "bold_total": bold_font,
+    "comma": comma_format,
+    "asset": asset_fill,
+    "liability": liability_fill,
+    "equity": equity_fill,
+    "income": income_fill,
+    "expense": expense_fill,
+    "flagged": flagged_fill,
+    "changed": changed_fill,
+}
+
+# "fill" colors each row's cells C:F; "conditional" adds one conditional-formatting rule
+# per category over the whole C:F range, so the cost no longer grows with the row count
+color_modes = ("fill", "conditional")
+
+
+def is_number(value):
+    return isinstance(value, (int, float))
+
+
+def format_summary_header(ws, title):
+    # Summary headers in I7:K7 (black with white text), then column J is deleted so the
+    # amounts in K move to J
+    ws["I7"].value = title
+    ws["J7"].value = ""
+    ws["K7"].value = "Amount"
+    for coord in ("I7", "J7", "K7"):
+        ws[coord].fill = black_fill
+        ws[coord].font = white_font
+    ws.delete_cols(10)
+
+
+def format_body_row(ws, row):
+    # Round and comma format the summary amounts (columns I and J), comma format the
+    # amounts in D and F and bold the "Total" rows in column C. Cells that don't exist
+    # have no value, so nothing would be formatted on them anyway.
+    for col in (9, 10):
+        cell = existing_cell(ws, row, col)
+        if cell is not None and is_number(cell.value):
+            cell.value = round(cell.value, 0)
+            cell.number_format = comma_format
+
+    for col in (6, 4):
+        cell = existing_cell(ws, row, col)
+        if cell is not None and is_number(cell.value):
+            cell.number_format = comma_format
+
+    cell = existing_cell(ws, row, 3)
+    if cell is not None and cell.value and "total" in str(cell.value).lower():
+        cell.font = bold_font
+
+
+def check_color_mode(color_mode):
+    if color_mode not in color_modes:
+        raise ValueError(f"Unknown color mode: {color_mode}")
+
+
+def code_number_formula(first_row):
+    # Excel version of the code parsing: the number in column C once the word "Total" is
+    # dropped, or -1 when what is left is not all digits (blank, text, "940/09"). The
+    # zero-padded round trip rejects text Excel would otherwise read as a date or decimal.
+    text = f'TRIM(SUBSTITUTE($C{first_row},"Total",""))'
+    return f'IF(IFERROR(TEXT(--{text},REPT("0",LEN({text})))={text},FALSE),--{text},-1)'
+
+
+def add_color_rules(ws, first_row, last_row, rules):
+    # One rule per (condition, style name) over C:F; the first matching rule wins
+    if last_row < first_row:
+        return
+    cell_range = f"C{first_row}:F{last_row}"
+    for condition, name in rules:
+        ws.conditional_formatting.add(cell_range, FormulaRule(formula=[condition], fill=styles[name], stopIfTrue=True))
+
+
+def range_rules(scheme, first_row, condition=None):
+    # One (condition, style name) rule per range of the code table, in priority order
+    code = code_number_formula(first_row)
+    rules = []
+    for category, low, high in code_table(scheme)["ranges"]:
+        parts = [condition] if condition else []
+        parts.append(f"{code}>={low}")
+        if high is not None:
+            parts.append(f"{code}<={high}")
+        rules.append((f"AND({','.join(parts)})", category))
+    return rules
+
+
+def add_balance_color_rules(ws, first_row, last_row):
+    # Asset, liability and equity ranges from the balance code table
+    add_color_rules(ws, first_row, last_row, range_rules("balance", first_row))
+
+
+def add_income_expense_color_rules(ws, first_row, last_row, ssoi):
+    # Income/expense ranges from the P&L or SSOI code table; SSOI rows need an amount in D
+    if ssoi:
+        rules = range_rules("ssoi", first_row, f"ISNUMBER($D{first_row})")
+    else:
+        rules = range_rules("pnl", first_row)
+    add_color_rules(ws, first_row, last_row, rules)
@@ -0,0 +1,145 @@
+import re
+from io import BytesIO
+from openpyxl import load_workbook
+from .collapse import cleaned_sheet, collapse_columns
+from .ledger import ledger_sheet
+from .reader import iter_sheet_rows, open_workbook
+
+# Account labels look like "Description (focus/ssoi)" on a P&L, e.g. "Office Rent (4070/29)",
+# and "Description (code)" on a Balance Sheet, e.g. "Cash (200)". Every engine tokenizes
+# them here, once per row: one compiled pattern splits the description from the code part
+# and a second one splits the Focus code from the SSOI code. A row becomes (description,
+# focus_code, ssoi_code, raw) with the codes as ints (None when a code isn't a number).
+# The cleaned code text is kept next to the ints, because the sheets show the codes as
+# written (leading zeros included). Labels that don't parse as the filing type's layout
+# are collected in a report instead of raising.
+
+label_pattern = re.compile(r"(?P<description>[^(]*)\((?P<codes>.*)", re.DOTALL)
+codes_pattern = re.compile(r"(?P<focus>[^/]*)/(?P<ssoi>[^/]*)", re.DOTALL)
+digits_pattern = re.compile(r"[0-9]+")
+
+label_formats = {"pnl": "Description (focus/ssoi)", "balance": "Description (code)"}
+
+
+def check_filing_type(filing_type):
+    if filing_type not in label_formats:
+        raise ValueError(f"Unknown filing type: {filing_type}")
+
+
+def code_number(text):
+    # Int value of a code written only with digits, None otherwise
+    if text is not None and digits_pattern.fullmatch(str(text)):
+        return int(text)
+    return None
+
+
+def split_codes(code_part):
+    # "focus/ssoi)" -> ("focus", "ssoi"), stripped and without parentheses; None without a "/"
+    match = codes_pattern.match(str(code_part))
+    if match is None:
+        return None
+    focus = match.group("focus").strip().replace("(", "").replace(")", "")
+    ssoi = match.group("ssoi").strip().replace(")", "")
+    return focus, ssoi
+
+
+def split_label(label):
+    # (description, code part) of a label with a "(", None otherwise
+    if not label:
+        return None
+    match = label_pattern.match(str(label))
+    if match is None:
+        return None
+    return match.group("description").strip(), match.group("codes").strip()
+
+
+def label_problem(code_part, codes, filing_type="pnl"):
+    # Why a label with a "(" could not be read as "(focus/ssoi)" (P&L) or "(code)" (Balance
+    # Sheet), or None
+    if filing_type == "balance":
+        if not code_part.endswith(")"):
+            return "no closing ')'"
+        code = code_part.replace("(", "").replace(")", "").strip()
+        if code_number(code) is None:
+            return f"Code {code!r} is not a number"
+        return None
+
+    if codes is None:
+        return "no '/' between the Focus and SSOI codes"
+    if not code_part.endswith(")"):
+        return "no closing ')'"
+    if code_number(codes[0]) is None:
+        return f"Focus code {codes[0]!r} is not a number"
+    if code_number(codes[1]) is None:
+        return f"SSOI code {codes[1]!r} is not a number"
+    return None
+
+
+def tokenize_label(label):
+    # (description, focus_code, ssoi_code, raw) for one label
+    token = tokenize_labels([label])
+    return (token["description"][0], token["focus_code"][0], token["ssoi_code"][0], label)
+
+
+def tokenize_labels(labels, first_row=1, filing_type="pnl"):
+    # Tokenize a whole column in one pass. Returns column arrays: description, the code
+    # part without parentheses ("codes"), the cleaned Focus/SSOI code text ("focus_text",
+    # "ssoi_text", None without a "/"), the int codes and the raw labels, plus "malformed":
+    # a (row, label, problem) entry for every label with a "(" that isn't "(focus/ssoi)",
+    # or "(code)" for a "balance" filing.
+    check_filing_type(filing_type)
+    tokens = {"description": [], "codes": [], "focus_text": [], "ssoi_text": [],
+              "focus_code": [], "ssoi_code": [], "raw": [], "malformed": []}
+
+    for row, label in enumerate(labels, start=first_row):
+        split = split_label(label)
+        if split is None:
+            description, code_part, codes = label, None, None
+        else:
+            description, code_part = split
+            codes = split_codes(code_part)
+            problem = label_problem(code_part, codes, filing_type)
+            if problem is not None:
+                tokens["malformed"].append((row, label, problem))
+
+        focus_text, ssoi_text = codes if codes is not None else (None, None)
+        tokens["description"].append(description)
+        tokens["codes"].append(code_part.replace("(", "").replace(")", "") if code_part else code_part)
+        tokens["focus_text"].append(focus_text)
+        tokens["ssoi_text"].append(ssoi_text)
+        tokens["focus_code"].append(code_number(focus_text))
+        tokens["ssoi_code"].append(code_number(ssoi_text))
+        tokens["raw"].append(label)
+
+    return tokens
+
+
+def scan_labels(file_bytes, collapse=False, filing_type="pnl"):
+    # Malformed labels in column A of the active sheet, read without loading the full workbook;
+    # with collapse, the labels of the sheet collapse_sheet would make from it
+    if collapse:
+        book = open_workbook(file_bytes, "xml", data_only=True)
+        return sheet_labels(cleaned_sheet(collapse_columns(iter_sheet_rows(book))), filing_type)
+
+    if isinstance(file_bytes, BytesIO):
+        file_bytes.seek(0)
+    else:
+        file_bytes = BytesIO(file_bytes)
+
+    wb = load_workbook(filename=file_bytes, read_only=True, data_only=True)
+    labels = [row[0] if row else None for row in wb.active.iter_rows(min_col=1, max_col=1, values_only=True)]
+    wb.close()
+    return tokenize_labels(labels, filing_type=filing_type)["malformed"]
+
+
+def scan_ledger_labels(ledger, collapse=False, filing_type="pnl"):
+    # Same report for the active sheet of the ledger table (see ledger.py)
+    sheet = ledger_sheet(ledger)
+    if collapse:
+        sheet = cleaned_sheet(collapse_columns(sheet["rows"]))
+    return sheet_labels(sheet, filing_type)
+
+
+def sheet_labels(sheet, filing_type="pnl"):
+    # Malformed labels in column A of a sheet dict (see reader.read_sheet)
+    return tokenize_labels([row[0] if row else None for row in sheet["rows"]], filing_type=filing_type)["malformed"]
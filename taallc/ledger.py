@@ -0,0 +1,79 @@
+import os
+import tempfile
+import numpy as np
+from .reader import active_title, open_workbook, read_sheet, worksheet_titles
+
+# Ledger table passed between the wizard steps. The upload is parsed once (xml reader,
+# cached values of formulas, as the saved steps used to leave them) into one 2-D object
+# array of cell values per worksheet, and the steps that only look at the values (the
+# Total cell scan, the collapse check, the label report) read the table instead of
+# parsing the xlsx again. The steps that change the file are recorded and applied when
+# the transformation opens the workbook to write its output (see flag_totals.py), so the
+# only xlsx written is the one that is downloaded.
+#
+# A large table is spilled to a .npy file in the temp directory and read back when a
+# step needs its values; the ledger dict then holds the path instead of the array.
+
+spill_cells = 2_000_000  # Tables with more cells than this go to disk
+
+
+def read_ledger(file_bytes, reader="xml"):
+    # {"sheets": [{"title", "values"}], "active"}; "active" indexes "sheets"
+    book = open_workbook(file_bytes, reader, data_only=True)
+    titles = worksheet_titles(book)
+    active = active_title(book)
+    sheets = []
+    for title in titles:
+        sheet = read_sheet(book, title)
+        values = np.empty((sheet["max_row"], sheet["max_column"]), dtype=object)
+        for i, row in enumerate(sheet["rows"]):
+            values[i, :len(row)] = row
+        sheets.append({"title": title, "values": values})
+    return {"sheets": sheets, "active": titles.index(active) if active in titles else 0}
+
+
+def sheet_values(sheet):
+    # Cell values of a ledger sheet, read back from disk if the sheet was spilled
+    if "path" in sheet:
+        return np.load(sheet["path"], allow_pickle=True)
+    return sheet["values"]
+
+
+def ledger_sheet(ledger, title=None):
+    # Sheet dict (see reader.read_sheet) of the named or active ledger sheet
+    sheets = ledger["sheets"]
+    sheet = sheets[ledger["active"]] if title is None else next(sheet for sheet in sheets if sheet["title"] == title)
+    values = sheet_values(sheet)
+    max_row, max_column = values.shape
+    return {"title": sheet["title"], "rows": [tuple(row) for row in values.tolist()], "max_row": max_row,
+            "max_column": max_column}
+
+
+def replace_values(ledger, title, values):
+    # Copy of the ledger with new values for one sheet; the other sheets are shared
+    sheets = [{"title": title, "values": values} if sheet["title"] == title else sheet for sheet in ledger["sheets"]]
+    return dict(ledger, sheets=sheets)
+
+
+def spill_ledger(ledger, directory=None, limit=spill_cells):
+    # Move the values of a ledger bigger than `limit` cells to .npy files; the object
+    # arrays are pickled, so only files written here are loaded back
+    if sum(sheet_values(sheet).size for sheet in ledger["sheets"] if "path" not in sheet) <= limit:
+        return ledger
+    sheets = []
+    for sheet in ledger["sheets"]:
+        if "path" not in sheet:
+            handle, path = tempfile.mkstemp(suffix=".npy", prefix="ledger_", dir=directory)
+            with os.fdopen(handle, "wb") as f:
+                np.save(f, sheet["values"], allow_pickle=True)
+            sheet = {"title": sheet["title"], "path": path}
+        sheets.append(sheet)
+    return dict(ledger, sheets=sheets)
+
+
+def drop_ledger(ledger, keep=()):
+    # Delete the files of a spilled ledger, except the ones the ledgers in `keep` still use
+    kept = {sheet["path"] for other in keep for sheet in other["sheets"] if "path" in sheet}
+    for sheet in ledger["sheets"]:
+        if "path" in sheet and sheet["path"] not in kept and os.path.exists(sheet["path"]):
+            os.remove(sheet["path"])
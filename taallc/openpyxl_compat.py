@@ -0,0 +1,38 @@
+from copy import copy
+from openpyxl.styles.cell_style import StyleArray
+
+# The few openpyxl internals the package relies on, all in one place (see the openpyxl
+# pin in requirements.txt). Everything else goes through openpyxl's public API.
+#   Style arrays    a cell's style as the ids into the workbook's style lists. Moving
+#                   these is what lets sheet_rows.py move blocks of rows: copying the
+#                   font, fill, border, alignment, number format and protection one by
+#                   one through the public attributes is more than ten times slower.
+#   Stylesheets     with the xml reader the input's style ids are kept (see writer.py),
+#                   so cells and conditional formatting rules are styled by id.
+#   Existing cells  looking a cell up without creating it; ws.cell and iter_rows create
+#                   every cell they touch, which then gets saved with the sheet.
+
+
+def cell_style(cell):
+    # Copy of a cell's style array
+    return copy(cell._style)
+
+
+def set_cell_style(cell, style):
+    # Give a cell a style array from cell_style or stylesheet_style (None for no style)
+    cell._style = copy(style) if style is not None else StyleArray()
+
+
+def stylesheet_style(wb, style_id):
+    # Style array of a cell style id (an "s" attribute) of the workbook's stylesheet
+    return wb._cell_styles[style_id]
+
+
+def differential_style(wb, dxf_id):
+    # DifferentialStyle of a dxfId of the workbook's stylesheet
+    return wb._differential_styles[dxf_id]
+
+
+def existing_cell(ws, row, col):
+    # Cell of a worksheet if it exists, else None
+    return ws._cells.get((row, col))
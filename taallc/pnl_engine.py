@@ -0,0 +1,460 @@
+import numpy as np
+from .subtotals import build_subtotals
+from .sheet_rows import sort_code_key
+from .profiling import profile_stage
+from .labels import tokenize_labels, split_codes
+from .classification import code_table, category_names
+from .totals import category_totals, subtotal_mask, amount_cents, from_cents
+from .collapse import engine_sheet
+from .writer import check_writer, output_workbook, write_rows
+from .formatting import (black_fill, white_font, bold_font, income_fill, expense_fill, comma_format,
+                         check_color_mode, add_income_expense_color_rules)
+
+# Columnar P&L engine: the active sheet is parsed once into column arrays, every
+# split/sort/subtotal/categorize step of run_full_pl_macro works on those arrays,
+# and the Focus and SSOI sheets are written out in a single pass at the end.
+# Every step keeps the row windows of the original openpyxl macro (rows 8..max_row
+# of the original sheet) so the written sheets match its layout, except the income and
+# expense sums: they count every row, also the ones the header and subtotal rows push
+# past the window, which the macro left out.
+
+
+def is_number(value):
+    return isinstance(value, (int, float))
+
+
+def is_blank(value):
+    return value is None or value == ""
+
+
+def format_ssoi_id(value):
+    # Same as the SSOI column C text formatting: leading zero for one character, apostrophe otherwise
+    val = str(value).strip() if value is not None else ""
+    if len(val) == 1:
+        return f"0{val}"
+    elif len(val) >= 2:
+        return f"'{val}"
+    return value
+
+
+def clean_ssoi_code(value):
+    # Same as clean_ss01_column: drop the apostrophe and any leading zeros
+    cell_value = str(value)
+    if cell_value.startswith("'"):
+        cleaned_value = cell_value.lstrip("'0")
+        return cleaned_value if cleaned_value != "" else "0"
+    return value
+
+
+def strip_code(value):
+    # Strip out the slash and closing parenthesis left over from the split
+    if value:
+        return str(value).replace("/", "").replace(")", "")
+    return value
+
+
+def pl_label_codes(code_part, focus_text, ssoi_text, b_value, c_value):
+    # Focus and SSOI code of one row from its tokenized label. Without a "(" in column A,
+    # column B can still hold "focus/ssoi"; otherwise the codes fall back to column C
+    # (text formatted for the Focus code).
+    if focus_text is None and code_part is None and b_value:
+        codes = split_codes(b_value)
+        if codes is not None:
+            focus_text, ssoi_text = codes
+    if focus_text is None:
+        return strip_code(format_ssoi_id(c_value)), strip_code(c_value)
+    return focus_text, ssoi_text
+
+
+def read_pl_columns(sheet):
+    # Parse a sheet read by reader.read_sheet into column arrays (index 0 is row 1 of the
+    # sheet); the labels in column A are tokenized in one pass
+    max_row = sheet["max_row"]
+    rows = [tuple(values) + (None,) * (4 - len(values)) for values in sheet["rows"]]
+    tokens = tokenize_labels([values[0] for values in rows])
+
+    columns = {
+        "description": tokens["description"],
+        "focus_code": [],
+        "ssoi_code": [],
+        "amount": [],
+        "cents": [],  # The amounts as int cents, which every sum works on
+        "extra": [],  # Columns E onwards, which end up in column G onwards
+        "max_row": max_row,
+        "malformed": tokens["malformed"],
+    }
+
+    for index, values in enumerate(rows):
+        focus_code, ssoi_code = pl_label_codes(tokens["codes"][index], tokens["focus_text"][index],
+                                               tokens["ssoi_text"][index], values[1], values[2])
+        columns["focus_code"].append(focus_code)
+        columns["ssoi_code"].append(ssoi_code)
+        columns["amount"].append(values[1])
+        columns["extra"].append(values[4:])
+
+    columns["cents"] = amount_cents(columns["amount"])
+    return columns
+
+
+def new_sheet_table(columns, code_key):
+    # Per-sheet copy of the arrays; subtotal rows are appended to the end
+    return {
+        "code": list(columns[code_key]),
+        "amount": list(columns["amount"]),
+        "cents": list(columns["cents"]),
+        "description": list(columns["description"]),
+        "extra": list(columns["extra"]),
+    }
+
+
+def add_table_row(table, code, cents):
+    # Subtotal row; the sum is kept in cents and written in dollars
+    table["code"].append(code)
+    table["amount"].append(from_cents(cents))
+    table["cents"].append(cents)
+    table["description"].append(None)
+    table["extra"].append(())
+    return len(table["code"]) - 1
+
+
+def row_code(table, entry):
+    return table["code"][entry[0]] if entry is not None and entry[0] is not None else None
+
+
+def row_amount(table, entry):
+    return table["amount"][entry[0]] if entry is not None and entry[0] is not None else None
+
+
+def row_cents(table, entry):
+    return table["cents"][entry[0]] if entry is not None and entry[0] is not None else None
+
+
+def window_size(max_row):
+    # Number of rows between row 8 and max_row (the window every stage works in)
+    return max(max_row - 7, 0)
+
+
+def amount_key(amount):
+    return float(amount) if is_number(amount) else float('-inf')
+
+
+def sort_focus_rows(table, body, max_row):
+    # Rows in the window with an empty code are dropped, the rest are sorted by code
+    win = window_size(max_row)
+    kept = [entry for entry in body[:win] if not is_blank(row_code(table, entry))]
+    body = kept + body[win:]
+
+    window = body[:win]
+    rows = [entry for entry in window if row_code(table, entry) is not None]
+    rows.sort(key=lambda entry: sort_code_key(row_code(table, entry)))
+    return rows + [None] * (len(window) - len(rows)) + body[win:]
+
+
+def secondary_sort_focus_rows(table, body, max_row):
+    # Sort by code ascending, then by amount descending for the same code
+    win = window_size(max_row)
+    window = body[:win]
+    rows = [entry for entry in window if not is_blank(row_code(table, entry))]
+    rows.sort(key=lambda entry: (row_code(table, entry), -amount_key(row_amount(table, entry))))
+    return rows + [None] * (len(window) - len(rows)) + body[win:]
+
+
+def secondary_sort_ssoi_rows(table, body, max_row):
+    # Numeric codes sort first, then alphanumeric codes by code and amount descending
+    win = window_size(max_row)
+    window = body[:win]
+    numeric_rows = []
+    alphanumeric_rows = []
+    for entry in window:
+        code = row_code(table, entry)
+        if is_blank(code):
+            continue
+        if str(code).replace('.', '', 1).isdigit():
+            numeric_rows.append(entry)
+        else:
+            alphanumeric_rows.append(entry)
+
+    numeric_rows.sort(key=lambda entry: row_code(table, entry))
+    alphanumeric_rows.sort(key=lambda entry: (row_code(table, entry), -amount_key(row_amount(table, entry))))
+
+    # Rows are written back from row 8 without clearing the rest of the window
+    rows = numeric_rows + alphanumeric_rows
+    return rows + window[len(rows):] + body[win:]
+
+
+def format_rows(body, max_row):
+    # Columns D and F get the comma format on every row up to max_row; the flag moves with the row
+    win = window_size(max_row)
+    body = body + [None] * (win - len(body))
+    return [(entry[0] if entry is not None else None, position < win) for position, entry in enumerate(body)]
+
+
+def subtotal_rows(table, body, max_row):
+    # One pass over the sorted rows, adding a "<code> Total" row after each group
+    body, subtotals = build_subtotals(
+        body,
+        lambda entry: row_code(table, entry),
+        lambda entry: row_cents(table, entry),
+        lambda code, total_sum: (add_table_row(table, f"{code} Total", total_sum), False),
+        window=window_size(max_row),
+        blank_row=(None, False),
+    )
+    return body
+
+
+def delete_blank_entries(table, body, max_row):
+    # Drop rows in the window where both the code and the amount are blank
+    win = window_size(max_row)
+    kept = [entry for entry in body[:win]
+            if not (is_blank(row_code(table, entry)) and is_blank(row_amount(table, entry)))]
+    return kept + body[win:]
+
+
+def categorize_rows(table, body, max_row, ssoi):
+    # Income/expense sums over every row of the body, with every code classified at once
+    # (see classification.py: P&L income is below 4000, SSOI income is 11 or less). The
+    # subtotal rows are left out of the sums, which are in cents (see totals.py). The fills
+    # and the last rows, which place the totals, stay in the window.
+    win = min(window_size(max_row), len(body))
+    codes = [row_code(table, entry) for entry in body]
+    amounts = [row_amount(table, entry) for entry in body]
+    scheme_table = code_table("ssoi" if ssoi else "pnl")
+    present = np.fromiter((amount is not None for amount in amounts), dtype=bool, count=len(amounts))
+    present[win:] = False
+    cents = [row_cents(table, entry) for entry in body]
+    indices, sums, last_rows = category_totals(scheme_table, codes, cents, subtotals=subtotal_mask(codes), rows=present)
+
+    fills = {}
+    for position, category in enumerate(category_names(scheme_table, indices[:win])):
+        # SSOI rows are only colored when they have an amount
+        if category is not None and (is_number(amounts[position]) or not ssoi):
+            fills[position + 8] = income_fill if category == "income" else expense_fill
+
+    last_income_row = last_rows["income"] + 8 if last_rows["income"] is not None else None
+    last_expense_row = last_rows["expense"] + 8 if last_rows["expense"] is not None else None
+    return fills, sums["income"], sums["expense"], last_income_row, last_expense_row
+
+
+def last_code_row(table, body, max_row):
+    # Last row in the window with a value in column C (falls back to max_row)
+    for row in range(max_row, 7, -1):
+        position = row - 8
+        if position < len(body) and row_code(table, body[position]) is not None:
+            return row
+    return max_row
+
+
+def summary_rows(table, body, max_row):
+    # Subtotal rows in the window, as (code, amount) for the summary in columns I:K
+    summary = []
+    for position in range(min(window_size(max_row), len(body))):
+        c_value = row_code(table, body[position])
+        if c_value and "Total" in str(c_value):
+            summary.append((str(c_value).replace("Total", "").strip(), row_amount(table, body[position])))
+    return summary
+
+
+def preamble_rows(columns, code_key, title):
+    # Rows 1-3 keep the split layout (C description, D code, F amount); row 4 becomes the header in row 7
+    max_row = columns["max_row"]
+    rows = {}
+    for row in range(1, min(max_row, 3) + 1):
+        values = {3: columns["description"][row - 1], 4: columns[code_key][row - 1], 6: columns["amount"][row - 1]}
+        for col, value in enumerate(columns["extra"][row - 1], start=7):
+            values[col] = value
+        rows[row] = values
+
+    header = {}
+    if max_row >= 4:
+        for col, value in enumerate(columns["extra"][3], start=7):
+            header[col] = value
+    header.update({3: title, 4: "Amount", 5: "Description", 6: "Totals"})
+    rows[7] = header
+    return rows
+
+
+def build_pl_sheet(columns, code_key, title, color_mode="fill"):
+    # Run every stage of the macro for one sheet and return what needs to be written
+    max_row = columns["max_row"]
+    ssoi = code_key == "ssoi_code"
+    table = new_sheet_table(columns, code_key)
+
+    # Rows 5 onwards form the body, which starts at row 8 once the header rows are in
+    body = [(index, False) for index in range(4, max_row)]
+
+    if ssoi:
+        # Clean and sort the SSOI codes before the header rows are inserted
+        for index in range(4, max_row):
+            table["code"][index] = clean_ssoi_code(table["code"][index])
+        body = [entry for entry in body if not is_blank(row_code(table, entry))]
+        body.sort(key=lambda entry: sort_code_key(row_code(table, entry)))
+        body = secondary_sort_ssoi_rows(table, body, max_row)
+    else:
+        body = sort_focus_rows(table, body, max_row)
+        body = secondary_sort_focus_rows(table, body, max_row)
+
+    body = format_rows(body, max_row)
+    body = subtotal_rows(table, body, max_row)
+    body = delete_blank_entries(table, body, max_row)
+
+    sheet = {
+        "title": title,
+        "max_row": max_row,
+        "table": table,
+        "body": body,
+        "preamble": preamble_rows(columns, code_key, title),
+        "values": {},  # Values written on top of the body by the totals and summary stages
+        "fonts": {},
+        "fills": {},
+        "ssoi": ssoi,
+        "color_mode": color_mode,
+    }
+
+    # Income and expense totals in column F, and NET INCOME below the last coded row
+    fills, income_sum, expense_sum, last_income_row, last_expense_row = categorize_rows(table, body, max_row, ssoi)
+    if color_mode == "fill":
+        for row, fill in fills.items():
+            for col in range(3, 7):
+                sheet["fills"][(row, col)] = fill
+    if last_income_row is not None:
+        set_value(sheet, last_income_row, 6, from_cents(income_sum), bold_font)
+    if last_expense_row is not None:
+        set_value(sheet, last_expense_row, 6, from_cents(expense_sum), bold_font)
+
+    last_row = last_code_row(table, body, max_row)
+    set_value(sheet, last_row + 1, 5, "NET INCOME", bold_font)
+    set_value(sheet, last_row + 1, 6, from_cents(income_sum - expense_sum), bold_font)
+
+    # Summary of the subtotals in columns I:K (column J is dropped when the sheet is written)
+    for row, (code, amount) in enumerate(summary_rows(table, body, max_row), start=8):
+        set_value(sheet, row, 9, code)
+        set_value(sheet, row, 10, "Total")
+        set_value(sheet, row, 11, amount)
+
+    set_value(sheet, 7, 9, title, white_font, black_fill)
+    set_value(sheet, 7, 10, "", white_font, black_fill)
+    set_value(sheet, 7, 11, "Amount", white_font, black_fill)
+
+    return sheet
+
+
+def set_value(sheet, row, col, value, font=None, fill=None):
+    sheet["values"].setdefault(row, {})[col] = value
+    if font is not None:
+        sheet["fonts"][(row, col)] = font
+    if fill is not None:
+        sheet["fills"][(row, col)] = fill
+
+
+def sheet_row_values(sheet, row):
+    # Values of one sheet row before the summary column J is dropped
+    max_row = sheet["max_row"]
+    if row <= 7:
+        values = dict(sheet["preamble"].get(row, {}))
+        formatted = row <= max_row
+    else:
+        position = row - 8
+        entry = sheet["body"][position] if position < len(sheet["body"]) else None
+        values = {}
+        formatted = False
+        if entry is not None:
+            index, formatted = entry
+            if index is not None:
+                table = sheet["table"]
+                values = {3: table["code"][index], 4: table["amount"][index], 5: table["description"][index]}
+                for col, value in enumerate(table["extra"][index], start=7):
+                    values[col] = value
+
+    values.update(sheet["values"].get(row, {}))
+    return values, formatted
+
+
+def pl_sheet_rows(sheet):
+    # Rows of one sheet as (values, styles) for the writer (see writer.py), with column J
+    # dropped and all the formatting applied
+    max_row = sheet["max_row"]
+    last_row = max(7 + len(sheet["body"]), max(sheet["values"]))
+
+    for row in range(1, last_row + 1):
+        values, formatted = sheet_row_values(sheet, row)
+
+        # Column J is deleted, so everything from column K moves one to the left
+        shifted = {}
+        styles = {}
+        for col, value in values.items():
+            if col == 10:
+                continue
+            new_col = col - 1 if col > 10 else col
+            shifted[new_col] = value
+            font = sheet["fonts"].get((row, col))
+            fill = sheet["fills"].get((row, col))
+            if font is not None or fill is not None:
+                styles[new_col] = [None, font, fill]
+
+        for col in (3, 4, 5, 6):
+            font = sheet["fonts"].get((row, col))
+            fill = sheet["fills"].get((row, col))
+            if fill is not None or font is not None:
+                styles.setdefault(col, [None, font, fill])
+
+        if row == 7:
+            # Header row: black fill and white font on columns C to F
+            for col in (3, 4, 5, 6):
+                style = styles.setdefault(col, [None, None, None])
+                style[1] = style[1] or white_font
+                style[2] = style[2] or black_fill
+
+        if formatted:
+            for col in (4, 6):
+                styles.setdefault(col, [None, None, None])[0] = comma_format
+
+        if 8 <= row <= max_row:
+            # Round the summary columns and apply the comma format to numbers
+            for col in (9, 10):
+                if is_number(shifted.get(col)):
+                    shifted[col] = round(shifted[col], 0)
+                    styles.setdefault(col, [None, None, None])[0] = comma_format
+            for col in (4, 6):
+                if is_number(shifted.get(col)):
+                    styles.setdefault(col, [None, None, None])[0] = comma_format
+            c_value = shifted.get(3)
+            if c_value and "total" in str(c_value).lower():
+                styles.setdefault(3, [None, None, None])[1] = bold_font
+
+        yield {col: value for col, value in shifted.items() if value is not None}, styles
+
+
+def write_pl_sheet(ws, sheet):
+    # Write one sheet in a single pass; the column widths go first for write-only sheets
+    ws.column_dimensions["E"].width = ws.column_dimensions["E"].width * 2.5
+    write_rows(ws, pl_sheet_rows(sheet))
+    if sheet["color_mode"] == "conditional":
+        add_income_expense_color_rules(ws, 8, sheet["max_row"], sheet["ssoi"])
+
+
+def run_pl_engine(book, profile=None, color_mode="fill", writer="workbook", collapse=False):
+    # Parse the active sheet of a workbook opened with reader.open_workbook once (collapsed
+    # first with collapse=True, see collapse.engine_sheet), build both sheets, then write
+    # them out. Returns the output workbook, which is a new write-only one with the
+    # "stream" writer.
+    check_color_mode(color_mode)
+    check_writer(writer)
+    profile_stage(profile, "open output")
+    output = output_workbook(book, writer)
+    profile_stage(profile, "read columns")
+    columns = read_pl_columns(engine_sheet(book, output, collapse))
+    focus_ws = output.create_sheet(title="Focus")
+    ssoi_ws = output.create_sheet(title="SSOI")
+
+    # The SSOI codes are stored as text
+    ssoi_ws.column_dimensions['C'].number_format = '@'
+
+    profile_stage(profile, "build Focus")
+    focus_sheet = build_pl_sheet(columns, "focus_code", "Focus", color_mode)
+    profile_stage(profile, "write Focus")
+    write_pl_sheet(focus_ws, focus_sheet)
+    profile_stage(profile, "build SSOI")
+    ssoi_sheet = build_pl_sheet(columns, "ssoi_code", "SSOI", color_mode)
+    profile_stage(profile, "write SSOI")
+    write_pl_sheet(ssoi_ws, ssoi_sheet)
+    return output
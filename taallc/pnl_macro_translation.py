@@ -0,0 +1,498 @@
+import numpy as np
+from .pnl_engine import run_pl_engine, pl_label_codes
+from .labels import tokenize_labels
+from .classification import code_table, category_names
+from .totals import category_totals, subtotal_mask, amount_cents, from_cents
+from .profiling import start_profile, profile_stage, finish_profile
+from .formatting import (comma_format, black_fill, white_font, bold_font, income_fill, expense_fill,
+                         check_color_mode, format_summary_header, format_body_row, add_income_expense_color_rules)
+from .subtotals import apply_subtotals_for_sheet
+from .collapse import collapse_into
+from .flag_totals import apply_flagged_totals
+from .reader import check_reader, open_workbook
+from .writer import check_writer, save_workbook
+from .sheet_rows import compact_rows, sort_rows_by_code
+
+def create_summary_ssoi(ssoi_ws, max_row):
+    summary_row = 8  # Starting row for the summary section
+
+    # Loop through the SSOI sheet to find and summarize subtotals
+    for row in range(8, max_row + 1):
+        c_value = ssoi_ws.cell(row=row, column=3).value  # Value in column C
+        d_value = ssoi_ws.cell(row=row, column=4).value  # Value in column D
+
+        # Check if the value in column C contains the word "Total"
+        if c_value and "Total" in str(c_value):
+            # Split the value in column C into number ID and "Total"
+            ssoi_ws.cell(row=summary_row, column=9).value = str(c_value).replace("Total", "").strip()  # Number ID in column I
+            ssoi_ws.cell(row=summary_row, column=10).value = "Total"  # Word "Total" in column J
+            ssoi_ws.cell(row=summary_row, column=11).value = d_value  # Subtotal value in column K
+            summary_row += 1  # Move to the next row for the next summary item
+
+
+def create_summary(focus_ws, max_row):
+    summary_row = 8  # Starting row for the summary
+    
+    # Loop through the Focus sheet to find and summarize subtotals
+    for row in range(8, max_row + 1):
+        c_value = focus_ws.cell(row=row, column=3).value  # Value in column C
+        d_value = focus_ws.cell(row=row, column=4).value  # Value in column D
+
+        # Check if the value in column C contains the word "Total"
+        if c_value and "Total" in str(c_value):
+            # Split the value in column C into number ID and "Total"
+            focus_ws.cell(row=summary_row, column=9).value = str(c_value).replace("Total", "").strip()  # Number ID in column I
+            focus_ws.cell(row=summary_row, column=10).value = "Total"  # Word "Total" in column J
+            focus_ws.cell(row=summary_row, column=11).value = d_value  # Subtotal value in column K
+            summary_row += 1  # Move to the next row for the next summary item
+
+
+def apply_income_expense_totals_ssoi(ssoi_ws, max_row, color_mode="fill"):
+    # Call the categorize_income_expense_ssoi function to get the income and expense sums
+    income_sum, expense_sum, last_rows = categorize_income_expense_ssoi(ssoi_ws, max_row, color_mode)
+
+    # Insert the income sum into the last row of the income section
+    last_income_row = last_rows["income"]
+    if last_income_row is not None:
+        ssoi_ws.cell(row=last_income_row, column=6).value = from_cents(income_sum)  # Insert sum into column F
+        ssoi_ws.cell(row=last_income_row, column=6).font = bold_font  # Make it bold
+
+    # Insert the expense sum into the last row of the expense section
+    last_expense_row = last_rows["expense"]
+    if last_expense_row is not None:
+        ssoi_ws.cell(row=last_expense_row, column=6).value = from_cents(expense_sum)  # Insert sum into column F
+        ssoi_ws.cell(row=last_expense_row, column=6).font = bold_font  # Make it bold
+
+    # Calculate the result by subtracting expenses from income (in cents)
+    result = income_sum - expense_sum
+
+    # Find the last used row in column C to determine where to place the "NET INCOME" value
+    last_row = max_row
+    for row in range(max_row, 7, -1):  # Start from max_row and move upwards
+        if ssoi_ws.cell(row=row, column=3).value is not None:
+            last_row = row
+            break
+
+    # Place the result in the cell below the last used row in column F
+    ssoi_ws.cell(row=last_row + 1, column=5).value = "NET INCOME"  # Column E for "NET INCOME"
+    ssoi_ws.cell(row=last_row + 1, column=5).font = bold_font  # Make the "NET INCOME" bold
+
+    # Place the result in column F
+    ssoi_ws.cell(row=last_row + 1, column=6).value = from_cents(result)  # Column F for result
+    ssoi_ws.cell(row=last_row + 1, column=6).font = bold_font  # Make the result bold
+
+
+def total_income_expense(ws, max_row, scheme):
+    # Classify the code in column C of every row from row 8 and total column D for income
+    # and expense in cents, leaving the "Total" subtotal rows out (see totals.py). The sums
+    # count every row of the sheet, also the ones pushed past max_row; the rows, categories
+    # and amounts returned for the fills, and the last row of each section (the last one
+    # with something in column D), stay in rows 8..max_row.
+    rows = range(8, max(ws.max_row, max_row) + 1)
+    window = range(8, max_row + 1)
+    codes = [ws.cell(row=row, column=3).value for row in rows]
+    amounts = [ws.cell(row=row, column=4).value for row in rows]
+    table = code_table(scheme)
+    indices, sums, last_rows = category_totals(
+        table, codes, amount_cents(amounts), subtotals=subtotal_mask(codes),
+        rows=np.array([amount is not None and row <= max_row for row, amount in zip(rows, amounts)], dtype=bool))
+    last_rows = {category: (rows[position] if position is not None else None) for category, position in last_rows.items()}
+    return window, category_names(table, indices[:len(window)]), amounts[:len(window)], sums, last_rows
+
+
+def categorize_income_expense_ssoi(ssoi_ws, max_row, color_mode="fill"):
+    # SSOI income is 11 or less; only rows with an amount are colored. In "conditional"
+    # mode the colors come from conditional-formatting rules instead.
+    rows, categories, amounts, sums, last_rows = total_income_expense(ssoi_ws, max_row, "ssoi")
+
+    if color_mode == "fill":
+        for row, category, d_value in zip(rows, categories, amounts):
+            if category is not None and isinstance(d_value, (int, float)):
+                # Apply green (income) or red (expense) color to columns C to F
+                fill = income_fill if category == "income" else expense_fill
+                for col in range(3, 7):
+                    ssoi_ws.cell(row=row, column=col).fill = fill
+    else:
+        add_income_expense_color_rules(ssoi_ws, 8, max_row, ssoi=True)
+
+    return sums["income"], sums["expense"], last_rows
+
+
+def apply_income_expense_totals(focus_ws, max_row, color_mode="fill"):
+    # Call the categorize_income_expense function to get the income and expense sums
+    income_sum, expense_sum, last_rows = categorize_income_expense(focus_ws, max_row, color_mode)
+
+    # Insert the income sum into the last row of the income section
+    last_income_row = last_rows["income"]
+    if last_income_row is not None:
+        focus_ws.cell(row=last_income_row, column=6).value = from_cents(income_sum)  # Insert sum into column F
+        focus_ws.cell(row=last_income_row, column=6).font = bold_font  # Make it bold
+
+    # Insert the expense sum into the last row of the expense section
+    last_expense_row = last_rows["expense"]
+    if last_expense_row is not None:
+        focus_ws.cell(row=last_expense_row, column=6).value = from_cents(expense_sum)  # Insert sum into column F
+        focus_ws.cell(row=last_expense_row, column=6).font = bold_font  # Make it bold
+
+    # Calculate the result by subtracting expenses from income (in cents)
+    result = income_sum - expense_sum
+
+    # Find the last used row in column C to determine where to place the "NET INCOME" value
+    last_row = max_row
+    for row in range(max_row, 7, -1):  # Start from max_row and move upwards
+        if focus_ws.cell(row=row, column=3).value is not None:
+            last_row = row
+            break
+
+    # Place the result in the cell below the last used row in column F
+    focus_ws.cell(row=last_row + 1, column=5).value = "NET INCOME"  # Column E for "NET INCOME"
+    focus_ws.cell(row=last_row + 1, column=5).font = bold_font  # Make the "NET INCOME" bold
+
+    # Place the result in column F
+    focus_ws.cell(row=last_row + 1, column=6).value = from_cents(result)  # Column F for result
+    focus_ws.cell(row=last_row + 1, column=6).font = bold_font  # Make the result bold
+
+
+
+def categorize_income_expense(focus_ws, max_row, color_mode="fill"):
+    # P&L income is below 4000. In "conditional" mode the colors come from
+    # conditional-formatting rules instead.
+    rows, categories, amounts, sums, last_rows = total_income_expense(focus_ws, max_row, "pnl")
+
+    if color_mode == "fill":
+        for row, category in zip(rows, categories):
+            if category is not None:
+                # Apply green (income) or red (expense) color to columns C to F
+                fill = income_fill if category == "income" else expense_fill
+                for col in range(3, 7):
+                    focus_ws.cell(row=row, column=col).fill = fill
+    else:
+        add_income_expense_color_rules(focus_ws, 8, max_row, ssoi=False)
+
+    return sums["income"], sums["expense"], last_rows
+
+
+def apply_sheet_formatting(ws, max_row, title):
+    # Summary headers first (this deletes column J), then every row from 8 in a single pass
+    format_summary_header(ws, title)
+    for row in range(8, max_row + 1):
+        format_body_row(ws, row)
+
+
+def delete_blank_rows(ws, max_row):
+    # Rows 8..max_row where both columns C and D are blank are dropped in one rewrite
+    keep = [not ((c_value is None or c_value == "") and (d_value is None or d_value == ""))
+            for c_value, d_value in ws.iter_rows(min_row=8, max_row=min(max_row, ws.max_row),
+                                                 min_col=3, max_col=4, values_only=True)]
+    compact_rows(ws, 8, keep)
+
+
+def apply_subtotals(focus_ws, ssoi_ws, max_row):
+    # Apply subtotals to both the Focus and SSOI sheets
+    apply_subtotals_for_sheet(focus_ws, max_row)
+    apply_subtotals_for_sheet(ssoi_ws, max_row)
+
+def clean_ss01_column(ssoi_ws, max_row):
+    # Loop through each cell in column C of the SSOI sheet starting from row 5
+    for row in range(5, max_row + 1):
+        cell = ssoi_ws.cell(row=row, column=3)
+        cell_value = str(cell.value)  # Ensure cell value is a string
+        
+        # Check if the value starts with an apostrophe and then handle it
+        if cell_value.startswith("'"):
+            # Remove the apostrophe and any leading zeros
+            cleaned_value = cell_value.lstrip("'0")
+            
+            # If the cleaned value is empty, set the value to '0', otherwise just the cleaned value
+            if cleaned_value == "":
+                cleaned_value = "0"
+            
+            cell.value = cleaned_value  # Update the cell with the cleaned value
+
+
+# Sorting function for SSOI sheet column C
+def sort_ssoi_sheet(ssoi_ws, max_row):
+    # Drop the rows from row 5 with an empty column C and sort the rest by column C
+    sort_rows_by_code(ssoi_ws, 5, max_row)
+
+
+def sort_focus_sheet(focus_ws, max_row):
+    # Drop the rows from row 8 with an empty column C and sort the rest by column C
+    sort_rows_by_code(focus_ws, 8, max_row)
+
+def secondary_sort_ssoi_sheet(ssoi_ws, max_row):
+    # Create lists to hold rows with numeric values in column C and those with alphanumeric values
+    numeric_rows = []
+    alphanumeric_rows = []
+
+    # Loop through column C starting from row 8
+    for row in range(8, max_row + 1):
+        c_value = ssoi_ws.cell(row=row, column=3).value
+        d_value = ssoi_ws.cell(row=row, column=4).value
+        
+        # Skip rows where column C is empty
+        if c_value is None or c_value == "":
+            continue
+        
+        # Check if the value in column D is numeric, otherwise treat it as the lowest value
+        if isinstance(d_value, (int, float)):
+            d_value = float(d_value)  # Ensure the value is treated as a float
+        else:
+            d_value = float('-inf')  # Non-numeric values will be treated as the lowest possible
+
+        # Separate numeric values (without letters) and alphanumeric values (with letters)
+        if str(c_value).replace('.', '', 1).isdigit():  # Check if it's a number (allowing for decimal points)
+            numeric_rows.append((row, c_value, d_value, [ssoi_ws.cell(row=row, column=col).value for col in range(1, ssoi_ws.max_column + 1)]))
+        else:
+            alphanumeric_rows.append((row, c_value, d_value, [ssoi_ws.cell(row=row, column=col).value for col in range(1, ssoi_ws.max_column + 1)]))
+
+    # Sort the numeric rows in ascending order based on column C
+    numeric_rows.sort(key=lambda x: x[1])
+
+    # Sort the alphanumeric rows in ascending order based on column C and descending for D values
+    alphanumeric_rows.sort(key=lambda x: (x[1], -x[2]))
+
+    # Combine numeric rows and alphanumeric rows
+    all_sorted_rows = numeric_rows + alphanumeric_rows
+
+    # Write the sorted rows back to the sheet
+    new_row_idx = 8  # Start writing from row 8
+    for _, _, _, row_values in all_sorted_rows:
+        for col_idx, value in enumerate(row_values, start=1):
+            ssoi_ws.cell(row=new_row_idx, column=col_idx).value = value
+        new_row_idx += 1
+
+def secondary_sort_focus_sheet(focus_ws, max_row):
+    # Create a list to hold rows with their corresponding values from columns C and D
+    rows = []
+
+    # Loop through column C starting from row 8 (instead of 5)
+    for row in range(8, max_row + 1):
+        c_value = focus_ws.cell(row=row, column=3).value
+        d_value = focus_ws.cell(row=row, column=4).value
+        
+        # Skip rows where column C is empty
+        if c_value is None or c_value == "":
+            continue
+
+        # Ensure column D is treated as a numeric value if possible
+        if isinstance(d_value, (int, float)):
+            d_value = float(d_value)  # Ensure the value is treated as a float
+        else:
+            d_value = float('-inf')  # Non-numeric values will be treated as the lowest possible
+        
+        # Append the entire row along with values from column C and D
+        rows.append((row, c_value, d_value, [focus_ws.cell(row=row, column=col).value for col in range(1, focus_ws.max_column + 1)]))
+
+    # Sort rows based on column C (ascending) and column D (descending for same values in C)
+    rows.sort(key=lambda x: (x[1], -x[2]) if x[1] is not None else ("", float('inf')))
+
+    # Clear the existing values in the sheet starting from row 8
+    for row in range(8, max_row + 1):
+        for col in range(1, focus_ws.max_column + 1):
+            focus_ws.cell(row=row, column=col).value = None
+
+    # Write the sorted rows back into the sheet starting from row 8
+    new_row_idx = 8
+    for _, _, _, row_values in rows:
+        for col_idx, value in enumerate(row_values, start=1):
+            focus_ws.cell(row=new_row_idx, column=col_idx).value = value
+        new_row_idx += 1
+
+
+
+def run_full_pl_macro(file_bytes, engine="columnar", profile=None, color_mode="fill", writer="workbook",
+                      reader="openpyxl", collapse=False, flagged=None, clean=False):
+    # Pass an empty dict as profile to get a per-stage report (see profiling.py);
+    # color_mode="conditional" colors the income/expense rows with conditional formatting;
+    # writer="stream" writes the output through a write-only workbook (see writer.py) and
+    # reader="xml" (which needs it) reads the input without loading it (see reader.py);
+    # collapse=True runs on the collapsed active sheet, as collapse_sheet would leave it;
+    # flagged (from the Total cell scan) cleans or highlights those cells first, as Step 4
+    # would leave the file
+    check_color_mode(color_mode)
+    check_writer(writer, engine)
+    check_reader(reader, engine, writer)
+    start_profile(profile, f"pnl/{engine}")
+    try:
+        profile_stage(profile, "load workbook")
+        book = open_workbook(file_bytes, reader, data_only=flagged is not None)
+        if flagged is not None:
+            apply_flagged_totals(book, flagged, clean)
+
+        # The columnar engine parses the sheet once and writes Focus and SSOI in one pass;
+        # the "sheet" engine runs the original cell-by-cell steps on the openpyxl sheets
+        if engine == "columnar":
+            wb = run_pl_engine(book, profile, color_mode, writer, collapse)
+        elif engine == "sheet":
+            wb = book["workbook"]
+            if collapse:
+                collapse_into(book, wb)
+            run_pl_sheet_macro(wb, profile, color_mode)
+        else:
+            raise ValueError(f"Unknown P&L engine: {engine}")
+
+        # Ensure to save the workbook after sorting if needed
+        profile_stage(profile, "save workbook")
+        return save_workbook(wb)
+    finally:
+        finish_profile(profile)
+
+
+def run_pl_sheet_macro(wb, profile=None, color_mode="fill"):
+    ws = wb.active  # Get the active worksheet
+
+    profile_stage(profile, "copy values")
+    # Create Focus and SSOI worksheets
+    focus_ws = wb.create_sheet(title="Focus")
+    ssoi_ws = wb.create_sheet(title="SSOI")
+
+    # Find the last used row and column in the original sheet
+    max_row = ws.max_row
+    max_col = ws.max_column
+
+    # Copy content from original sheet to Focus and SSOI as plain values
+    for row in ws.iter_rows(min_row=1, max_row=max_row, max_col=max_col):
+        for cell in row:
+            focus_ws.cell(row=cell.row, column=cell.column, value=cell.value)
+            ssoi_ws.cell(row=cell.row, column=cell.column, value=cell.value)
+
+    # Apply the NumberFormat for column C in the SSOI sheet (mimic Excel's "@")
+    ssoi_ws.column_dimensions['C'].number_format = '@'
+
+    profile_stage(profile, "split labels")
+    # Tokenize the "Description (focus/ssoi)" labels in one pass: column A keeps the
+    # description, column B gets the Focus code in the Focus sheet and the SSOI code in the
+    # SSOI sheet, and column C is cleared in both
+    tokens = tokenize_labels([focus_ws.cell(row=row, column=1).value for row in range(1, max_row + 1)])
+    for index, row in enumerate(range(1, max_row + 1)):
+        codes = pl_label_codes(tokens["codes"][index], tokens["focus_text"][index], tokens["ssoi_text"][index],
+                               focus_ws.cell(row=row, column=2).value, focus_ws.cell(row=row, column=3).value)
+        for sheet, code in zip((focus_ws, ssoi_ws), codes):
+            sheet.cell(row=row, column=1).value = tokens["description"][index]
+            sheet.cell(row=row, column=2).value = code
+            sheet.cell(row=row, column=3).value = None
+
+    profile_stage(profile, "copy amounts")
+    # Copy Column B from original sheet to Column D in both Focus and SSOI sheets
+    for row in range(1, max_row + 1):
+        original_value = ws.cell(row=row, column=2).value
+        focus_ws.cell(row=row, column=4).value = original_value
+        ssoi_ws.cell(row=row, column=4).value = original_value
+
+    profile_stage(profile, "shift columns")
+    # Move the entire sheet over by two columns in both Focus and SSOI sheets
+    focus_ws.insert_cols(1, 2)  # Insert two columns at the beginning of the Focus sheet
+    ssoi_ws.insert_cols(1, 2)   # Insert two columns at the beginning of the SSOI sheet
+    
+    # Move data in columns starting from row 5 in the Focus sheet
+    for row in range(5, max_row + 1):
+        focus_ws.cell(row=row, column=3).offset(0, 2).value = focus_ws.cell(row=row, column=3).value
+        focus_ws.cell(row=row, column=3).value = None  # Clear original cell
+    
+        focus_ws.cell(row=row, column=4).offset(0, -1).value = focus_ws.cell(row=row, column=4).value
+        focus_ws.cell(row=row, column=4).value = None  # Clear original cell
+    
+        focus_ws.cell(row=row, column=6).offset(0, -2).value = focus_ws.cell(row=row, column=6).value
+        focus_ws.cell(row=row, column=6).value = None  # Clear original cell
+    
+    # Same process for the SSOI sheet
+    for row in range(5, max_row + 1):
+        ssoi_ws.cell(row=row, column=3).offset(0, 2).value = ssoi_ws.cell(row=row, column=3).value
+        ssoi_ws.cell(row=row, column=3).value = None  # Clear original cell
+    
+        ssoi_ws.cell(row=row, column=4).offset(0, -1).value = ssoi_ws.cell(row=row, column=4).value
+        ssoi_ws.cell(row=row, column=4).value = None  # Clear original cell
+    
+        ssoi_ws.cell(row=row, column=6).offset(0, -2).value = ssoi_ws.cell(row=row, column=6).value
+        ssoi_ws.cell(row=row, column=6).value = None  # Clear original cell
+        
+    profile_stage(profile, "clean_ss01_column")
+    # Clean the SSOI column C before sorting
+    clean_ss01_column(ssoi_ws, max_row)
+
+    profile_stage(profile, "sort_ssoi_sheet")
+    # Now, call the sort function to sort the SSOI sheet based on column C
+    sort_ssoi_sheet(ssoi_ws, max_row)
+# new
+    profile_stage(profile, "headers and insert_rows")
+    # Add column titles in row 4
+    focus_ws["C4"] = "Focus"
+    focus_ws["D4"] = "Amount"
+    focus_ws["E4"] = "Description"
+    focus_ws["F4"] = "Totals"
+    
+    ssoi_ws["C4"] = "SSOI"
+    ssoi_ws["D4"] = "Amount"
+    ssoi_ws["E4"] = "Description"
+    ssoi_ws["F4"] = "Totals"
+    
+    # Shift everything below row 4 down by 3 rows in both sheets
+    focus_ws.insert_rows(4, amount=3)  # Insert 3 rows at row 4 in focus_ws
+    ssoi_ws.insert_rows(4, amount=3)   # Insert 3 rows at row 4 in ssoi_ws
+
+    profile_stage(profile, "sort_focus_sheet")
+    # Call the sort_focus_sheet function after the rest of the operations in the macro
+    sort_focus_sheet(focus_ws, max_row)
+
+    profile_stage(profile, "secondary_sort_*_sheet")
+    # After sorting column C (done by previous functions), call this function for secondary sorting
+    secondary_sort_ssoi_sheet(ssoi_ws, max_row)
+    secondary_sort_focus_sheet(focus_ws, max_row)
+
+    profile_stage(profile, "header formatting")
+    # Fill columns C to F in row 7 with black and change the text color to white in the Focus sheet
+    for col in ["C", "D", "E", "F"]:
+        focus_ws[f"{col}7"].fill = black_fill
+        focus_ws[f"{col}7"].font = white_font
+
+    # Fill columns C to F in row 7 with black and change the text color to white in the SSOI sheet
+    for col in ["C", "D", "E", "F"]:
+        ssoi_ws[f"{col}7"].fill = black_fill
+        ssoi_ws[f"{col}7"].font = white_font
+
+    # Format column D and F in the Focus sheet to show numbers with thousand commas
+    for row in range(1, max_row + 1):
+        focus_ws.cell(row=row, column=4).number_format = comma_format  # Column D
+        focus_ws.cell(row=row, column=6).number_format = comma_format  # Column F
+
+    # Format column D and F in the SSOI sheet to show numbers with thousand commas
+    for row in range(1, max_row + 1):
+        ssoi_ws.cell(row=row, column=4).number_format = comma_format  # Column D
+        ssoi_ws.cell(row=row, column=6).number_format = comma_format  # Column F
+
+    # Increase the width of column E to double the default width in the Focus sheet
+    focus_ws.column_dimensions["E"].width = focus_ws.column_dimensions["E"].width * 2.5
+
+    # Increase the width of column E to double the default width in the SSOI sheet
+    ssoi_ws.column_dimensions["E"].width = ssoi_ws.column_dimensions["E"].width * 2.5
+
+    profile_stage(profile, "apply_subtotals")
+    #subtotals
+    apply_subtotals(focus_ws, ssoi_ws, max_row)
+    
+    profile_stage(profile, "delete_blank_rows")
+    # Call this function for both sheets
+    delete_blank_rows(focus_ws, max_row)  # For Focus sheet
+    delete_blank_rows(ssoi_ws, max_row)   # For SSOI sheet
+    
+    
+
+    profile_stage(profile, "apply_income_expense_totals")
+    # You can now use income_sum and expense_sum in your further calculations
+    apply_income_expense_totals(focus_ws, max_row, color_mode)
+    apply_income_expense_totals_ssoi(ssoi_ws, max_row, color_mode)
+
+    profile_stage(profile, "create_summary")
+    create_summary(focus_ws, max_row)
+
+    profile_stage(profile, "create_summary_ssoi")
+    create_summary_ssoi(ssoi_ws, max_row)
+
+    # Summary headers, rounding, comma formats and bold totals in one sweep per sheet
+    profile_stage(profile, "apply_sheet_formatting")
+    apply_sheet_formatting(focus_ws, max_row, "Focus")
+    apply_sheet_formatting(ssoi_ws, max_row, "SSOI")
+
+    return wb
+
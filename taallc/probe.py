@@ -0,0 +1,26 @@
+from .collapse import sheet_needs_collapse
+from .reader import open_workbook, read_head, sheet_names
+
+# Quick look at an upload for the wizard's Step 3/5 decisions (one sheet only, collapse or
+# not) without loading the workbook: only the workbook part and the first rows of the
+# active sheet are parsed (see reader.read_head), and the shared strings only as far as
+# those rows use them.
+
+probe_rows = 10
+
+
+def probe_workbook(file_bytes, rows=probe_rows):
+    # {"sheets", "sheet_count", "active", "dimensions", "rows", "needs_collapse"}: the sheet
+    # names, the active sheet's title and <dimension> ref, its first `rows` rows as value
+    # tuples and whether it needs collapse_sheet (column A blank in rows 5-10)
+    book = open_workbook(file_bytes, "xml")
+    names = sheet_names(book)
+    head = read_head(book, book["active"], max(rows, probe_rows))
+    return {
+        "sheets": names,
+        "sheet_count": len(names),
+        "active": head["title"],
+        "dimensions": head["dimensions"],
+        "rows": head["rows"][:rows],
+        "needs_collapse": sheet_needs_collapse(head),
+    }
@@ -0,0 +1,148 @@
+import time
+import threading
+import tracemalloc
+from openpyxl.worksheet.worksheet import Worksheet
+
+# Opt-in per-stage profiling for the P&L and balance pipelines. The caller passes an empty
+# dict as `profile`; the pipeline marks the start of each stage with profile_stage and the
+# dict is filled with one entry per stage: wall time, Worksheet.cell calls, rows inserted
+# and deleted, and the tracemalloc peak. With profile=None every call here is a no-op.
+#
+# Cell and row counts come from wrapping the Worksheet methods while any profile is
+# running. The wrappers are installed and removed under a lock, and only count calls made
+# on a thread that is profiling, into that thread's own counts, so concurrent sessions
+# neither see each other's calls nor unpatch openpyxl under a running profile.
+# tracemalloc is started with the first running profile and stopped with the last (unless
+# it was already tracing); its peak is process-wide, so concurrent runs share it.
+
+_lock = threading.Lock()
+_local = threading.local()
+_originals = {}
+_active = 0
+_started_tracing = False
+
+
+def _thread_counts():
+    return getattr(_local, "counts", None)
+
+
+def _counting_cell(self, row, column, value=None):
+    counts = _thread_counts()
+    if counts is not None:
+        counts["cell_calls"] += 1
+    return _originals["cell"](self, row, column, value)
+
+
+def _counting_insert_rows(self, idx, amount=1):
+    counts = _thread_counts()
+    if counts is not None:
+        counts["rows_inserted"] += amount
+    return _originals["insert_rows"](self, idx, amount)
+
+
+def _counting_delete_rows(self, idx, amount=1):
+    counts = _thread_counts()
+    if counts is not None:
+        counts["rows_deleted"] += amount
+    return _originals["delete_rows"](self, idx, amount)
+
+
+def _install_counters():
+    global _active, _started_tracing
+    with _lock:
+        if _active == 0:
+            _originals.update(cell=Worksheet.cell, insert_rows=Worksheet.insert_rows,
+                              delete_rows=Worksheet.delete_rows)
+            Worksheet.cell = _counting_cell
+            Worksheet.insert_rows = _counting_insert_rows
+            Worksheet.delete_rows = _counting_delete_rows
+            _started_tracing = not tracemalloc.is_tracing()
+            if _started_tracing:
+                tracemalloc.start()
+        _active += 1
+
+    # Nested profiles on one thread share its counts
+    _local.depth = getattr(_local, "depth", 0) + 1
+    if _local.depth == 1:
+        _local.counts = {"cell_calls": 0, "rows_inserted": 0, "rows_deleted": 0}
+
+
+def _remove_counters():
+    global _active, _started_tracing
+    _local.depth -= 1
+    if _local.depth == 0:
+        _local.counts = None
+
+    with _lock:
+        _active -= 1
+        if _active == 0:
+            Worksheet.cell = _originals["cell"]
+            Worksheet.insert_rows = _originals["insert_rows"]
+            Worksheet.delete_rows = _originals["delete_rows"]
+            if _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+
+def start_profile(profile, pipeline):
+    # Reset the report and start counting; returns the profile for chaining
+    if profile is None:
+        return None
+    profile.clear()
+    profile.update(pipeline=pipeline, stages=[], total_seconds=0.0, _current=None)
+    _install_counters()
+    profile["_start"] = time.perf_counter()
+    return profile
+
+
+def _close_stage(profile):
+    current = profile["_current"]
+    if current is None:
+        return
+    counts = _thread_counts()
+    stage = {
+        "stage": current["stage"],
+        "seconds": round(time.perf_counter() - current["start"], 4),
+        "cell_calls": counts["cell_calls"] - current["counts"]["cell_calls"],
+        "rows_inserted": counts["rows_inserted"] - current["counts"]["rows_inserted"],
+        "rows_deleted": counts["rows_deleted"] - current["counts"]["rows_deleted"],
+        "peak_kb": round((tracemalloc.get_traced_memory()[1] - current["memory"]) / 1024, 1),
+    }
+    profile["stages"].append(stage)
+    profile["_current"] = None
+
+
+def profile_stage(profile, name):
+    # The previous stage ends where the next one starts
+    if profile is None:
+        return
+    _close_stage(profile)
+    tracemalloc.reset_peak()
+    profile["_current"] = {
+        "stage": name,
+        "start": time.perf_counter(),
+        "counts": dict(_thread_counts()),
+        "memory": tracemalloc.get_traced_memory()[0],
+    }
+
+
+def finish_profile(profile):
+    # Close the last stage, stop counting and drop the bookkeeping keys
+    if profile is None or "_start" not in profile:
+        return profile
+    _close_stage(profile)
+    profile["total_seconds"] = round(time.perf_counter() - profile["_start"], 4)
+    _remove_counters()
+    for key in ("_current", "_start"):
+        profile.pop(key, None)
+    return profile
+
+
+def format_profile(profile):
+    # Plain-text table of a finished profile
+    lines = [f"{'stage':<40}{'seconds':>10}{'cell calls':>12}{'ins rows':>10}{'del rows':>10}{'peak KB':>12}"]
+    for stage in profile.get("stages", []):
+        lines.append(f"{stage['stage']:<40}{stage['seconds']:>10.4f}{stage['cell_calls']:>12}"
+                     f"{stage['rows_inserted']:>10}{stage['rows_deleted']:>10}{stage['peak_kb']:>12.1f}")
+    lines.append(f"{'total':<40}{profile.get('total_seconds', 0):>10.4f}")
+    return "\n".join(lines)
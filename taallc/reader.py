@@ -0,0 +1,443 @@
+import zipfile
+from io import BytesIO
+from xml.etree.ElementTree import iterparse
+from openpyxl import load_workbook
+from openpyxl.formatting.formatting import ConditionalFormatting
+from openpyxl.formula.translate import Translator
+from openpyxl.packaging.manifest import Manifest
+from openpyxl.reader.workbook import WorkbookParser
+from openpyxl.styles.stylesheet import Stylesheet
+from openpyxl.utils.cell import coordinate_to_tuple
+from openpyxl.utils.datetime import from_excel, from_ISO8601
+from openpyxl.worksheet.formula import ArrayFormula, DataTableFormula
+from openpyxl.xml.constants import (ARC_CONTENT_TYPES, ARC_STYLE, ARC_WORKBOOK, SHARED_STRINGS, SHEET_MAIN_NS, XLSM,
+                                     XLSX, XLTM, XLTX)
+from openpyxl.xml.functions import fromstring
+
+# Trial balances are read into row arrays through one of two backends, picked per call:
+#   "openpyxl"  load_workbook in full mode; the loaded workbook is kept for the steps that
+#               edit it and save it (the default). Opened with read_only=True it is only
+#               read, a row at a time (see read_head and read_columns).
+#   "xml"       xl/worksheets/sheetN.xml and the shared strings are parsed with
+#               ElementTree.iterparse, without building a cell object per cell. The
+#               workbook-level parts (sheet list, active sheet, date formats) still go
+#               through openpyxl's own parsers, which only read small files, using their
+#               public classes and attributes only (requirements.txt pins openpyxl to the
+#               3.1 series for the private ones the writers use).
+# Both give the same sheet dict, {"title", "rows", "max_row", "max_column"}, where "rows"
+# holds one tuple of max_column values per row from row 1, i.e. what
+# ws.iter_rows(values_only=True) gives on a loaded sheet. The xml backend converts the
+# values the way openpyxl does (int/float numbers, datetimes for date formats, "=..."
+# formula text, booleans, error strings).
+
+readers = ("openpyxl", "xml")
+
+main_tag = "{%s}" % SHEET_MAIN_NS
+row_tag = main_tag + "row"
+cell_tag = main_tag + "c"
+value_tag = main_tag + "v"
+formula_tag = main_tag + "f"
+inline_tag = main_tag + "is"
+text_tag = main_tag + "t"
+run_tag = main_tag + "r"
+string_tag = main_tag + "si"
+col_tag = main_tag + "col"
+merge_tag = main_tag + "mergeCell"
+pane_tag = main_tag + "pane"
+formatting_tag = main_tag + "conditionalFormatting"
+dimension_tag = main_tag + "dimension"
+
+
+def check_reader(reader, engine="columnar", writer="stream"):
+    if reader not in readers:
+        raise ValueError(f"Unknown reader: {reader}")
+    # Without a loaded workbook the output has to be written from scratch
+    if reader == "xml" and (engine != "columnar" or writer != "stream"):
+        raise ValueError("The xml reader only works with the columnar engine and the stream writer")
+
+
+def as_stream(file_bytes):
+    if not isinstance(file_bytes, BytesIO):
+        file_bytes = BytesIO(file_bytes)
+    file_bytes.seek(0)
+    return file_bytes
+
+
+def open_workbook(file_bytes, reader="openpyxl", data_only=False, read_only=False):
+    # Open a workbook for reading with the chosen backend; data_only gives the cached
+    # results of formulas instead of their text. read_only opens the openpyxl workbook in
+    # read-only mode, for reads that don't need the whole sheet (the xml backend never
+    # loads it anyway). Books opened read-only keep the file open until close_workbook.
+    if reader not in readers:
+        raise ValueError(f"Unknown reader: {reader}")
+    if reader == "openpyxl":
+        wb = load_workbook(filename=as_stream(file_bytes), data_only=data_only, read_only=read_only)
+        return {"reader": "openpyxl", "workbook": wb, "read_only": read_only}
+
+    archive = zipfile.ZipFile(as_stream(file_bytes))
+    manifest = Manifest.from_tree(fromstring(archive.read(ARC_CONTENT_TYPES)))
+    parser = WorkbookParser(archive, workbook_part(manifest))
+    parser.parse()
+    wb = parser.wb
+    date_formats, timedelta_formats = read_date_formats(archive)
+
+    sheets = []
+    names = set(archive.namelist())
+    for sheet, rel in parser.find_sheets():
+        if rel.target in names:
+            sheets.append({"title": sheet.name, "path": rel.target, "state": sheet.state,
+                           "chartsheet": "chartsheet" in rel.Type})
+
+    strings_part = manifest.find(SHARED_STRINGS)
+    return {
+        "reader": "xml",
+        "archive": archive,
+        "data_only": data_only,
+        "sheets": sheets,
+        "active": next((view.activeTab for view in wb.views if view.activeTab is not None), 0),
+        "strings": [],
+        "string_parser": iter_strings(archive, strings_part.PartName[1:]) if strings_part else iter(()),
+        "epoch": wb.epoch,
+        "date_formats": date_formats,
+        "timedelta_formats": timedelta_formats,
+    }
+
+
+def close_workbook(book):
+    # Release the file a book reads from (only read-only and xml books hold one)
+    if book["reader"] == "xml":
+        book["archive"].close()
+    elif book["read_only"]:
+        book["workbook"].close()
+
+
+def workbook_part(manifest):
+    # Path of the workbook part, found by content type the way load_workbook finds it
+    for content_type in (XLTM, XLTX, XLSM, XLSX):
+        part = manifest.find(content_type)
+        if part:
+            return part.PartName[1:]
+    # Some applications reassign the default for application/xml
+    if {part.ContentType for part in manifest.Default} & {XLTM, XLTX, XLSM, XLSX}:
+        return ARC_WORKBOOK
+    raise IOError("File contains no valid workbook part")
+
+
+def read_date_formats(archive):
+    # Style ids of the date and timedelta number formats (none without a stylesheet)
+    try:
+        stylesheet = Stylesheet.from_tree(fromstring(archive.read(ARC_STYLE)))
+    except KeyError:
+        return set(), set()
+    return stylesheet.date_formats, stylesheet.timedelta_formats
+
+
+def iter_strings(archive, path):
+    # Shared strings table: the plain text of every <si>, runs concatenated, phonetic runs left out
+    with archive.open(path) as source:
+        for _, element in iterparse(source):
+            if element.tag == string_tag:
+                yield rich_text(element).replace("x005F_", "")
+                element.clear()
+
+
+def shared_string(book, index):
+    # The shared strings are only parsed as far as the cells read so far refer to them
+    strings = book["strings"]
+    while index >= len(strings):
+        string = next(book["string_parser"], None)
+        if string is None:
+            raise IndexError(f"Shared string {index} out of range")
+        strings.append(string)
+    return strings[index]
+
+
+def rich_text(element):
+    parts = []
+    for child in element:
+        if child.tag == text_tag:
+            parts.append(child.text or "")
+        elif child.tag == run_tag:
+            text = child.find(text_tag)
+            if text is not None and text.text is not None:
+                parts.append(text.text)
+    return "".join(parts)
+
+
+def sheet_names(book):
+    if book["reader"] == "openpyxl":
+        return book["workbook"].sheetnames
+    return [sheet["title"] for sheet in book["sheets"]]
+
+
+def worksheet_titles(book):
+    # Sheet names without the chartsheets
+    if book["reader"] == "openpyxl":
+        return [ws.title for ws in book["workbook"].worksheets]
+    return [sheet["title"] for sheet in book["sheets"] if not sheet["chartsheet"]]
+
+
+def active_title(book):
+    if book["reader"] == "openpyxl":
+        return book["workbook"].active.title
+    return book["sheets"][book["active"]]["title"]
+
+
+def worksheet_values(ws):
+    # Sheet dict of an openpyxl worksheet
+    rows = list(ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=ws.max_column, values_only=True))
+    return {"title": ws.title, "rows": rows, "max_row": ws.max_row, "max_column": ws.max_column}
+
+
+def read_sheet(book, title=None):
+    # Sheet dict of the named sheet, or of the active sheet
+    if book["reader"] == "openpyxl":
+        wb = book["workbook"]
+        return worksheet_values(wb[title] if title is not None else wb.active)
+
+    index = book["active"] if title is None else sheet_names(book).index(title)
+    rows = list(xml_sheet_rows(book, index))
+    max_row, max_column = max(len(rows), 1), max((len(values) for values in rows), default=1)
+    rows = [values + (None,) * (max_column - len(values)) for values in rows] or [(None,)]
+    return {"title": book["sheets"][index]["title"], "rows": rows, "max_row": max_row, "max_column": max_column}
+
+
+def iter_sheet_rows(book, title=None):
+    # Value tuples of the rows of the named (or active) sheet from row 1, read as they are
+    # asked for. With the xml reader a tuple only runs to the last cell of its row and an
+    # empty row is ().
+    if book["reader"] == "openpyxl":
+        wb = book["workbook"]
+        ws = wb[title] if title is not None else wb.active
+        yield from ws.iter_rows(min_row=1, max_row=ws.max_row, max_col=ws.max_column, values_only=True)
+        return
+
+    index = book["active"] if title is None else sheet_names(book).index(title)
+    if book["sheets"][index]["chartsheet"]:
+        yield (None,)
+        return
+    yield from xml_sheet_rows(book, index)
+
+
+def xml_sheet_rows(book, index):
+    next_row = 1
+    for part, *content in sheet_parts(book, index):
+        if part != "row":
+            continue
+        row, _, cells = content
+        if not cells:
+            continue
+        while next_row < row:
+            yield ()
+            next_row += 1
+        values = [None] * max(col for col, _, _ in cells)
+        for col, value, _ in cells:
+            values[col - 1] = value
+        yield tuple(values)
+        next_row = row + 1
+
+
+def number_value(text):
+    if "." in text or "E" in text or "e" in text:
+        return float(text)
+    return int(text)
+
+
+def formula_value(element, coordinate, shared_formulae):
+    # "=..." text of a cell formula; shared formulas are translated from their first cell
+    formula = element.find(formula_tag)
+    formula_type = formula.get("t")
+    value = "=" + (formula.text or "")
+    if formula_type == "array":
+        return ArrayFormula(ref=formula.get("ref"), text=value)
+    if formula_type == "dataTable":
+        return DataTableFormula(**formula.attrib)
+    if formula_type == "shared":
+        index = formula.get("si")
+        if index in shared_formulae:
+            return shared_formulae[index].translate_formula(coordinate)
+        if value != "=":
+            shared_formulae[index] = Translator(value, coordinate)
+    return value
+
+
+def cell_value(book, element, style_id, shared_formulae):
+    data_type = element.get("t", "n")
+    if not book["data_only"] and element.find(formula_tag) is not None:
+        return formula_value(element, element.get("r"), shared_formulae)
+
+    if data_type == "inlineStr":
+        inline = element.find(inline_tag)
+        return rich_text(inline) if inline is not None else None
+
+    value = element.findtext(value_tag, None) or None
+    if value is None:
+        return None
+    if data_type == "n":
+        value = number_value(value)
+        if style_id in book["date_formats"]:
+            try:
+                return from_excel(value, book["epoch"], timedelta=style_id in book["timedelta_formats"])
+            except (OverflowError, ValueError):
+                return "#VALUE!"
+        return value
+    if data_type == "s":
+        return shared_string(book, int(value))
+    if data_type == "b":
+        return bool(int(value))
+    if data_type == "d":
+        return from_ISO8601(value)
+    return value
+
+
+def sheet_parts(book, index):
+    # The parts of one sheet in the order of its XML, read as they are asked for:
+    #   ("pane", top left cell)           frozen panes
+    #   ("columns", attrs)                a <col> (widths), all before the first row
+    #   ("row", row, attrs, cells)        a <row>: its attributes other than r and spans
+    #                                     (heights) and its cells as [(col, value, style_id)]
+    #                                     (the row is that of its first cell, if any)
+    #   ("merged", ref)                   a merged range
+    #   ("formatting", formatting)        a ConditionalFormatting
+    # Nothing of a row is kept once it has been handed on. A chartsheet has no parts.
+    sheet = book["sheets"][index]
+    if sheet["chartsheet"]:
+        return
+
+    shared_formulae = {}
+    row_counter = 0
+    with book["archive"].open(sheet["path"]) as source:
+        for _, element in iterparse(source):
+            tag = element.tag
+            if tag == row_tag:
+                row_counter = row_number(element, row_counter)
+                attrs = {key: value for key, value in element.attrib.items()
+                         if not key.startswith("{") and key not in ("r", "spans")}
+                cells = list(row_cells(book, element, row_counter, shared_formulae))
+                element.clear()
+                yield "row", cells[0][0] if cells else row_counter, attrs, [cell[1:] for cell in cells]
+            elif tag == col_tag:
+                yield "columns", dict(element.attrib)
+            elif tag == merge_tag:
+                yield "merged", element.get("ref")
+            elif tag == pane_tag:
+                yield "pane", element.get("topLeftCell")
+            elif tag == formatting_tag:
+                yield "formatting", ConditionalFormatting.from_tree(element)
+
+
+def row_number(element, row_counter):
+    return int(float(element.get("r"))) if element.get("r") else row_counter + 1
+
+
+def row_cells(book, element, row_counter, shared_formulae, columns=None):
+    # (row, col, value, style_id) of every <c> in a <row>; with a set of columns the other
+    # cells come back with a None value, unconverted (formulas are still read, since a
+    # shared formula can start outside the columns)
+    col_counter = 0
+    for cell in element:
+        coordinate = cell.get("r")
+        if coordinate:
+            row, col_counter = coordinate_to_tuple(coordinate)
+        else:
+            row, col_counter = row_counter, col_counter + 1
+        style_id = int(cell.get("s", 0) or 0)
+        if columns is not None and col_counter not in columns and (book["data_only"] or cell.find(formula_tag) is None):
+            yield row, col_counter, None, style_id
+            continue
+        yield row, col_counter, cell_value(book, cell, style_id, shared_formulae), style_id
+
+
+def read_columns(book, columns, title=None):
+    # Only some columns (numbers from 1) of the named or active sheet:
+    # {"title", "columns": {col: values from row 1}, "max_row", "max_column"}, max_row and
+    # max_column being those of the whole sheet. The xml reader only converts the cells of
+    # those columns, so shared strings past the ones they use aren't read either.
+    wanted = set(columns)
+    if book["reader"] == "openpyxl":
+        # Only the cells from the first to the last wanted column are read
+        wb = book["workbook"]
+        ws = wb[title] if title is not None else wb.active
+        first = min(wanted)
+        found = {col: [] for col in wanted}
+        for values in ws.iter_rows(min_row=1, min_col=first, max_col=max(wanted), values_only=True):
+            for col in wanted:
+                found[col].append(values[col - first])
+        max_row = len(next(iter(found.values())))
+        return {"title": ws.title, "max_row": max_row, "max_column": ws.max_column or max(wanted),
+                "columns": found}
+
+    index = book["active"] if title is None else sheet_names(book).index(title)
+    sheet = book["sheets"][index]
+    found = {col: {} for col in wanted}
+    max_row = max_column = 1
+    shared_formulae = {}
+    row_counter = 0
+    if not sheet["chartsheet"]:
+        with book["archive"].open(sheet["path"]) as source:
+            for _, element in iterparse(source):
+                if element.tag != row_tag:
+                    continue
+                row_counter = row_number(element, row_counter)
+                for row, col, value, _ in row_cells(book, element, row_counter, shared_formulae, wanted):
+                    max_row, max_column = max(max_row, row), max(max_column, col)
+                    if col in found:
+                        found[col][row] = value
+                element.clear()
+    return {"title": sheet["title"], "max_row": max_row, "max_column": max_column,
+            "columns": {col: [found[col].get(row) for row in range(1, max_row + 1)] for col in wanted}}
+
+
+def trim_row(values):
+    # A row without its trailing empty cells
+    values = tuple(values)
+    end = len(values)
+    while end and values[end - 1] is None:
+        end -= 1
+    return values[:end]
+
+
+def read_head(book, index, rows=10):
+    # Sheet dict of the first `rows` rows of a sheet, plus its <dimension> ref ("A1:F120",
+    # None when the sheet has none); the parse stops at the first row past them
+    if book["reader"] == "openpyxl":
+        ws = book["workbook"][sheet_names(book)[index]]
+        # Like the xml head, the rows and columns run to the last value in them
+        values = [trim_row(row) for row in ws.iter_rows(min_row=1, max_row=rows, values_only=True)]
+        while values and not values[-1]:
+            values.pop()
+        max_column = max((len(row) for row in values), default=0)
+        return {"title": ws.title, "rows": [tuple(row) + (None,) * (max_column - len(row)) for row in values],
+                "max_row": len(values), "max_column": max_column,
+                "dimensions": ws.calculate_dimension() if ws.max_row else None}
+
+    sheet = book["sheets"][index]
+    head = {"title": sheet["title"], "rows": [], "max_row": 0, "max_column": 0, "dimensions": None}
+    if sheet["chartsheet"]:
+        return head
+
+    cells = {}
+    shared_formulae = {}
+    row_counter = 0
+    with book["archive"].open(sheet["path"]) as source:
+        for event, element in iterparse(source, events=("start", "end")):
+            if element.tag == dimension_tag:
+                head["dimensions"] = element.get("ref")
+            if element.tag != row_tag:
+                continue
+            if event == "start":
+                # Rows come in order, so the rows asked for are all read by the first one
+                # past them
+                if row_number(element, row_counter) > rows:
+                    break
+                continue
+            row_counter = row_number(element, row_counter)
+            for row, col, value, _ in row_cells(book, element, row_counter, shared_formulae):
+                cells.setdefault(row, {})[col] = value
+            element.clear()
+
+    head["max_row"] = max((row for row in cells if row <= rows), default=0)
+    head["max_column"] = max((col for row in cells.values() for col in row), default=0)
+    head["rows"] = [tuple(cells.get(row, {}).get(col) for col in range(1, head["max_column"] + 1))
+                    for row in range(1, head["max_row"] + 1)]
+    return head
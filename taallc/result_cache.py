@@ -0,0 +1,105 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+# LRU cache for the transformation steps. Streamlit reruns the whole script on every
+# widget interaction, so each step is keyed by the SHA-256 of its input file(s) plus its
+# options, and a rerun with the same input is a hash lookup instead of an openpyxl round
+# trip. Results are kept as bytes; every hit hands back a fresh BytesIO, so callers can
+# read, seek or load it without touching the cached copy.
+#
+# The cache is shared by every Streamlit session thread, so lookups, inserts and
+# evictions run under one lock. The step itself runs outside it: two sessions asking for
+# the same new result may both compute it, and the second simply replaces the first.
+
+max_entries = 32
+max_bytes = 256 * 1024 * 1024  # Total size of the cached files
+
+_cache = OrderedDict()
+_cache_bytes = 0
+_lock = threading.Lock()
+
+
+def file_digest(file_bytes):
+    # SHA-256 of raw bytes or of the whole content of a BytesIO (its position is left alone)
+    data = file_bytes.getvalue() if isinstance(file_bytes, BytesIO) else file_bytes
+    return hashlib.sha256(data).hexdigest()
+
+
+def cache_key(step, args):
+    # Files are keyed by their hash, every other argument (the step options) as-is
+    return (step,) + tuple(
+        ("sha256", file_digest(arg)) if isinstance(arg, (bytes, bytearray, BytesIO)) else arg
+        for arg in args
+    )
+
+
+def freeze_result(value):
+    # Store BytesIO results as bytes and copy lists, so later changes by the caller don't leak in
+    if isinstance(value, BytesIO):
+        return ("stream", value.getvalue())
+    if isinstance(value, tuple):
+        return ("tuple", tuple(freeze_result(item) for item in value))
+    if isinstance(value, list):
+        return ("list", list(value))
+    return ("value", value)
+
+
+def thaw_result(frozen):
+    kind, value = frozen
+    if kind == "stream":
+        return BytesIO(value)
+    if kind == "tuple":
+        return tuple(thaw_result(item) for item in value)
+    if kind == "list":
+        return list(value)
+    return value
+
+
+def result_size(frozen):
+    kind, value = frozen
+    if kind == "tuple":
+        return sum(result_size(item) for item in value)
+    if isinstance(value, (bytes, bytearray)):
+        return len(value)
+    return 0
+
+
+def cached_call(step, func, *args):
+    # Run func(*args) once per distinct input and options; later calls are served from the cache
+    global _cache_bytes
+
+    key = cache_key(step, args)
+    with _lock:
+        frozen = _cache.get(key)
+        if frozen is not None:
+            _cache.move_to_end(key)
+    if frozen is not None:
+        return thaw_result(frozen)
+
+    result = func(*args)
+    frozen = freeze_result(result)
+    size = result_size(frozen)
+
+    # Results bigger than the whole cache are returned without being stored
+    if size <= max_bytes:
+        with _lock:
+            if key in _cache:
+                _cache_bytes -= result_size(_cache.pop(key))
+            _cache[key] = frozen
+            _cache_bytes += size
+
+            # Evict the least recently used entries until the cache fits again
+            while len(_cache) > max_entries or _cache_bytes > max_bytes:
+                _, evicted = _cache.popitem(last=False)
+                _cache_bytes -= result_size(evicted)
+
+    return thaw_result(frozen)
+
+
+def clear_cache():
+    global _cache_bytes
+    with _lock:
+        _cache.clear()
+        _cache_bytes = 0
@@ -0,0 +1,83 @@
+from .openpyxl_compat import cell_style, set_cell_style
+
+# Helpers to move a block of rows in one go: the rows are read once as (value, style)
+# pairs, rearranged as a plain list, and written back once. This replaces repeated
+# insert_rows/delete_rows calls, each of which shifts every cell below it.
+
+
+def read_row_block(ws, start_row):
+    # Every row from start_row to the end of the sheet, as lists of (value, style) per column
+    max_col = ws.max_column
+    rows = []
+    for row in ws.iter_rows(min_row=start_row, max_row=ws.max_row, max_col=max_col):
+        rows.append([(cell.value, cell_style(cell)) for cell in row])
+    return rows
+
+
+def write_row_block(ws, start_row, rows):
+    # Write the rows back from start_row, clearing whatever is left below them
+    max_col = ws.max_column
+    old_end = ws.max_row
+
+    for row_idx, cells in enumerate(rows, start=start_row):
+        for col in range(1, max_col + 1):
+            cell = ws.cell(row=row_idx, column=col)
+            if col <= len(cells):
+                cell.value, style = cells[col - 1]
+                set_cell_style(cell, style)
+            else:
+                cell.value = None
+                set_cell_style(cell, None)
+
+    # Rows past the end of the new block are removed entirely
+    new_end = start_row + len(rows) - 1
+    if old_end > new_end:
+        ws.delete_rows(new_end + 1, old_end - new_end)
+
+
+def row_value(cells, col):
+    # Value in a column of a row read by read_row_block
+    return cells[col - 1][0] if len(cells) >= col else None
+
+
+def compact_row_block(rows, keep):
+    # Drop the rows whose keep flag is False; rows past the end of the mask are kept
+    kept = [cells for cells, flag in zip(rows, keep) if flag]
+    return kept + rows[len(keep):]
+
+
+def compact_rows(ws, start_row, keep):
+    # Remove every row flagged False in one rewrite instead of one delete_rows per row
+    if all(keep):
+        return
+    first = keep.index(False)
+    rows = read_row_block(ws, start_row + first)
+    write_row_block(ws, start_row + first, compact_row_block(rows, keep[first:]))
+
+
+def sort_code_key(code):
+    # First numeric codes (no letters), then alphanumeric
+    code = str(code).strip()
+    return (int(code) if code.isdigit() else float('inf'), code)
+
+
+def sort_rows_by_code(ws, start_row, max_row):
+    # Rows start_row..max_row with an empty column C are dropped, then the compacted rows
+    # are sorted by column C (numeric codes first, then alphanumeric). Like the original
+    # delete/re-read/rewrite steps, only the values move; the styles stay in place and
+    # the window is still max_row - start_row + 1 rows long.
+    window = max(max_row - start_row + 1, 0)
+    rows = read_row_block(ws, start_row)
+    keep = [row_value(cells, 3) is not None and row_value(cells, 3) != "" for cells in rows[:window]]
+    rows = compact_row_block(rows, keep)
+    rows += [[]] * (window - len(rows))
+
+    entries = [cells for cells in rows[:window] if row_value(cells, 3) is not None]
+    entries.sort(key=lambda cells: sort_code_key(row_value(cells, 3)))
+
+    for position in range(window):
+        values = entries[position] if position < len(entries) else []
+        rows[position] = [(values[col][0] if col < len(values) else None, style)
+                          for col, (_, style) in enumerate(rows[position])]
+
+    write_row_block(ws, start_row, rows)
@@ -0,0 +1,81 @@
+from .sheet_rows import read_row_block, write_row_block
+from .totals import amount_cents, from_cents
+
+# Subtotal rows built in one pass over rows that are already sorted by code, instead of
+# calling insert_rows once per group (each call shifts every row below it). Group sums
+# are int cents (see totals.py).
+
+
+def build_subtotals(rows, code_of, amount_of, make_total, window=None, blank_row=None):
+    # Returns the rows with a "<code> Total" row after each group, and the (code, sum)
+    # of every group in order. amount_of gives a row's amount in int cents (None when it
+    # has none), and the sums passed to make_total and returned are cents too. With a window, only the first `window` output rows are
+    # scanned (like the original insert_rows loop, which stops at max_row) and the last
+    # group's total goes right after the window.
+    out = []
+    subtotals = []
+    position = 0
+    current_value = None
+    total_sum = 0
+
+    while position < len(rows) and (window is None or len(out) < window):
+        row = rows[position]
+        position += 1
+        c_value = code_of(row)
+        d_value = amount_of(row)
+
+        # Rows without a code are kept as they are
+        if c_value is None or c_value == "":
+            out.append(row)
+            continue
+
+        if c_value != current_value:
+            # Close the previous group before starting the new one
+            if current_value is not None:
+                out.append(make_total(current_value, total_sum))
+                subtotals.append((current_value, total_sum))
+            current_value = c_value
+            total_sum = d_value if d_value is not None else 0
+        elif d_value is not None:
+            total_sum += d_value
+        out.append(row)
+
+    out.extend(rows[position:])
+
+    # Handle the last group after the loop ends
+    if current_value is not None:
+        subtotals.append((current_value, total_sum))
+        if window is None:
+            out.append(make_total(current_value, total_sum))
+        else:
+            out.extend([blank_row] * (window - len(out)))
+            out.insert(window, make_total(current_value, total_sum))
+
+    return out, subtotals
+
+
+def sheet_row_code(cells):
+    return cells[2][0] if len(cells) > 2 else None
+
+
+def sheet_row_amount(cells):
+    return cells[3][0] if len(cells) > 3 else None
+
+
+def sheet_total_row(code, total_sum):
+    # Subtotal row with "<code> Total" in column C and the sum (cents) in column D
+    return [(None, None), (None, None), (f"{code} Total", None), (from_cents(total_sum), None)]
+
+
+def apply_subtotals_for_sheet(ws, max_row):
+    # Read the rows from row 8 once, add the subtotal rows and write the block back once.
+    # The amounts in column D are converted to cents in one pass and carried with each row.
+    rows = read_row_block(ws, 8)
+    cents = amount_cents([sheet_row_amount(cells) for cells in rows])
+    rows, subtotals = build_subtotals(list(zip(rows, cents)),
+                                      lambda row: sheet_row_code(row[0]),
+                                      lambda row: row[1],
+                                      lambda code, total_sum: (sheet_total_row(code, total_sum), None),
+                                      window=max(max_row - 7, 0), blank_row=([], None))
+    write_row_block(ws, 8, [row[0] for row in rows])
+    return subtotals
@@ -0,0 +1,83 @@
+import numpy as np
+from .classification import classify_indices, member_mask
+
+# Vectorized category totals for the balance sheet (asset/liability/equity) and the P&L
+# (income/expense). The caller passes the code and amount columns; the codes are
+# classified with the code table (see classification.py) and the "<code> Total" subtotal
+# rows are left out of the sums by mask, so every amount is counted once instead of
+# summing everything and halving it. The category sums come from one np.add.at over the
+# category indices and the last rows from one np.maximum.at, both O(n).
+#
+# Amounts are added up as int64 cents: a column is converted to cents once, every sum
+# is an exact integer sum, and the totals only go back to dollars (from_cents) when they
+# are written to a cell.
+
+
+def is_amount(value):
+    return isinstance(value, (int, float))
+
+
+def amount_cents(amounts):
+    # Int cents of every amount in a column (None where there is no number), converted in
+    # one pass over a float array
+    numeric = np.fromiter((is_amount(value) for value in amounts), dtype=bool, count=len(amounts))
+    values = np.fromiter((value if is_amount(value) else 0.0 for value in amounts), dtype=np.float64,
+                         count=len(amounts))
+    cents = np.rint(values * 100).astype(np.int64)
+    return [value if number else None for value, number in zip(cents.tolist(), numeric.tolist())]
+
+
+def cents_array(cents):
+    # int64 array of a cents column (0 where there is no number) and the number mask
+    numeric = np.fromiter((value is not None for value in cents), dtype=bool, count=len(cents))
+    values = np.fromiter((value if value is not None else 0 for value in cents), dtype=np.int64, count=len(cents))
+    return values, numeric
+
+
+def from_cents(cents):
+    # Dollar amount to write in a cell
+    return cents / 100
+
+
+def subtotal_mask(codes):
+    # Rows whose code is a "<code> Total" subtotal label
+    return np.fromiter(("Total" in str(code) for code in codes), dtype=bool, count=len(codes))
+
+
+def last_positions(indices, count):
+    # Last position of each category index (-1 where it never appears)
+    found = indices >= 0
+    last = np.full(count, -1, dtype=np.int64)
+    np.maximum.at(last, indices[found], np.flatnonzero(found))
+    return last
+
+
+def category_totals(table, codes, cents, subtotals=None, rows=None):
+    # Classify the codes and return (category indices, {category: sum}, {category: last row}).
+    # `cents` is the amount column from amount_cents; sums are int cents over every amount
+    # outside the `subtotals` mask. Last rows are positions in the columns, limited to the
+    # `rows` mask when one is given (None if absent).
+    categories = table["categories"]
+    indices = classify_indices(table, codes)
+    values, numeric = cents_array(cents)
+
+    keep = (indices >= 0) & numeric
+    if subtotals is not None:
+        keep &= ~subtotals
+
+    sums = np.zeros(len(categories), dtype=np.int64)
+    np.add.at(sums, indices[keep], values[keep])
+    last = last_positions(indices if rows is None else np.where(rows, indices, -1), len(categories))
+    return (indices,
+            {category: int(sums[index]) for index, category in enumerate(categories)},
+            {category: (int(last[index]) if last[index] >= 0 else None) for index, category in enumerate(categories)})
+
+
+def last_member_rows(table, codes):
+    # Last position of each category counting every range it lists, so a code in two
+    # overlapping ranges (1020) is the last row of both categories
+    result = {}
+    for category in table["categories"]:
+        positions = np.flatnonzero(member_mask(table, codes, category))
+        result[category] = int(positions[-1]) if len(positions) else None
+    return result
@@ -0,0 +1,195 @@
+from copy import copy
+from io import BytesIO
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles.stylesheet import apply_stylesheet
+from openpyxl.utils import get_column_letter
+from openpyxl.worksheet.dimensions import ColumnDimension, RowDimension
+from .openpyxl_compat import differential_style, set_cell_style, stylesheet_style
+from .reader import sheet_parts
+
+# Output writers for the columnar engines. The engines describe every sheet they
+# generate as rows of ({column: value}, {column: (number_format, font, fill)}) and the
+# writer puts them in the output workbook:
+#   "workbook"  the sheets are added to the loaded input workbook, which is saved whole
+#               (the default)
+#   "stream"    a write-only workbook: the input sheets are copied over row by row and
+#               the generated rows go straight to the file, so the output is never held
+#               as cell objects. With the xml reader (see reader.py) the input sheets are
+#               streamed from their XML, a row at a time, keeping the input's style table.
+# Column widths and conditional formatting have to be set up before/after the rows, which
+# both kinds of sheet accept. Either way the result is a single BytesIO.
+
+writers = ("workbook", "stream")
+
+
+def check_writer(writer, engine="columnar"):
+    if writer not in writers:
+        raise ValueError(f"Unknown writer: {writer}")
+    if writer == "stream" and engine != "columnar":
+        raise ValueError("The stream writer only works with the columnar engine")
+
+
+def output_workbook(book, writer):
+    # Workbook the generated sheets are written to, for a workbook opened with
+    # reader.open_workbook; the stream writer starts a write-only workbook holding a copy
+    # of every input sheet
+    if writer == "workbook":
+        return book["workbook"]
+    output = Workbook(write_only=True)
+    copy_input_sheets(book, output)
+    return output
+
+
+def copy_input_sheets(book, output):
+    # Append a copy of every input worksheet to a write-only workbook; the active sheet
+    # keeps its index
+    if book["reader"] == "openpyxl":
+        wb = book["workbook"]
+        for ws in wb.worksheets:
+            copy_sheet(ws, output.create_sheet(title=ws.title))
+        output.active = wb.worksheets.index(wb.active)
+        return
+
+    # The input's style ids stay valid once its stylesheet is the output's
+    apply_stylesheet(book["archive"], output)
+    worksheets = [index for index, sheet in enumerate(book["sheets"]) if not sheet["chartsheet"]]
+    for index in worksheets:
+        copy_xml_sheet(book, index, output.create_sheet(title=book["sheets"][index]["title"]))
+    output.active = worksheets.index(book["active"]) if book["active"] in worksheets else 0
+
+
+def apply_style(cell, style):
+    number_format, font, fill = style
+    if number_format is not None:
+        cell.number_format = number_format
+    if font is not None:
+        cell.font = font
+    if fill is not None:
+        cell.fill = fill
+
+
+def write_rows(ws, rows):
+    # Write (values, styles) rows to a new sheet, from row 1
+    if isinstance(ws.parent, Workbook) and ws.parent.write_only:
+        stream_rows(ws, rows)
+        return
+    for row, (values, styles) in enumerate(rows, start=1):
+        for col, value in values.items():
+            ws.cell(row=row, column=col, value=value)
+        for col, style in styles.items():
+            apply_style(ws.cell(row=row, column=col), style)
+
+
+def stream_rows(ws, rows):
+    # Write-only sheets take a list per row; styled cells go in as WriteOnlyCells
+    for values, styles in rows:
+        row = [None] * max(list(values) + list(styles), default=0)
+        for col, value in values.items():
+            row[col - 1] = value
+        for col, style in styles.items():
+            cell = WriteOnlyCell(ws, values.get(col))
+            apply_style(cell, style)
+            row[col - 1] = cell
+        ws.append(row)
+
+
+def copy_column_dimension(target, key, dim):
+    target.column_dimensions[key] = ColumnDimension(target, index=key, width=dim.width, hidden=dim.hidden,
+                                                    min=dim.min, max=dim.max)
+
+
+def copy_row_dimension(target, index, dim):
+    if dim.ht is not None or dim.hidden:
+        target.row_dimensions[index] = RowDimension(target, index=index, ht=dim.ht, hidden=dim.hidden)
+
+
+def copy_sheet(source, target):
+    # Copy an input sheet to a write-only sheet: values and cell styles, column widths,
+    # row heights, merged cells, frozen panes and conditional formatting
+    target.sheet_state = source.sheet_state
+    target.freeze_panes = source.freeze_panes
+    for key, dim in source.column_dimensions.items():
+        copy_column_dimension(target, key, dim)
+    for index, dim in source.row_dimensions.items():
+        copy_row_dimension(target, index, dim)
+    for cell_range in source.merged_cells.ranges:
+        target.merged_cells.add(str(cell_range))
+    for formatting in source.conditional_formatting:
+        for rule in formatting.rules:
+            target.conditional_formatting.add(str(formatting.sqref), rule)
+
+    for cells in source.iter_rows():
+        values = [None] * len(cells)
+        for cell in cells:
+            if cell.has_style:
+                copied = WriteOnlyCell(target, cell.value)
+                copied.font = copy(cell.font)
+                copied.fill = copy(cell.fill)
+                copied.border = copy(cell.border)
+                copied.alignment = copy(cell.alignment)
+                copied.number_format = cell.number_format
+                copied.protection = copy(cell.protection)
+                values[cell.column - 1] = copied
+            else:
+                values[cell.column - 1] = cell.value
+        target.append(values)
+
+
+def copy_xml_sheet(book, index, target):
+    # Same copy straight from the XML of an input sheet (see reader.sheet_parts): the
+    # attributes are read the way load_workbook reads them and the cells keep their style
+    # ids. Widths and panes come before the rows in the XML, as the write-only sheet needs.
+    output = target.parent
+    target.sheet_state = book["sheets"][index]["state"]
+    next_row = 1
+    for part, *content in sheet_parts(book, index):
+        if part == "row":
+            row, attrs, cells = content
+            attrs = {key: value for key, value in attrs.items() if key != "s"}
+            if attrs:
+                copy_row_dimension(target, row, RowDimension(target, index=row, **attrs))
+            if not cells:
+                continue
+            while next_row < row:
+                target.append([])
+                next_row += 1
+            target.append(xml_row_values(target, cells))
+            next_row = row + 1
+        elif part == "columns":
+            attrs = {key: value for key, value in content[0].items() if key != "style"}
+            key = get_column_letter(int(attrs["min"]))
+            copy_column_dimension(target, key, ColumnDimension(target, index=key, **attrs))
+        elif part == "pane":
+            target.freeze_panes = content[0]
+        elif part == "merged":
+            target.merged_cells.add(content[0])
+        elif part == "formatting":
+            for rule in content[0].rules:
+                if rule.dxfId is not None:
+                    rule.dxf = differential_style(output, rule.dxfId)
+                target.conditional_formatting.add(str(content[0].sqref), rule)
+    if next_row == 1:
+        target.append([])
+
+
+def xml_row_values(target, cells):
+    # Row of a write-only sheet from (col, value, style_id) cells; styled cells become
+    # WriteOnlyCells with the style of their id
+    values = [None] * max(col for col, _, _ in cells)
+    for col, value, style_id in cells:
+        style = stylesheet_style(target.parent, style_id)
+        if any(style):
+            copied = WriteOnlyCell(target, value)
+            set_cell_style(copied, style)
+            values[col - 1] = copied
+        else:
+            values[col - 1] = value
+    return values
+
+
+def save_workbook(wb):
+    output = BytesIO()
+    wb.save(output)
+    output.seek(0)
+    return output
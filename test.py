@@ -1,15 +1,14 @@
 import streamlit as st
 from io import BytesIO
-from openpyxl import load_workbook, Workbook
-from openpyxl.styles import PatternFill, Font
-import re
-from collapse import collapse_sheet
-from efocus import efocus_focus  # Import the efocus logic
-import pandas as pd
+from openpyxl import load_workbook
+from taallc import (run_full_pl_macro, balance_focus_grouping, build_efocus_workbook, build_efocus_batch,
+                    list_client_names, apply_client_answers, cached_call, probe_workbook, read_ledger, ledger_sheet,
+                    spill_ledger, drop_ledger, scan_ledger_totals, clean_ledger, scan_ledger_labels,
+                    sheet_needs_collapse, label_formats)
+from taallc.result_cache import file_digest
 
 
 # ---------- Utility Functions ----------
-yellow_fill = PatternFill(start_color="FFFF00", end_color="FFFF00", fill_type="solid")
 
 # Function to create a back button for all steps
 def create_back_button():
@@ -23,25 +22,56 @@ def create_back_button():
 
 
 
-def check_and_prompt_for_net_income(focus_ws):
-    # Look for "Net Income" in column A and check if it's coded with parentheses
-    for row in range(8, focus_ws.max_row + 1):
-        cell_value = str(focus_ws.cell(row=row, column=1).value).strip()
+def check_and_prompt_for_net_income(sheet):
+    # Look for "Net Income" in column A of the ledger sheet and check if it's coded with parentheses
+    for row in range(8, sheet["max_row"] + 1):
+        cell_value = str(sheet["rows"][row - 1][0]).strip()
 
         if 'Net Income' in cell_value and '(' not in cell_value:
             # "Net Income" found without parentheses, ask for input
             net_income_input = st.text_input("Your 'Net Income' is not coded. Please provide the value:", "")
             
             if net_income_input:
-                # If the user enters a value, update the cell with parentheses
+                # If the user enters a value, update the cell with parentheses (cached values only,
+                # like the rest of the wizard's file) and read the ledger again
+                file_bytes = st.session_state.excel_bytes
+                data = file_bytes.getvalue() if isinstance(file_bytes, BytesIO) else file_bytes
+                focus_ws = load_workbook(BytesIO(data), data_only=True).active
                 updated_value = f"Net Income ({net_income_input})"
                 focus_ws.cell(row=row, column=1).value = updated_value
                 st.session_state.excel_bytes = save_updated_excel(focus_ws)  # Save updated Excel file
+                update_ledger(st.session_state.excel_bytes)
                 return True  # Indicates that an update was made
 
     return False  # No update made
 
 
+def update_ledger(file_bytes):
+    # Read the ledger table of the current file (once per distinct file) and keep the Step 4
+    # cleaning on it; the steps up to the transformation read the table instead of the file
+    digest = file_digest(file_bytes)
+    if st.session_state.get("ledger_digest") != digest:
+        if "upload_ledger" in st.session_state:
+            drop_ledger(st.session_state.upload_ledger)
+        st.session_state.upload_ledger = spill_ledger(read_ledger(file_bytes))
+        st.session_state.ledger_digest = digest
+
+    # The cleaned table is only rebuilt when the file or the flagged cells change, not on
+    # every rerun of a step
+    clean = bool(st.session_state.get("clean_totals") and st.session_state.get("flagged_cells"))
+    ledger_key = (digest, tuple(st.session_state.flagged_cells) if clean else None)
+    if st.session_state.get("ledger_key") == ledger_key and "ledger" in st.session_state:
+        return
+
+    ledger = st.session_state.upload_ledger
+    if clean:
+        ledger = spill_ledger(clean_ledger(ledger, st.session_state.flagged_cells))
+    if "ledger" in st.session_state:
+        drop_ledger(st.session_state.ledger, keep=(ledger, st.session_state.upload_ledger))
+    st.session_state.ledger = ledger
+    st.session_state.ledger_key = ledger_key
+
+
 def save_updated_excel(focus_ws):
     output = BytesIO()  # Create a new BytesIO object
     wb = focus_ws.parent  # Get the parent workbook of the active sheet
@@ -51,70 +81,69 @@ def save_updated_excel(focus_ws):
 
 
 
-
-
-# Function to highlight flagged totals
-def highlight_and_flag_totals(file_bytes):
-    # Ensure file_bytes is wrapped in BytesIO before passing to load_workbook
-    if not isinstance(file_bytes, BytesIO):
-        file_bytes = BytesIO(file_bytes)
-
-    wb = load_workbook(filename=file_bytes, data_only=True)
-    flagged_cells = []
-
-    for ws in wb.worksheets:
-        max_row = ws.max_row
-        for row in ws.iter_rows(min_row=1, max_row=max_row, min_col=1, max_col=8):
-            for cell in row:
-                value = str(cell.value) if cell.value else ""
-                if "Total" in value and "(" in value and ")" in value:
-                    cell.fill = yellow_fill
-                    flagged_cells.append((ws.title, cell.coordinate, value))
-
-    output_stream = BytesIO()
-    wb.save(output_stream)
-    output_stream.seek(0)
-    return output_stream, flagged_cells
-
-
-# Function to clean flagged totals (remove parentheses and 'Total')
-def clean_flagged_totals(file_bytes):
-    if isinstance(file_bytes, BytesIO):
-        file_obj = file_bytes
-    else:
-        file_obj = BytesIO(file_bytes)
-
-    wb = load_workbook(filename=file_obj, data_only=True)
-
-    def remove_parentheses_content(text):
-        return re.sub(r'\s*\([^)]*\)', '', text).strip()
-
-    for ws in wb.worksheets:
-        max_row = ws.max_row
-        for row in ws.iter_rows(min_row=1, max_row=max_row, min_col=1, max_col=8):
-            for cell in row:
-                if cell.value and "Total" in str(cell.value):
-                    cell.value = remove_parentheses_content(str(cell.value))  # Clean text
-                    cell.fill = PatternFill()  # Reset the highlight fill
-
-    # Save the updated file and return as BytesIO
-    output_stream = BytesIO()
-    wb.save(output_stream)
-    output_stream.seek(0)
-    return output_stream
-
-
-
 # Function to perform P&L transformation
-def perform_pnl_transformation(file_bytes):
-    from pnl_macro_translation import run_full_pl_macro
-    return run_full_pl_macro(file_bytes)
+def perform_pnl_transformation(file_bytes, profile=None, color_mode="fill", collapse=False, flagged=(), clean=False):
+    # Profiled runs skip the cache so every stage is measured; the Step 4 edits are applied here
+    if profile is not None:
+        return run_full_pl_macro(file_bytes, profile=profile, color_mode=color_mode, collapse=collapse,
+                                 flagged=flagged, clean=clean)
+    return cached_call("pnl", run_full_pl_macro, file_bytes, "columnar", None, color_mode, "workbook", "openpyxl",
+                       collapse, tuple(flagged), clean)
 
 
 # Function to perform Balance transformation
-def perform_balance_transformation(file_bytes):
-    from balance import balance_focus_grouping 
-    return balance_focus_grouping(file_bytes)
+def perform_balance_transformation(file_bytes, profile=None, color_mode="fill", collapse=False, flagged=(),
+                                   clean=False):
+    # Profiled runs skip the cache so every stage is measured; the Step 4 edits are applied here
+    if profile is not None:
+        return balance_focus_grouping(file_bytes, profile=profile, color_mode=color_mode, collapse=collapse,
+                                      flagged=flagged, clean=clean)
+    return cached_call("balance", balance_focus_grouping, file_bytes, "sheet", None, color_mode, "workbook",
+                       "openpyxl", collapse, tuple(flagged), clean)
+
+
+# Function to pick the client and build the eFocus file (Step 7)
+def efocus_focus(file_bytes, client_data_bytes):
+    # Read the client names from the second uploaded file (client_data_bytes)
+    # (only its header row is read here; the file stays cached for the client columns)
+    client_names = cached_call("client_names", list_client_names, client_data_bytes, "xml")
+
+    # If no valid client names were found, show a message and exit
+    if not client_names:
+        st.error("No valid client names found in the client data.")
+        return None, None  # Return None for both if no client names are found
+
+    # Display the valid client names as clickable buttons in columns
+    selected_client = None
+    columns = st.columns(4)  # Create 4 columns to stack the buttons
+
+    # Loop through client names and place them into columns
+    for idx, client in enumerate(client_names):
+        col_idx = idx % 4  # Determine the column index based on the position
+        if columns[col_idx].button(client):
+            selected_client = client  # Store the selected client name when the button is clicked
+
+    # If a client has been selected, proceed
+    if selected_client:
+        st.write(f"You selected: {selected_client}")
+
+        # Build the eFocus workbook once per Focus file, client data file and client
+        try:
+            output = cached_call("efocus", build_efocus_workbook, file_bytes, client_data_bytes, selected_client,
+                                 "xml")
+        except Exception as e:
+            # Handle potential errors related to loading the workbook
+            print(f"Error loading Excel file: {e}")
+            st.error(f"Error loading Excel file: {e}")
+            return None, None
+
+        # Return both the transformed file and selected client
+        return output, selected_client
+
+    # If no client has been selected yet, inform the user
+    st.info("Please select a client name to proceed.")
+    return None, None  # Return None if no client is selected
+
 
 # ---------- Streamlit App Flow ----------
 st.set_page_config(page_title="Personal Information Collection", layout="wide")
@@ -188,20 +217,19 @@ elif st.session_state.step == 3:
     if uploaded_file:
         file_bytes = uploaded_file.read()
 
-        # Load the workbook to check the number of sheets
-        wb = load_workbook(filename=BytesIO(file_bytes))
-        sheet_names = wb.sheetnames  # List of sheet names
-        if len(sheet_names) > 1:
+        # Probe the upload to check the number of sheets (the workbook isn't loaded)
+        probe = probe_workbook(file_bytes)
+        if probe["sheet_count"] > 1:
             # If multiple sheets are detected, ask the user to resubmit a new file with a single sheet
             st.error("Your file contains multiple sheets. Please resubmit a new file with only one sheet.")
             st.session_state.step = 3  # Stay on Step 3 so they can upload again
         else:
             # If there is only one sheet, proceed with the regular logic
-            sheet = wb.active
-
-            # Now highlight and flag totals on the selected sheet
-            highlighted_file, flagged = highlight_and_flag_totals(file_bytes)
-            st.session_state.excel_bytes = highlighted_file  # Store the highlighted file in session state
+            # Read the ledger table once and flag the totals on it (the highlight is applied by the transformation)
+            st.session_state.excel_bytes = file_bytes  # Store the uploaded file in session state
+            st.session_state.clean_totals = False
+            update_ledger(file_bytes)
+            flagged = scan_ledger_totals(st.session_state.ledger)
             st.session_state.flagged_cells = flagged  # Store the flagged cells
     
             st.success(f"Found {len(flagged)} potentially incorrect 'Total' cells.")
@@ -233,14 +261,9 @@ elif st.session_state.step == 4:
         # Button for cleaning flagged totals
         with col1:
             if st.button("Yes, clean these cells"):
-                # Get the current file from session state
-                file_bytes = st.session_state.excel_bytes
-                
-                # Clean the flagged totals (this function will modify the file)
-                cleaned_file = clean_flagged_totals(file_bytes)
-
-                # Update the session state with the cleaned file
-                st.session_state.excel_bytes = cleaned_file  # Store the cleaned file in session state
+                # Clean the flagged totals in the ledger; the file is cleaned by the transformation
+                st.session_state.clean_totals = True
+                update_ledger(st.session_state.excel_bytes)
 
                 # Proceed to Step 5 after cleaning
                 st.session_state.step = 5  # Move to Step 5 (next step)
@@ -248,12 +271,9 @@ elif st.session_state.step == 4:
         # Button for leaving the flagged totals as-is (just keep them highlighted)
         with col2:
             if st.button("No, leave them as-is"):
-                # Ensure we keep the file as-is with highlighted totals, no cleaning
-                file_bytes = st.session_state.excel_bytes
-                
-                # Just highlight the totals again and move to Step 5
-                highlighted_file, _ = highlight_and_flag_totals(file_bytes)  # Re-highlight if needed
-                st.session_state.excel_bytes = highlighted_file  # Store the highlighted file in session state
+                # Keep the values as-is; the transformation highlights the flagged totals
+                st.session_state.clean_totals = False
+                update_ledger(st.session_state.excel_bytes)
 
                 # Proceed to Step 5 without cleaning
                 st.session_state.step = 5  # Move to Step 5 (next step)
@@ -262,6 +282,9 @@ elif st.session_state.step == 4:
         # If no flagged cells, display a message
         st.info("No problematic 'Total' cells found. Skipping ahead.")
         if st.button("Continue"):
+            # Nothing to clean or highlight
+            st.session_state.clean_totals = False
+
             # Proceed to Step 5 if no flagged cells
             st.session_state.step = 5  # Skip to Step 5 if no flagged cells
 
@@ -269,29 +292,13 @@ elif st.session_state.step == 4:
 
 # Step 5: Choose Transformation Type
 elif st.session_state.step == 5:
-    file_bytes = st.session_state.excel_bytes  # The current file in session state
-
-    # Load the workbook
-    if not isinstance(file_bytes, BytesIO):
-        file_bytes = BytesIO(file_bytes)
+    # The ledger table of the current file, with the Step 4 cleaning (only read again when the file changed)
+    update_ledger(st.session_state.excel_bytes)
+    sheet = ledger_sheet(st.session_state.ledger)  # The active sheet's values
 
-    wb = load_workbook(file_bytes)
-    sheet = wb.active  # Use the active sheet from the loaded workbook
-    focus_ws = wb.active  # Get the active sheet from the loaded workbook
-    
-    # Check for empty cells in column A (rows 5-10) and collapse if necessary
-    empty_cell_count = 0
-    total_cells_to_check = 6  # Checking rows 5 to 10 (6 rows total)
-    for row in range(5, 11):  # Rows 5 to 10 in column A
-        cell = sheet.cell(row=row, column=1)
-        if cell.value is None or str(cell.value).strip() == "":
-            empty_cell_count += 1
-    if empty_cell_count == total_cells_to_check:
-        collapsed_file = collapse_sheet(file_bytes)
-        if isinstance(collapsed_file, BytesIO):  # Ensure it returns BytesIO
-            st.session_state.excel_bytes = collapsed_file
-        else:
-            st.error("Error: Collapse function did not return a valid file.")
+    # Check for empty cells in column A (rows 5-10); the transformation collapses the sheet
+    # itself if necessary
+    collapse = sheet_needs_collapse(sheet)
     
     st.title("🔧 What type of filing is this?")
     st.write("Select the type of filing for this document.")
@@ -310,16 +317,37 @@ elif st.session_state.step == 5:
         if net_income_updated:
             st.success("Net Income has been updated!")  # Let the user know the update was made
 
+    # Optional per-stage timing report, shown on the download page
+    profile_run = st.checkbox("Profile this run (per-stage timings)", value=False)
+
+    # Conditional formatting colors the rows by code with a few rules instead of a fill per cell
+    conditional_colors = st.checkbox("Color code with conditional formatting (faster for large files)", value=False)
+    color_mode = "conditional" if conditional_colors else "fill"
+
     # "Run Transformation" button
     if st.button("Run Transformation"):
+        profile = {} if profile_run else None
+
+        # Labels that aren't "Description (focus/ssoi)" (P&L) or "Description (code)" (Balance
+        # Sheet) are listed on the download page
+        filing_type = "pnl" if choice == "Profit & Loss (P&L)" else "balance"
+        st.session_state.filing_type = filing_type
+        st.session_state.malformed_labels = scan_ledger_labels(st.session_state.ledger, collapse, filing_type)
+
         # Only run transformations when the button is clicked
         if choice == "Profit & Loss (P&L)":
             # Proceed with P&L transformation
-            st.session_state.excel_bytes = perform_pnl_transformation(st.session_state.excel_bytes)
+            st.session_state.excel_bytes = perform_pnl_transformation(st.session_state.excel_bytes, profile, color_mode,
+                                                                       collapse, st.session_state.flagged_cells,
+                                                                       st.session_state.clean_totals)
         
         elif choice == "Balance Sheet":
             # Run balance transformation only after Net Income update (if applicable)
-            st.session_state.excel_bytes = perform_balance_transformation(st.session_state.excel_bytes)
+            st.session_state.excel_bytes = perform_balance_transformation(st.session_state.excel_bytes, profile,
+                                                                           color_mode, collapse,
+                                                                           st.session_state.flagged_cells,
+                                                                           st.session_state.clean_totals)
+        st.session_state.profile_report = profile
         st.session_state.step = 6
 
 # Step 6: Final Processed File Download
@@ -335,9 +363,28 @@ elif st.session_state.step == 6:
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
 
+    # Show the per-stage report if this run was profiled
+    profile_report = st.session_state.get("profile_report")
+    if profile_report:
+        with st.expander(f"Profile: {profile_report['pipeline']} ({profile_report['total_seconds']:.2f}s)"):
+            st.dataframe(profile_report["stages"])
+
+    # List the account labels the transformation could not read in the filing type's layout
+    malformed_labels = st.session_state.get("malformed_labels")
+    if malformed_labels:
+        label_format = label_formats[st.session_state.get("filing_type", "pnl")]
+        st.warning(f"{len(malformed_labels)} account label(s) could not be read as \"{label_format}\".")
+        with st.expander("Show the labels"):
+            st.dataframe([{"row": row, "label": str(label), "problem": problem}
+                          for row, label, problem in malformed_labels])
+
     # Button to start over and reset session state
     if st.button("Start Over"):
-        for key in ["step", "excel_bytes", "flagged_cells"]:
+        for key in ["ledger", "upload_ledger"]:
+            if key in st.session_state:
+                drop_ledger(st.session_state[key])
+        for key in ["step", "excel_bytes", "flagged_cells", "profile_report", "malformed_labels", "ledger",
+                    "upload_ledger", "ledger_digest", "ledger_key", "clean_totals"]:
             st.session_state.pop(key, None)
 
     # Button to continue to eFocus creation (Step 7)
@@ -381,6 +428,24 @@ elif st.session_state.step == 7:
             # If the transformation fails, show the message once
             st.info("Please select a client name to proceed.")
 
+        # Or build the Filing Items Focus sheets of every client in one pass (month-end run)
+        batch_choice = st.radio("Build for all clients as:", ["Zip of workbooks", "One workbook"], index=0)
+        if st.button("Build for All Clients"):
+            batch_output = "zip" if batch_choice == "Zip of workbooks" else "workbook"
+            try:
+                batch_file = cached_call("efocus_batch", build_efocus_batch, file_bytes, client_data_bytes, None,
+                                         batch_output, "xml")
+            except Exception as e:
+                st.error(f"Error building the eFocus files: {e}")
+            else:
+                st.download_button(
+                    label="Download All Clients",
+                    data=batch_file,
+                    file_name="efocus_all_clients.zip" if batch_output == "zip" else "efocus_all_clients.xlsx",
+                    mime="application/zip" if batch_output == "zip"
+                    else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                )
+
     # Only show the "Continue to Step 8" button if file processing was successful
     if st.button("Continue"):
         if not transformed_file:  # Only allow proceeding if the file was properly processed
@@ -514,83 +579,25 @@ elif st.session_state.step == 11:
     st.title("📥 Download Updated Filing Items Focus")  # Title for Step 11
     st.write("Click the button below to download the updated Excel file.")  # Description for Step 11
 
-    # Load the current Excel file from st.session_state.excel_bytes
-    file_bytes = st.session_state.excel_bytes
-
-    # Correct way to load the workbook from the BytesIO object
-    wb = load_workbook(file_bytes)  # Pass BytesIO directly to load_workbook
-    focus_ws = wb["Filing Items Focus"]  # Assuming the sheet is named "Filing Items Focus"
-    
     # Assign variables from session state
-    filing_frequency = st.session_state.filing_frequency
-    monthly_income = st.session_state.monthly_income if 'monthly_income' in st.session_state else None
-    ending_equity_balance = st.session_state.ending_equity_balance
-    fidelity_bond_haircut = st.session_state.fidelity_bond_haircut
-    undue_concentration_haircut = st.session_state.undue_concentration_haircut
-    debt_securities_haircut = st.session_state.debt_securities_haircut
-    other_securities_haircut = st.session_state.other_securities_haircut
-    exempted_securities_haircut = st.session_state.exempted_securities_haircut
-
-
-    # Mapping filing_frequency: "Monthly" = 1, "Quarterly" = 3
-    filing_value = 1 if filing_frequency == "Monthly" else 3
-    
-    # Get the current value in row 165, column B (Filing Frequency)
-    current_value = focus_ws.cell(row=165, column=2).value
-
-    # Check if the value in the cell differs from the user's input
-    if current_value != filing_value:
-        focus_ws.cell(row=165, column=2, value=filing_value)
-        
-        # Apply red highlight (only if the value differs)
-        red_fill = PatternFill(start_color="FF0000", end_color="FF0000", fill_type="solid")
-        focus_ws.cell(row=165, column=2).fill = red_fill  # Highlight in red if different
-
-    # Apply monthly income to row 191, column B (only if the value exists)
-    if monthly_income is not None:
-        focus_ws.cell(row=191, column=2, value=monthly_income)
-
-    # Apply ending equity balance to row 199, column B (only if the value exists)
-    if ending_equity_balance is not None:
-        focus_ws.cell(row=199, column=2, value=ending_equity_balance)
-
-    # Apply fidelity bond haircut to row 138, column B (only if the value exists)
-    if fidelity_bond_haircut is not None:
-        focus_ws.cell(row=138, column=2, value=fidelity_bond_haircut)
-
-
-    # Apply undue concentration haircut to row 142, column B (only if the value exists)
-    if undue_concentration_haircut is not None:
-        focus_ws.cell(row=142, column=2, value=undue_concentration_haircut)
-
-
-    # Apply debt securities haircut to row 146, column B (only if the value exists)
-    if debt_securities_haircut is not None:
-        focus_ws.cell(row=146, column=2, value=debt_securities_haircut)
-
-
-    # Apply other securities haircut to row 147, column B (only if the value exists)
-    if other_securities_haircut is not None:
-        focus_ws.cell(row=147, column=2, value=other_securities_haircut)
-
-
-    # Apply exempted securities haircut to row 148, column B (only if the value exists)
-    if exempted_securities_haircut is not None:
-        focus_ws.cell(row=148, column=2, value=exempted_securities_haircut)
+    client_answers = (
+        st.session_state.filing_frequency,
+        st.session_state.monthly_income if 'monthly_income' in st.session_state else None,
+        st.session_state.ending_equity_balance,
+        st.session_state.fidelity_bond_haircut,
+        st.session_state.undue_concentration_haircut,
+        st.session_state.debt_securities_haircut,
+        st.session_state.other_securities_haircut,
+        st.session_state.exempted_securities_haircut,
+    )
 
+    # Apply the answers to the eFocus file; the file from Step 7 stays as-is so reruns hit the cache
+    updated_file = cached_call("client_answers", apply_client_answers, st.session_state.excel_bytes, *client_answers)
 
-    # Save the updated workbook to st.session_state.excel_bytes
-    output = BytesIO()
-    wb.save(output)
-    output.seek(0)  # Reset the cursor position to the beginning
-    
-    # Store the updated Excel file in session_state
-    st.session_state.excel_bytes = output
-    
     # Provide the download button for the updated file
     st.download_button(
         label="Download Updated Filing Items Focus",
-        data=st.session_state.excel_bytes,
+        data=updated_file,
         file_name="updated_filing_items_focus.xlsx",
         mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
     )
@@ -0,0 +1,43 @@
+import os
+import sys
+
+# Writes the baseline fixtures of tests/test_baseline.py: small generated trial balances
+# and the outputs of the original transformations (the top-level modules of the first
+# commit, 83ae702) for them. Run it with the path of a checkout of that commit, e.g.
+#   git worktree add /tmp/baseline 83ae702
+#   python tests/fixtures/make_fixtures.py /tmp/baseline
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(here)))
+
+from benchmarks.generate import write_trial_balance  # noqa: E402
+
+# (name, kind, rows, seed); the balance inputs stay within the macro's 100-row window
+fixtures = [
+    ("pnl_40", "pnl", 40, 0),
+    ("pnl_150", "pnl", 150, 1),
+    ("balance_40", "balance", 40, 0),
+    ("balance_60", "balance", 60, 1),
+]
+
+
+def main(baseline):
+    sys.path.insert(0, baseline)
+    from pnl_macro_translation import run_full_pl_macro
+    from balance import balance_focus_grouping
+
+    for name, kind, rows, seed in fixtures:
+        path = os.path.join(here, f"{name}.xlsx")
+        write_trial_balance(path, rows, kind, seed)
+        with open(path, "rb") as f:
+            file_bytes = f.read()
+        if kind == "pnl":
+            output = run_full_pl_macro(file_bytes).getvalue()
+        else:
+            output = balance_focus_grouping(file_bytes)
+        with open(os.path.join(here, f"{name}_baseline.xlsx"), "wb") as f:
+            f.write(output)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1])
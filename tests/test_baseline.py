@@ -0,0 +1,93 @@
+import os
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+from taallc import balance_focus_grouping, run_full_pl_macro
+
+# The outputs must match those of the original transformations (the first commit's
+# top-level modules), checked in under fixtures/ by fixtures/make_fixtures.py: values,
+# number formats, fills and fonts of every cell. Amounts are compared to the cent; the
+# original summed floats, so its subtotals can be off by float noise.
+
+fixtures = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+# Cells whose values differ from the original on purpose; their formats still have to
+# match. The category totals and the NET INCOME / balance grand totals now count every
+# row of the trial balance, summed in cents (user-017, user-018).
+changed_values = {
+    "pnl_40": {("Focus", "F32"), ("Focus", "F44"), ("Focus", "F45"), ("SSOI", "F44"), ("SSOI", "F45")},
+    "pnl_150": {("Focus", "F154"), ("Focus", "F155"), ("SSOI", "F154"), ("SSOI", "F155")},
+    "balance_40": {("Focus", coordinate) for coordinate in ("F57", "F60", "F61", "F62", "F63", "F64")},
+    "balance_60": {("Focus", coordinate) for coordinate in ("F79", "F80", "F81", "F82", "F83")},
+}
+
+# Cells the original left empty: the balance summary now lists every group, the last one
+# included (user-003)
+added_cells = {
+    "balance_40": {("Focus", "I20"), ("Focus", "J20")},
+    "balance_60": {("Focus", "I22"), ("Focus", "J22")},
+}
+
+
+def fixture_bytes(name):
+    with open(os.path.join(fixtures, f"{name}.xlsx"), "rb") as f:
+        return f.read()
+
+
+def color(value):
+    return value.rgb if value is not None and value.type == "rgb" else None
+
+
+def cell_snapshot(output):
+    # {(sheet, coordinate): (value, number format, fill, font)} of every cell with a value
+    # or a style
+    cells = {}
+    for ws in load_workbook(BytesIO(output)).worksheets:
+        for row in ws.iter_rows():
+            for cell in row:
+                if cell.value is None and not cell.has_style:
+                    continue
+                value = round(cell.value, 2) if isinstance(cell.value, float) else cell.value
+                cells[ws.title, cell.coordinate] = (
+                    value, cell.number_format, (cell.fill.fill_type, color(cell.fill.fgColor)),
+                    (cell.font.b, cell.font.i, color(cell.font.color)))
+    return cells
+
+
+def compare(name, output):
+    baseline = cell_snapshot(fixture_bytes(f"{name}_baseline"))
+    result = cell_snapshot(output)
+    changed = changed_values.get(name, set())
+    added = added_cells.get(name, set())
+    assert added <= set(result) - set(baseline)
+    empty = (None, "General", (None, "00000000"), (False, False, None))
+    for key in sorted(set(baseline) | set(result) - added):
+        expected, found = baseline.get(key, empty), result.get(key, empty)
+        if key in changed:
+            expected, found = expected[1:], found[1:]
+        assert found == expected, key
+
+
+# Every (engine, writer, reader) combination of the P&L transformation gives the original
+# layout
+pnl_paths = [
+    ("sheet", "workbook", "openpyxl"),
+    ("columnar", "workbook", "openpyxl"),
+    ("columnar", "stream", "openpyxl"),
+    ("columnar", "stream", "xml"),
+]
+
+
+@pytest.mark.parametrize("name", ["pnl_40", "pnl_150"])
+@pytest.mark.parametrize("path", pnl_paths, ids="-".join)
+def test_pnl_matches_baseline(name, path):
+    engine, writer, reader = path
+    output = run_full_pl_macro(fixture_bytes(name), engine=engine, writer=writer, reader=reader)
+    compare(name, output.getvalue())
+
+
+@pytest.mark.parametrize("name", ["balance_40", "balance_60"])
+def test_balance_matches_baseline(name):
+    compare(name, balance_focus_grouping(fixture_bytes(name)))
@@ -0,0 +1,63 @@
+import csv
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.generate import write_trial_balance
+from taallc.batch import read_manifest, run_batch, process_filing
+
+
+def write_manifest(path, rows):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(["file", "type"])
+        writer.writerows(rows)
+    return str(path)
+
+
+def focus_descriptions(output):
+    focus = load_workbook(BytesIO(output))["Focus"]
+    return [row[4] for row in focus.iter_rows(min_row=8, values_only=True) if row[4]]
+
+
+def test_process_filing_cleans_the_flagged_cells(tmp_path):
+    path = tmp_path / "pnl.xlsx"
+    write_trial_balance(str(path), 60, "pnl", seed=2, total_ratio=0.2)
+    output, flagged, collapsed, malformed = process_filing(path.read_bytes(), "pnl")
+    assert flagged > 0
+    assert collapsed is False
+    assert malformed == 0
+    # Cleaned, the Total lines lose their codes and drop out of the Focus sheet; only
+    # highlighted, they stay in
+    assert not any(str(label).startswith("Total") for label in focus_descriptions(output))
+    output, highlighted, _, _ = process_filing(path.read_bytes(), "pnl", clean=False)
+    assert highlighted == flagged
+    assert sum(str(label).startswith("Total") for label in focus_descriptions(output)) > 0
+
+
+def test_read_manifest_rejects_the_same_file_twice(tmp_path):
+    manifest = write_manifest(tmp_path / "manifest.csv", [["a.xlsx", "pnl"], ["./a.xlsx", "balance"]])
+    with pytest.raises(ValueError):
+        read_manifest(manifest)
+
+
+def test_same_name_in_two_directories(tmp_path):
+    for directory, kind in (("east", "pnl"), ("west", "balance")):
+        (tmp_path / directory).mkdir()
+        write_trial_balance(str(tmp_path / directory / "client.xlsx"), 30, kind, seed=0)
+    paths = [str(tmp_path / "east" / "client.xlsx"), str(tmp_path / "west" / "client.xlsx")]
+    out = tmp_path / "out"
+
+    # By name alone the manifest entry is ambiguous, so both files are skipped
+    manifest = read_manifest(write_manifest(tmp_path / "names.csv", [["client.xlsx", "pnl"]]))
+    results = run_batch(paths, manifest, str(out), workers=1)
+    assert [result["status"] for result in results] == ["skipped", "skipped"]
+
+    # By path each file gets its own type and its own output
+    manifest = read_manifest(write_manifest(tmp_path / "paths.csv", [[paths[0], "pnl"], [paths[1], "pnl"]]))
+    results = run_batch(paths, manifest, str(out), workers=1)
+    assert [result["status"] for result in results] == ["ok", "ok"]
+    outputs = [result["output"] for result in results]
+    assert len(set(outputs)) == 2
+    assert sorted(path.name for path in out.iterdir()) == ["client_pnl (2).xlsx", "client_pnl.xlsx"]
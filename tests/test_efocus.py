@@ -0,0 +1,63 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.generate import write_client_data
+from taallc import efocus
+from taallc.efocus import clear_client_data, client_data_entry, list_client_names, load_client_columns
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_client_data()
+    yield
+    clear_client_data()
+
+
+def client_data(tmp_path, clients=3, seed=0):
+    path = tmp_path / f"client_data_{clients}_{seed}.xlsx"
+    write_client_data(str(path), clients, seed)
+    return path.read_bytes()
+
+
+def sheet_columns(data, columns):
+    ws = load_workbook(BytesIO(data)).worksheets[0]
+    return {col: [row[col - 1] for row in ws.iter_rows(values_only=True)] for col in columns}
+
+
+@pytest.mark.parametrize("reader", ["openpyxl", "xml"])
+def test_columns_match_the_sheet(tmp_path, reader):
+    data = client_data(tmp_path)
+    assert list_client_names(data, reader) == ["Client 1", "Client 2", "Client 3"]
+    entry = client_data_entry(data, reader)
+    assert entry["client_columns"] == {"Client 1": 3, "Client 2": 5, "Client 3": 7}
+    assert load_client_columns(entry, (1, 2, 5)) == sheet_columns(data, (1, 2, 5))
+    # A second client only reads its own column
+    assert sorted(entry["columns"]) == [1, 2, 5]
+    assert load_client_columns(entry, (1, 7)) == sheet_columns(data, (1, 7))
+    assert sorted(entry["columns"]) == [1, 2, 5, 7]
+
+
+def test_eviction_closes_the_workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(efocus, "max_client_files", 2)
+    entries = [client_data_entry(client_data(tmp_path, seed=seed), "xml") for seed in range(3)]
+    assert entries[0]["book"] is None and entries[0]["columns"] == {}
+    assert entries[1]["book"] is not None and entries[2]["book"] is not None
+    # An entry still held after its eviction reopens its file for the columns it lacks
+    assert load_client_columns(entries[0], (1, 3)) == sheet_columns(entries[0]["data"], (1, 3))
+    assert entries[0]["book"] is None
+
+
+def test_eviction_by_bytes(tmp_path, monkeypatch):
+    files = [client_data(tmp_path, seed=seed) for seed in range(3)]
+    monkeypatch.setattr(efocus, "max_client_bytes", len(files[0]) + len(files[1]) + 1)
+    for data in files:
+        client_data_entry(data, "openpyxl")
+    assert len(efocus._client_data) == 2
+    assert efocus._client_data_bytes == len(files[1]) + len(files[2])
+    # The newest file stays even when it alone is over the limit
+    monkeypatch.setattr(efocus, "max_client_bytes", 1)
+    entry = client_data_entry(files[0], "openpyxl")
+    assert list(efocus._client_data.values()) == [entry]
+    assert efocus._client_data_bytes == len(files[0])
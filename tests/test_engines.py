@@ -0,0 +1,149 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import load_workbook
+
+from benchmarks.generate import trial_balance_rows, write_trial_balance
+from taallc import run_full_pl_macro, balance_focus_grouping
+
+# Differential tests for the P&L and balance transformations on bigger inputs than the
+# baseline fixtures (see test_baseline.py, which anchors the reference paths to the
+# original macros): every engine, writer and reader combination must give the same cell
+# values and formats as the reference path for its kind, and the totals must match sums
+# worked out here from the generated lines, without the engines' code tables.
+
+transformations = {"pnl": run_full_pl_macro, "balance": balance_focus_grouping}
+
+# (engine, writer, reader) combinations the transformations accept
+paths = [
+    ("sheet", "workbook", "openpyxl"),
+    ("columnar", "workbook", "openpyxl"),
+    ("columnar", "stream", "openpyxl"),
+    ("columnar", "stream", "xml"),
+]
+
+# The P&L paths all match the original openpyxl path. The balance sheet engine keeps the
+# macro's row window and layout, which the columnar engine drops (see balance_engine.py),
+# so its output is only checked against the totals and the columnar paths against the
+# first one.
+reference_paths = {"pnl": paths[0], "balance": paths[1]}
+
+# The balance sheet engine only formats rows 8 to 100 of the Focus sheet, so the balance
+# inputs stay small enough for its output to fit in that window
+cases = [("pnl", 40, 0), ("pnl", 150, 1), ("balance", 40, 0), ("balance", 60, 1)]
+
+
+@pytest.fixture(scope="module")
+def outputs(tmp_path_factory):
+    # Cells of every output (see output_cells), keyed by (kind, rows, seed, path)
+    results = {}
+    for kind, rows, seed in cases:
+        path = tmp_path_factory.mktemp("input") / f"{kind}.xlsx"
+        write_trial_balance(str(path), rows, kind, seed)
+        file_bytes = path.read_bytes()
+        for engine, writer, reader in paths:
+            output = transformations[kind](file_bytes, engine=engine, writer=writer, reader=reader)
+            results[kind, rows, seed, (engine, writer, reader)] = output_cells(output)
+    return results
+
+
+def color(value):
+    return value.rgb if value is not None and value.type == "rgb" else None
+
+
+def output_cells(output):
+    # ({sheet title: {coordinate: value}} of the non-empty cells of an output workbook,
+    # {sheet title: {coordinate: (number format, fill, font)}} of its styled cells)
+    if isinstance(output, BytesIO):
+        output = output.getvalue()
+    wb = load_workbook(BytesIO(output))
+    values = {ws.title: {cell.coordinate: cell.value for row in ws.iter_rows() for cell in row
+                         if cell.value is not None}
+              for ws in wb.worksheets}
+    styles = {ws.title: {cell.coordinate: (cell.number_format, (cell.fill.fill_type, color(cell.fill.fgColor)),
+                                           (cell.font.b, cell.font.i, color(cell.font.color)))
+                         for row in ws.iter_rows() for cell in row if cell.has_style}
+              for ws in wb.worksheets}
+    return values, styles
+
+
+def expected_totals(kind, rows, seed):
+    # Category sums in cents straight from the generated lines
+    totals = {}
+    for line in trial_balance_rows(rows, kind, seed):
+        if line is None:
+            continue
+        label, amount = line
+        focus = int(label.rsplit("(", 1)[1].split("/")[0].rstrip(")"))
+        if kind == "pnl":
+            category = "income" if focus < 4000 else "expense"
+        elif focus <= 940:
+            category = "asset"
+        elif focus <= 1760:
+            category = "liability"
+        else:
+            category = "equity"
+        totals[category] = totals.get(category, 0) + round(amount * 100)
+    return totals
+
+
+def cents(value):
+    return round(value * 100)
+
+
+grand_total_labels = {"NET INCOME", "TOTAL ASSETS", "TOTAL LIABILITIES AND EQUITY", "BALANCE"}
+
+
+def column_totals(sheet):
+    # {label in column E: value} of the grand totals in the Totals column, with the other
+    # values below the headers (the category totals) under None, top to bottom
+    totals = {None: []}
+    rows = sorted(int(coordinate[1:]) for coordinate in sheet if coordinate[0] == "F")
+    for row in rows:
+        if row > 7:
+            label = sheet.get(f"E{row}")
+            if label in grand_total_labels:
+                totals[label] = sheet[f"F{row}"]
+            else:
+                totals[None].append(sheet[f"F{row}"])
+    return totals
+
+
+compared_paths = [(kind, rows, seed, path) for kind, rows, seed in cases for path in paths
+                  if path != reference_paths[kind] and (kind, path[0]) != ("balance", "sheet")]
+
+
+@pytest.mark.parametrize("kind, rows, seed, path", compared_paths)
+def test_matches_reference_path(outputs, kind, rows, seed, path):
+    reference = outputs[kind, rows, seed, reference_paths[kind]]
+    result = outputs[kind, rows, seed, path]
+    for expected, found in zip(reference, result):
+        assert list(found) == list(expected)
+        for title in expected:
+            assert found[title] == expected[title], title
+
+
+@pytest.mark.parametrize("kind, rows, seed", [case for case in cases if case[0] == "pnl"])
+@pytest.mark.parametrize("path", paths, ids="-".join)
+def test_pnl_totals(outputs, kind, rows, seed, path):
+    totals = expected_totals(kind, rows, seed)
+    result = outputs[kind, rows, seed, path][0]
+    for title in ("Focus", "SSOI"):
+        column = column_totals(result[title])
+        income, expense = column[None]
+        assert cents(income) == totals["income"]
+        assert cents(expense) == totals["expense"]
+        assert cents(column["NET INCOME"]) == totals["income"] - totals["expense"]
+
+
+@pytest.mark.parametrize("kind, rows, seed", [case for case in cases if case[0] == "balance"])
+@pytest.mark.parametrize("path", paths, ids="-".join)
+def test_balance_totals(outputs, kind, rows, seed, path):
+    totals = expected_totals(kind, rows, seed)
+    column = column_totals(outputs[kind, rows, seed, path][0]["Focus"])
+    # The sheet engine can leave the category totals out of code order, so compare them
+    # as a set
+    assert sorted(map(cents, column[None])) == sorted(totals.values())
+    assert cents(column["TOTAL ASSETS"]) == totals["asset"]
+    assert cents(column["TOTAL LIABILITIES AND EQUITY"]) == totals["liability"] + totals["equity"]
+    assert cents(column["BALANCE"]) == totals["asset"] - totals["liability"] - totals["equity"]
@@ -0,0 +1,50 @@
+from io import BytesIO
+
+from openpyxl import Workbook, load_workbook
+
+from taallc.flag_totals import (clean_flagged_totals, clean_ledger, highlight_flagged_totals, scan_flagged_totals,
+                                scan_ledger_totals)
+from taallc.ledger import ledger_sheet, read_ledger
+
+
+def ledger_workbook():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "TB"
+    ws.append(["Rent (4070/29)", 10])
+    ws.append(["Total Rent (4070/29)", 10])
+    ws.append(["Total", 10, None, None, None, None, None, None, "Total past H (1/2)"])
+    other = wb.create_sheet("Notes")
+    other["C2"] = "Total Fees ( 3010 / 1 )"
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def test_scan_finds_labelled_totals_in_columns_a_to_h():
+    file_bytes = ledger_workbook()
+    flagged = [("TB", "A2", "Total Rent (4070/29)"), ("Notes", "C2", "Total Fees ( 3010 / 1 )")]
+    assert scan_flagged_totals(file_bytes) == flagged
+    assert sorted(scan_ledger_totals(read_ledger(file_bytes))) == sorted(flagged)
+
+
+def test_highlight_and_clean():
+    file_bytes = ledger_workbook()
+    flagged = scan_flagged_totals(file_bytes)
+    wb = load_workbook(highlight_flagged_totals(file_bytes, flagged))
+    assert wb["TB"]["A2"].fill.fgColor.rgb == "00FFFF00"
+    assert wb["TB"]["A1"].fill.fill_type is None
+
+    wb = load_workbook(clean_flagged_totals(highlight_flagged_totals(file_bytes, flagged).getvalue(), flagged))
+    assert (wb["TB"]["A2"].value, wb["Notes"]["C2"].value) == ("Total Rent", "Total Fees")
+    assert wb["TB"]["A2"].fill.fill_type is None
+    assert wb["TB"]["A1"].value == "Rent (4070/29)"
+
+
+def test_clean_ledger_matches_the_cleaned_file():
+    file_bytes = ledger_workbook()
+    ledger = read_ledger(file_bytes)
+    cleaned = clean_ledger(ledger, scan_ledger_totals(ledger))
+    expected = read_ledger(clean_flagged_totals(file_bytes).getvalue())
+    for title in ("TB", "Notes"):
+        assert ledger_sheet(cleaned, title)["rows"] == ledger_sheet(expected, title)["rows"]
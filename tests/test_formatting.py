@@ -0,0 +1,35 @@
+from openpyxl import Workbook
+
+from taallc.formatting import comma_format, format_body_row, format_summary_header
+
+
+def test_format_body_row():
+    wb = Workbook()
+    ws = wb.active
+    ws.append([None, None, "4070 Total", 12.4, None, 1234.5, None, None, 99.6, 10.2])
+    ws.append([None, None, "4070", "text"])
+    format_body_row(ws, 1)
+    format_body_row(ws, 2)
+    assert (ws["I1"].value, ws["J1"].value) == (100, 10)
+    assert {ws[coord].number_format for coord in ("D1", "F1", "I1", "J1")} == {comma_format}
+    assert ws["C1"].font.b and not ws["C2"].font.b
+    assert ws["D2"].number_format == "General"
+
+
+def test_format_body_row_leaves_missing_cells_missing():
+    wb = Workbook()
+    ws = wb.active
+    ws["C1"] = "4070 Total"
+    ws["D1"] = 12.4
+    format_body_row(ws, 1)
+    assert ws.calculate_dimension() == "C1:D1"
+
+
+def test_format_summary_header():
+    wb = Workbook()
+    ws = wb.active
+    ws["L7"] = "after"
+    format_summary_header(ws, "Balance Summary")
+    # Column J is deleted, so K moves to J
+    assert [ws[coord].value for coord in ("I7", "J7", "K7")] == ["Balance Summary", "Amount", "after"]
+    assert ws["I7"].fill.fgColor.rgb == "00000000" and ws["I7"].font.color.rgb == "00FFFFFF"
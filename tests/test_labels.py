@@ -0,0 +1,84 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from taallc.labels import scan_labels, scan_ledger_labels, tokenize_label, tokenize_labels
+from taallc.ledger import read_ledger
+
+
+def test_pnl_labels():
+    tokens = tokenize_labels(["Office Rent (4070/29)", "Fees ( 3010 / 1)", "Total Rent", None])
+    assert tokens["description"] == ["Office Rent", "Fees", "Total Rent", None]
+    assert tokens["codes"] == ["4070/29", "3010 / 1", None, None]
+    assert tokens["focus_code"] == [4070, 3010, None, None]
+    assert tokens["ssoi_code"] == [29, 1, None, None]
+    assert tokens["malformed"] == []
+    assert tokenize_label("Office Rent (4070/29)") == ("Office Rent", 4070, 29, "Office Rent (4070/29)")
+
+
+def test_leading_zeros_stay_in_the_code_text():
+    tokens = tokenize_labels(["Cash (0200/01)", "Fees ( 0045 / 007)"])
+    assert tokens["focus_text"] == ["0200", "0045"]
+    assert tokens["ssoi_text"] == ["01", "007"]
+    assert tokens["focus_code"] == [200, 45]
+    assert tokens["ssoi_code"] == [1, 7]
+    assert tokens["malformed"] == []
+
+    tokens = tokenize_labels(["Bank (0045)"], filing_type="balance")
+    assert tokens["codes"] == ["0045"]
+    assert tokens["malformed"] == []
+
+
+def test_malformed_pnl_labels():
+    labels = ["A (3990", "B (39a0/12)", "C ()", "D (/)", "E (4070/x)", "F (4070/29", "G ((4070/29))", 1234, "",
+              "M 4070/29"]
+    tokens = tokenize_labels(labels, first_row=5)
+    assert tokens["malformed"] == [
+        (5, "A (3990", "no '/' between the Focus and SSOI codes"),
+        (6, "B (39a0/12)", "Focus code '39a0' is not a number"),
+        (7, "C ()", "no '/' between the Focus and SSOI codes"),
+        (8, "D (/)", "Focus code '' is not a number"),
+        (9, "E (4070/x)", "SSOI code 'x' is not a number"),
+        (10, "F (4070/29", "no closing ')'"),
+    ]
+    # Extra parentheses are dropped; labels without a "(" are not label problems
+    assert (tokens["focus_code"][6], tokens["ssoi_code"][6]) == (4070, 29)
+    assert tokens["description"][7:] == [1234, "", "M 4070/29"]
+
+
+def test_malformed_balance_labels():
+    tokens = tokenize_labels(["Cash (200)", "Bad (20a)", "Open (200", "Slash (200/01)", "Total"],
+                             filing_type="balance")
+    assert tokens["codes"][0] == "200"
+    assert tokens["malformed"] == [
+        (2, "Bad (20a)", "Code '20a' is not a number"),
+        (3, "Open (200", "no closing ')'"),
+        (4, "Slash (200/01)", "Code '200/01' is not a number"),
+    ]
+
+
+def test_unknown_filing_type():
+    with pytest.raises(ValueError):
+        tokenize_labels([], filing_type="cash")
+
+
+def labels_workbook(labels):
+    wb = Workbook()
+    ws = wb.active
+    for label in labels:
+        ws.append([label, 1.0])
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+@pytest.mark.parametrize("filing_type, labels, rows", [
+    ("pnl", ["Rent (4070/29)", "Cash (200)", None, "Fees (3010/x)"], [2, 4]),
+    ("balance", ["Cash (0200)", "Rent (4070/29)", "Open (200"], [2, 3]),
+])
+def test_scans_report_the_same_rows(filing_type, labels, rows):
+    file_bytes = labels_workbook(labels)
+    malformed = scan_labels(file_bytes, filing_type=filing_type)
+    assert [row for row, _, _ in malformed] == rows
+    assert scan_ledger_labels(read_ledger(file_bytes), filing_type=filing_type) == malformed
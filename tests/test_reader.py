@@ -0,0 +1,80 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook
+
+from taallc.reader import iter_sheet_rows, open_workbook, read_columns, read_head, read_sheet, sheet_parts
+
+
+def workbook_bytes():
+    # A sheet with a gap row, a styled empty cell, a formula and a second, active sheet
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Ledger"
+    ws.append(["Account", "Balance", None])
+    ws.append(["Cash (200/01)", 12.5])
+    ws["A4"] = "Rent (4070/29)"
+    ws["B4"] = -3
+    ws["D4"].number_format = "0.00"
+    ws["C5"] = "=B4*2"
+    ws.column_dimensions["A"].width = 30
+    ws.row_dimensions[2].height = 20
+    ws.freeze_panes = "A2"
+    ws.merge_cells("C2:D2")
+    other = wb.create_sheet("Other")
+    other["B2"] = "x"
+    wb.active = 1
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+@pytest.fixture(scope="module")
+def data():
+    return workbook_bytes()
+
+
+@pytest.mark.parametrize("reader", ["openpyxl", "xml"])
+def test_read_sheet(data, reader):
+    book = open_workbook(data, reader)
+    sheet = read_sheet(book, "Ledger")
+    assert (sheet["max_row"], sheet["max_column"]) == (5, 4)
+    assert sheet["rows"] == [("Account", "Balance", None, None), ("Cash (200/01)", 12.5, None, None),
+                             (None, None, None, None), ("Rent (4070/29)", -3, None, None), (None, None, "=B4*2", None)]
+    # The active sheet by default
+    assert read_sheet(book)["rows"] == [(None, None), (None, "x")]
+
+
+def test_iter_sheet_rows_xml(data):
+    # Rows only run to their last cell; the gap row is ()
+    rows = list(iter_sheet_rows(open_workbook(data, "xml"), "Ledger"))
+    assert rows == [("Account", "Balance"), ("Cash (200/01)", 12.5), (), ("Rent (4070/29)", -3, None, None),
+                    (None, None, "=B4*2")]
+
+
+@pytest.mark.parametrize("reader", ["openpyxl", "xml"])
+def test_read_columns(data, reader):
+    columns = read_columns(open_workbook(data, reader, read_only=True), [2, 3], "Ledger")
+    assert columns["max_row"] == 5
+    assert columns["columns"] == {2: ["Balance", 12.5, None, -3, None], 3: [None, None, None, None, "=B4*2"]}
+
+
+@pytest.mark.parametrize("reader", ["openpyxl", "xml"])
+def test_read_head(data, reader):
+    head = read_head(open_workbook(data, reader, read_only=True), 0, rows=2)
+    assert head["rows"] == [("Account", "Balance"), ("Cash (200/01)", 12.5)]
+    assert (head["max_row"], head["max_column"]) == (2, 2)
+
+
+def test_sheet_parts(data):
+    parts = list(sheet_parts(open_workbook(data, "xml"), 0))
+    assert ("pane", "A2") in parts
+    assert ("merged", "C2:D2") in parts
+    columns = [part[1] for part in parts if part[0] == "columns"]
+    assert columns[0]["min"] == "1" and float(columns[0]["width"]) == 30
+    # The widths and the pane come before the rows
+    kinds = [part[0] for part in parts]
+    assert kinds.index("row") > max(kinds.index("pane"), kinds.index("columns"))
+    rows = {part[1]: part[2:] for part in parts if part[0] == "row"}
+    assert float(rows[2][0]["ht"]) == 20
+    assert [(col, value) for col, value, _ in rows[4][1]] == [(1, "Rent (4070/29)"), (2, -3), (4, None)]
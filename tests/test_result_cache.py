@@ -0,0 +1,92 @@
+import threading
+from io import BytesIO
+
+import pytest
+
+from taallc import result_cache
+from taallc.result_cache import cached_call, clear_cache, result_size
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def counting(func):
+    calls = []
+
+    def wrapper(*args):
+        calls.append(args)
+        return func(*args)
+    return wrapper, calls
+
+
+def test_hit_by_file_hash_and_options():
+    step, calls = counting(lambda data, option: BytesIO(data + option.encode()))
+    assert cached_call("step", step, b"abc", "x").getvalue() == b"abcx"
+    # The same bytes in a BytesIO hash the same; another option is another entry
+    assert cached_call("step", step, BytesIO(b"abc"), "x").getvalue() == b"abcx"
+    assert cached_call("step", step, b"abc", "y").getvalue() == b"abcy"
+    assert len(calls) == 2
+
+
+def test_every_hit_is_a_fresh_bytesio():
+    step, calls = counting(lambda data: BytesIO(data * 2))
+    first = cached_call("step", step, b"ab")
+    first.seek(0, 2)
+    first.write(b"changed")
+    second = cached_call("step", step, b"ab")
+    assert second is not first
+    assert second.tell() == 0
+    assert second.getvalue() == b"abab"
+    assert len(calls) == 1
+
+
+def test_lists_are_copied():
+    step, _ = counting(lambda data: [1, 2])
+    cached_call("step", step, b"a").append(3)
+    assert cached_call("step", step, b"a") == [1, 2]
+
+
+def test_eviction_by_count(monkeypatch):
+    monkeypatch.setattr(result_cache, "max_entries", 2)
+    step, calls = counting(lambda data: BytesIO(data))
+    for data in (b"1", b"2", b"1", b"3"):  # "2" is the least recently used when "3" comes in
+        cached_call("step", step, data)
+    cached_call("step", step, b"1")
+    cached_call("step", step, b"2")
+    assert [args[0] for args in calls] == [b"1", b"2", b"3", b"2"]
+
+
+def test_eviction_by_bytes(monkeypatch):
+    monkeypatch.setattr(result_cache, "max_bytes", 10)
+    step, calls = counting(lambda data: BytesIO(data * 4))
+    cached_call("step", step, b"a")  # 4 bytes
+    cached_call("step", step, b"b")  # 8 bytes
+    cached_call("step", step, b"c")  # 12 bytes, so "a" goes
+    assert result_cache._cache_bytes == 8
+    # Bigger than the whole cache: returned, never stored
+    assert cached_call("step", step, b"dddd").getvalue() == b"d" * 16
+    assert result_cache._cache_bytes == 8
+    cached_call("step", step, b"a")
+    cached_call("step", step, b"c")
+    assert [args[0] for args in calls] == [b"a", b"b", b"c", b"dddd", b"a"]
+
+
+def test_threads_keep_the_size_in_step(monkeypatch):
+    monkeypatch.setattr(result_cache, "max_entries", 5)
+    step = lambda data: BytesIO(data * 100)
+
+    def work(seed):
+        for i in range(300):
+            cached_call("step", step, bytes([(seed * 7 + i) % 13]))
+
+    threads = [threading.Thread(target=work, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(result_cache._cache) <= 5
+    assert result_cache._cache_bytes == sum(result_size(frozen) for frozen in result_cache._cache.values())
@@ -0,0 +1,42 @@
+from openpyxl import Workbook
+from openpyxl.styles import Font
+
+from taallc.sheet_rows import compact_rows, sort_code_key, sort_rows_by_code
+
+
+def sheet(rows):
+    wb = Workbook()
+    ws = wb.active
+    for row in rows:
+        ws.append(row)
+    return ws
+
+
+def values(ws):
+    return [[cell.value for cell in row] for row in ws.iter_rows()]
+
+
+def test_compact_rows_moves_values_and_styles():
+    ws = sheet([["head"], ["a"], ["b"], ["c"], ["d"]])
+    ws["A4"].font = Font(bold=True)
+    compact_rows(ws, 2, [True, False, True])
+    # "b" goes; "c" moves up with its style and "d", past the mask, is kept
+    assert values(ws) == [["head"], ["a"], ["c"], ["d"]]
+    assert ws["A3"].font.b
+    assert not ws["A4"].font.b
+
+
+def test_sort_rows_by_code():
+    ws = sheet([["x", "y", "code"], [1, None, "300"], [2, None, None], [3, None, "A1"], [4, None, "0040"],
+                [5, None, "200"], [6, None, "tail"]])
+    ws["A2"].font = Font(bold=True)
+    sort_rows_by_code(ws, 2, 6)
+    # The row without a code drops out and, as with delete_rows, the row below the window
+    # moves up into it and is sorted with the rest; only the values move
+    assert values(ws) == [["x", "y", "code"], [4, None, "0040"], [5, None, "200"], [1, None, "300"],
+                          [3, None, "A1"], [6, None, "tail"]]
+    assert ws["A2"].font.b
+
+
+def test_sort_code_key():
+    assert sorted(["A1", "300", " 20 ", "0040", "1b"], key=sort_code_key) == [" 20 ", "0040", "300", "1b", "A1"]
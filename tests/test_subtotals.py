@@ -0,0 +1,34 @@
+from taallc.subtotals import build_subtotals
+
+
+def subtotal(rows, window=None):
+    return build_subtotals(rows, lambda row: row[0], lambda row: row[1],
+                           lambda code, total_sum: (f"{code} Total", total_sum), window=window,
+                           blank_row=(None, None))
+
+
+def test_total_row_after_each_group():
+    rows = [("200", 100), ("200", 50), ("300", None), ("", 7), ("1045", -25)]
+    out, subtotals = subtotal(rows)
+    assert out == [("200", 100), ("200", 50), ("200 Total", 150), ("300", None), ("", 7), ("300 Total", 0),
+                   ("1045", -25), ("1045 Total", -25)]
+    assert subtotals == [("200", 150), ("300", 0), ("1045", -25)]
+
+
+def test_window_stops_the_scan():
+    # Like the macro's insert_rows loop, only the first `window` output rows are grouped;
+    # the last group's total goes right after the window and the rest stays as it is
+    rows = [("200", 1), ("200", 2), ("300", 3), ("300", 4), ("400", 5)]
+    out, subtotals = subtotal(rows, window=4)
+    assert out == [("200", 1), ("200", 2), ("200 Total", 3), ("300", 3), ("300 Total", 3), ("300", 4), ("400", 5)]
+    assert subtotals == [("200", 3), ("300", 3)]
+
+
+def test_window_padded_with_blank_rows():
+    out, subtotals = subtotal([("200", 1)], window=3)
+    assert out == [("200", 1), (None, None), (None, None), ("200 Total", 1)]
+    assert subtotals == [("200", 1)]
+
+
+def test_no_rows():
+    assert subtotal([]) == ([], [])
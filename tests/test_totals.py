@@ -0,0 +1,35 @@
+import numpy as np
+
+from taallc.classification import code_table
+from taallc.totals import amount_cents, category_totals, from_cents, subtotal_mask
+
+
+def test_amount_cents():
+    assert amount_cents([1.005, 0.1, -2, None, "x", 12345678.91]) == [100, 10, -200, None, None, 1234567891]
+    assert from_cents(1234567891) == 12345678.91
+
+
+def test_category_totals_leave_out_the_subtotals():
+    codes = ["200", "200", "200 Total", "1045", "1045 Total", "1800", "x", None]
+    cents = [100, 250, 350, -40, -40, -7, 5, 5]
+    indices, totals, last_rows = category_totals(code_table("balance"), codes, cents, subtotals=subtotal_mask(codes))
+    assert totals == {"asset": 350, "liability": -40, "equity": -7}
+    # The last rows do count the subtotals, which is where the totals are written
+    assert last_rows == {"asset": 2, "liability": 4, "equity": 5}
+    assert len(indices) == len(codes)
+
+
+def test_category_totals_are_exact_past_float_precision():
+    # 2**53 + 1 cents is not a float64, so a float sum would be off by one
+    big = 2 ** 53 + 1
+    _, totals, _ = category_totals(code_table("balance"), ["200", "200"], [big, 1])
+    assert totals["asset"] == big + 1
+
+
+def test_category_totals_rows_mask():
+    codes = ["3010", "4110", "3010", "4110"]
+    rows = np.array([True, True, False, False])
+    _, totals, last_rows = category_totals(code_table("pnl"), codes, [1, 2, 3, 4], rows=rows)
+    # The sums count every row, the last rows only the masked ones
+    assert totals == {"income": 4, "expense": 6}
+    assert last_rows == {"income": 0, "expense": 1}
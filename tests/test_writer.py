@@ -0,0 +1,74 @@
+from io import BytesIO
+
+import pytest
+from openpyxl import Workbook, load_workbook
+from openpyxl.formatting.rule import CellIsRule
+from openpyxl.styles import Font, PatternFill
+
+from taallc.reader import open_workbook
+from taallc.writer import output_workbook, save_workbook, write_rows
+
+
+def styled_workbook():
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Ledger"
+    ws.append(["Account", "Balance"])
+    ws.append(["Cash (200/01)", 12.5])
+    ws["A4"] = "Rent (4070/29)"
+    ws["B4"] = -3
+    ws["A1"].font = Font(bold=True)
+    ws["B2"].fill = PatternFill("solid", start_color="FFFF00")
+    ws["B4"].number_format = "0.00"
+    ws["C5"].fill = PatternFill("solid", start_color="00FF00")
+    ws.column_dimensions["A"].width = 30
+    ws.row_dimensions[2].height = 20
+    ws.freeze_panes = "A2"
+    ws.merge_cells("A6:B6")
+    ws.conditional_formatting.add("B2:B4", CellIsRule(operator="lessThan", formula=["0"],
+                                                      fill=PatternFill("solid", start_color="FFC7CE")))
+    wb.create_sheet("Notes")["B3"] = "note"
+    out = BytesIO()
+    wb.save(out)
+    return out.getvalue()
+
+
+def sheet_snapshot(ws):
+    # What the copy has to keep of a sheet
+    cells = {cell.coordinate: (cell.value, cell.number_format, cell.font.b, cell.fill.fgColor.rgb)
+             for row in ws.iter_rows() for cell in row if cell.value is not None or cell.has_style}
+    return {
+        "cells": cells,
+        "widths": {key: dim.width for key, dim in ws.column_dimensions.items() if dim.customWidth},
+        "heights": {index: dim.ht for index, dim in ws.row_dimensions.items() if dim.ht},
+        "merged": sorted(str(cell_range) for cell_range in ws.merged_cells.ranges),
+        "pane": ws.freeze_panes,
+        "formatting": [(str(formatting.sqref), [rule.dxf.fill.fgColor.rgb for rule in formatting.rules])
+                       for formatting in ws.conditional_formatting],
+    }
+
+
+@pytest.mark.parametrize("reader", ["openpyxl", "xml"])
+def test_stream_copy_keeps_the_input_sheets(reader):
+    data = styled_workbook()
+    output = load_workbook(save_workbook(output_workbook(open_workbook(data, reader), "stream")))
+    source = load_workbook(BytesIO(data))
+    assert output.sheetnames == source.sheetnames
+    for title in source.sheetnames:
+        assert sheet_snapshot(output[title]) == sheet_snapshot(source[title]), title
+
+
+@pytest.mark.parametrize("write_only", [False, True])
+def test_write_rows(write_only):
+    wb = Workbook(write_only=write_only)
+    ws = wb.create_sheet("Focus")
+    bold = Font(bold=True)
+    write_rows(ws, [({1: "a", 3: 2.5}, {3: ("#,##0", None, None)}),
+                    ({}, {}),
+                    ({}, {2: (None, bold, None)}),
+                    ({2: "b"}, {})])
+    ws = load_workbook(save_workbook(wb))["Focus"]
+    assert [[cell.value for cell in row] for row in ws.iter_rows()] == [
+        ["a", None, 2.5], [None, None, None], [None, None, None], [None, "b", None]]
+    assert ws["C1"].number_format == "#,##0"
+    assert ws["B3"].font.b